@@ -4,6 +4,13 @@
 Использование:
     python run_scenario.py scenario.txt  # Из файла
     python run_scenario.py               # Интерактивно
+    python run_scenario.py --batch scenarios/ [-c 8] [--quiet] [--output-dir out/]
+
+Пакетный режим (--batch): каталог, glob-шаблон («scenarios/*.txt») или JSONL
+со сценариями; сценарии идут одновременно, не больше -c/--concurrency сразу
+(по умолчанию 4). На каждый сценарий — свой лог, с --output-dir ещё и файл
+для сдачи <id>.json и summary.json. --quiet оставляет только итоговую таблицу.
+Код выхода 1, если хоть один сценарий упал.
 
 Формат файла сценария:
     name: Алекс
@@ -18,12 +25,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import sys
+import time
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -31,8 +42,10 @@ from src.agents.base import LLMAPIError
 from src.config import settings
 from src.constants import VERSION
 from src.graph.interview_graph import InterviewSession
-from src.topics import SUPPORTED_POSITIONS, normalize_position
+from src.llm.provider import missing_api_key
 from src.main import print_feedback
+from src.scenarios import load_scenario, load_scenario_batch
+from src.topics import SUPPORTED_POSITIONS, normalize_position
 from src.utils.logger import InterviewLogger, export_for_submission
 
 console = Console(width=100)
@@ -78,7 +91,8 @@ def run_scenario(
             response, is_finished, feedback = session.process_user_input(msg)
         except LLMAPIError as e:
             console.print(f"[red]Ошибка API: {e}[/red]")
-            console.print("[dim]Попробуйте позже или переключите LLM_PROVIDER на openai в .env[/dim]")
+            console.print("[dim]Попробуйте позже или задайте LLM_FALLBACK_PROVIDER в .env[/dim]")
+            _save_partial_log(session, logger)
             sys.exit(1)
         
         if state := session.get_state():
@@ -92,8 +106,49 @@ def run_scenario(
             print_feedback(feedback)
             break
 
-    final_log = logger.end_session()
-    log_data = json.loads(final_log.read_text(encoding="utf-8"))
+    if settings.llm_cache_enabled:
+        stats = session.get_cache_stats()
+        console.print("[dim]Кеш LLM: " + ", ".join(
+            f"{agent} {s['hits']}/{s['hits'] + s['misses'] + s['coalesced']}"
+            + (f" (ждали запрос в полёте {s['coalesced']})" if s["coalesced"] else "")
+            for agent, s in stats.items()
+        ) + "[/dim]")
+
+    if settings.llm_structured_output:
+        console.print("[dim]Ответы по схеме: " + ", ".join(
+            f"{agent} {s['structured']} (откатов {s['fallbacks']}, не разобрано {s['parse_failures']})"
+            for agent, s in session.get_structured_stats().items()
+        ) + "[/dim]")
+
+    if (pre := session.get_preclassifier_stats()) is not None:
+        console.print(
+            f"[dim]Предклассификатор: сработал {pre['hits']}/{pre['turns']}, "
+            f"согласие с Observer {pre['agreed']}, расхождений {pre['disagreed']}, пропущено {pre['missed']}[/dim]"
+        )
+
+    retries = session.get_retry_stats()
+    if retries["retries"] or retries["failovers"]:
+        console.print(
+            f"[dim]Повторов вызовов LLM: {retries['retries']}, переключений провайдера: {retries['failovers']}[/dim]"
+        )
+
+    if draft_errors := session.get_draft_errors():
+        console.print(f"[dim]Черновик оценки сброшен из-за неразобранного ответа: {draft_errors}[/dim]")
+
+    if (warmup := session.get_warmup_stats()) is not None:
+        console.print(
+            f"[dim]Прогрев: соединений {warmup['connections']}, preflight {warmup['preflights']}, "
+            f"ошибок {warmup['errors']}, {warmup['duration_ms']} мс[/dim]"
+        )
+
+    total = session.get_total_usage()
+    console.print(
+        f"[dim]Токены: {total.input_tokens} вход (из кеша {total.cached_tokens}) / {total.output_tokens} выход, "
+        f"вызовов {total.calls}, ${total.cost_usd:.4f}[/dim]"
+    )
+    logger.log_token_usage(session.get_token_usage())
+    final_log = logger.end_session(finish_reason=session.get_finish_reason() or None)
+    log_data = logger.finished_log
     last_feedback = feedback if (is_finished and feedback) else None
 
     if output_name:
@@ -114,6 +169,173 @@ def run_scenario(
     return final_log
 
 
+def _save_partial_log(session: InterviewSession, logger: InterviewLogger) -> None:
+    """Сохранить лог прерванного интервью: прошедшие ходы и расход токенов."""
+    logged = len(logger.get_current_log().get("turns", []))
+    for turn in session.get_turns()[logged:]:
+        logger.log_turn(turn)
+    logger.log_token_usage(session.get_token_usage())
+    log_file = logger.end_session(finish_reason="llm_error")
+    console.print(f"[dim]Лог прерванного интервью: {log_file}[/dim]")
+
+
+@dataclass
+class ScenarioResult:
+    """Итог одного сценария пакетного прогона."""
+
+    id: str
+    name: str
+    position: str
+    status: str = "ok"
+    recommendation: str | None = None
+    assessed_grade: str | None = None
+    turns: int = 0
+    seconds: float = 0.0
+    log: str | None = None
+    export: str | None = None
+    error: str | None = None
+
+
+async def _run_batch_scenario(
+    scenario_id: str,
+    metadata: dict,
+    messages: list[str],
+    output_dir: Path | None,
+    participant: str | None,
+) -> ScenarioResult:
+    """Прогнать сценарий на асинхронном API сессии, записать лог и файл для сдачи."""
+    result = ScenarioResult(scenario_id, metadata["name"], metadata["position"])
+    position = normalize_position(metadata["position"])
+    if not position:
+        result.status, result.error = "error", f"позиция '{metadata['position']}' не поддерживается"
+        return result
+
+    start = time.perf_counter()
+    session = InterviewSession()
+    logger = InterviewLogger()
+    feedback = None
+    try:
+        await session.ainitialize(metadata["name"], position, metadata["grade"], metadata["experience"])
+        await asyncio.to_thread(
+            logger.start_session, metadata["name"], position, metadata["grade"], metadata["experience"]
+        )
+        for msg in messages:
+            _, is_finished, feedback = await session.aprocess_user_input(msg)
+            if turns := session.get_turns():
+                logger.log_turn(turns[-1])
+            if is_finished:
+                break
+        else:
+            result.status = "unfinished"
+    except Exception as e:
+        session.cancel_background()
+        result.status, result.error = "error", f"{type(e).__name__}: {e}"[:200]
+    finally:
+        result.seconds = round(time.perf_counter() - start, 3)
+
+    if not logger.get_current_log():
+        return result
+    if feedback:
+        logger.log_feedback(feedback)
+        decision = feedback.get("decision", {})
+        result.recommendation = decision.get("hiring_recommendation")
+        result.assessed_grade = decision.get("assessed_grade")
+    logged = len(logger.get_current_log().get("turns", []))
+    for turn in session.get_turns()[logged:]:
+        logger.log_turn(turn)
+    logger.log_token_usage(session.get_token_usage())
+    reason = "llm_error" if result.status == "error" else session.get_finish_reason() or None
+    # Запись лога (fsync, JSON, каталог) блокирует — не держим event loop с остальными сессиями.
+    result.log = str(await asyncio.to_thread(logger.end_session, finish_reason=reason))
+    result.turns = len(logger.finished_log["turns"])
+    if output_dir is not None:
+        target = output_dir / f"{scenario_id}.json"
+        await asyncio.to_thread(
+            export_for_submission, logger.finished_log, target, feedback, participant_name=participant
+        )
+        result.export = str(target)
+    return result
+
+
+async def run_batch(
+    scenarios: list[tuple[str, dict, list[str]]],
+    concurrency: int = 4,
+    quiet: bool = False,
+    output_dir: Path | None = None,
+    participant: str | None = None,
+) -> list[ScenarioResult]:
+    """Прогнать сценарии одновременно, не больше concurrency сессий сразу."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(scenario_id: str, metadata: dict, messages: list[str]) -> ScenarioResult:
+        async with semaphore:
+            result = await _run_batch_scenario(scenario_id, metadata, messages, output_dir, participant)
+        if not quiet:
+            style = "green" if result.status == "ok" else "red"
+            console.print(
+                f"[{style}]{result.status:>10}[/{style}] {result.id}: "
+                f"{result.error or result.recommendation or '-'} ({result.turns} ходов, {result.seconds:.1f} с)"
+            )
+        return result
+
+    return list(await asyncio.gather(*(bounded(*scenario) for scenario in scenarios)))
+
+
+def _print_batch_summary(results: list[ScenarioResult], wall: float) -> None:
+    table = Table(title="Пакетный прогон")
+    table.add_column("Сценарий", style="cyan")
+    table.add_column("Статус")
+    table.add_column("Рекомендация")
+    table.add_column("Грейд")
+    table.add_column("Ходов", justify="right")
+    table.add_column("Время, с", justify="right")
+    for r in results:
+        status = r.status if r.status == "ok" else f"[red]{r.status}[/red]"
+        table.add_row(
+            r.id, status, r.recommendation or "-", r.assessed_grade or "-", str(r.turns), f"{r.seconds:.1f}"
+        )
+    console.print(table)
+
+    failed = [r for r in results if r.status == "error"]
+    for r in failed:
+        console.print(f"[red]{r.id}: {r.error}[/red]")
+    verdicts: dict[str, int] = {}
+    for r in results:
+        if r.recommendation:
+            verdicts[r.recommendation] = verdicts.get(r.recommendation, 0) + 1
+    console.print(
+        f"Сценариев: {len(results)}, ошибок: {len(failed)}, "
+        f"без завершения: {sum(r.status == 'unfinished' for r in results)} | "
+        + (", ".join(f"{v}: {n}" for v, n in sorted(verdicts.items())) or "вердиктов нет")
+    )
+    console.print(f"[dim]Время: {wall:.1f} с, {len(results) / wall if wall else 0:.2f} сценариев/с[/dim]")
+
+
+def main_batch(source: str, concurrency: int, quiet: bool, output_dir: Path | None, participant: str | None) -> int:
+    """Пакетный прогон; вернуть код выхода."""
+    scenarios = load_scenario_batch(source)
+    if not scenarios:
+        console.print(f"[red]Сценарии не найдены: {source}[/red]")
+        return 1
+    if not quiet:
+        console.print(f"[dim]Сценариев: {len(scenarios)}, concurrency {concurrency}[/dim]")
+
+    start = time.perf_counter()
+    results = asyncio.run(run_batch(scenarios, concurrency, quiet, output_dir, participant))
+    wall = time.perf_counter() - start
+    _print_batch_summary(results, wall)
+
+    if output_dir is not None:
+        summary = output_dir / "summary.json"
+        summary.parent.mkdir(parents=True, exist_ok=True)
+        summary.write_text(json.dumps(
+            {"wall_time_s": round(wall, 3), "concurrency": concurrency, "results": [asdict(r) for r in results]},
+            ensure_ascii=False, indent=2,
+        ), encoding="utf-8")
+        console.print(f"[dim]Итоги: {summary}[/dim]")
+    return 1 if any(r.status == "error" for r in results) else 0
+
+
 def _print_feedback_summary(feedback: dict):
     """Вывести краткое резюме фидбэка."""
     decision = feedback.get("decision", {})
@@ -126,67 +348,54 @@ def _print_feedback_summary(feedback: dict):
         console.print(f"  Пробелов: {len(gaps)}")
 
 
-def load_scenario(file_path: Path) -> tuple[dict, list[str]]:
-    """Загрузить сценарий из файла."""
-    lines = file_path.read_text(encoding="utf-8").strip().split("\n")
-    
-    metadata = {
-        "name": "Тест",
-        "position": "Backend Developer",
-        "grade": "Junior", 
-        "experience": "Python",
-    }
-    messages = []
-    in_messages = False
-    
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        
-        if line == "---":
-            in_messages = True
-            continue
-        
-        if in_messages:
-            messages.append(line)
-        else:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip().lower()
-                value = value.strip()
-                if key in metadata:
-                    metadata[key] = value
-    
-    return metadata, messages
+_VALUE_OPTIONS = ("--participant", "--batch", "-c", "--concurrency", "--output-dir")
+_FLAG_OPTIONS = ("-q", "--quiet")
 
 
 def _parse_args():
-    """Парсинг аргументов: scenario.txt [output.json] [--participant "ФИО"]."""
+    """Парсинг аргументов: scenario.txt [output.json] [--participant "ФИО"] [--batch ИСТОЧНИК ...]."""
     argv = sys.argv[1:]
-    participant = None
+    options: dict[str, str | bool] = {}
     skip_next = False
     pos_args = []
     for i, a in enumerate(argv):
         if skip_next:
             skip_next = False
             continue
-        if a == "--participant" and i + 1 < len(argv):
-            participant = argv[i + 1]
+        if a in _VALUE_OPTIONS and i + 1 < len(argv):
+            options[a] = argv[i + 1]
             skip_next = True
             continue
+        if a in _FLAG_OPTIONS:
+            options[a] = True
+            continue
         pos_args.append(a)
     scenario_file = Path(pos_args[0]) if pos_args else None
     output_name = pos_args[1] if len(pos_args) > 1 else None
-    return scenario_file, output_name, participant
+    return scenario_file, output_name, options
 
 
 def main():
-    if not settings.mistral_api_key:
-        console.print("[red]Ошибка: MISTRAL_API_KEY не настроен в .env[/red]")
+    if missing := missing_api_key():
+        console.print(f"[red]Ошибка: {missing} не настроен в .env[/red]")
         sys.exit(1)
 
-    scenario_file, output_name, participant_for_submission = _parse_args()
+    scenario_file, output_name, options = _parse_args()
+    participant_for_submission = options.get("--participant")
+
+    if source := options.get("--batch"):
+        output_dir = options.get("--output-dir")
+        concurrency = options.get("-c") or options.get("--concurrency") or "4"
+        if not concurrency.isdigit() or int(concurrency) < 1:
+            console.print(f"[red]Ошибка: --concurrency должно быть целым числом ≥ 1, а не «{concurrency}»[/red]")
+            sys.exit(1)
+        sys.exit(main_batch(
+            source,
+            concurrency=int(concurrency),
+            quiet=bool(options.get("-q") or options.get("--quiet")),
+            output_dir=Path(output_dir) if output_dir else None,
+            participant=participant_for_submission,
+        ))
 
     if scenario_file:
         if not scenario_file.exists():
@@ -3,12 +3,31 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import AsyncIterator
+from typing import Any, TypeVar
 
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
 
-from src.models.state import InterviewState
+from src.config import settings
+from src.llm.cache import (
+    CacheOutcome,
+    LLMResponseCache,
+    describe_llm,
+    get_response_cache,
+    make_cache_key,
+)
+from src.llm.policy import CallPolicy, CircuitOpenError
+from src.models.state import InterviewState, TokenUsage
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _estimate_tokens(messages: list[BaseMessage]) -> int:
+    """Грубая оценка входных токенов (≈4 символа на токен) для лимита TPM."""
+    return sum(len(str(m.content)) for m in messages) // 4
 
 
 class LLMAPIError(Exception):
@@ -20,13 +39,42 @@ class LLMAPIError(Exception):
 
 
 class BaseAgent(ABC):
-    """Абстрактный базовый класс для агентов интервью."""
+    """Абстрактный базовый класс для агентов интервью.
+
+    Если включён кеш ответов (LLM_CACHE_ENABLED), вызовы LLM идут через него;
+    попадания и промахи считаются в cache_hits / cache_misses, ожидания
+    такого же запроса в полёте — в cache_coalesced.
+    Расход токенов из usage_metadata ответов копится в usage
+    (ответы из кеша токенов не тратят).
+
+    invoke_structured просит у провайдера ответ по pydantic-схеме (tool calling).
+    Если провайдер этого не умеет или ответ не прошёл валидацию, возвращается
+    None и агент идёт текстовым путём — такие случаи считаются в structured_fallbacks.
+    parse_failures — ответы, которые не удалось разобрать и в текстовом режиме.
+
+    Все вызовы идут через policy (CallPolicy): повторы временных ошибок,
+    circuit breaker и переход на fallback_llm. Ключ кеша ответов считается
+    по основному llm, даже если ответил резервный.
+    """
 
-    __slots__ = ("llm", "name")
+    __slots__ = (
+        "llm", "name", "policy", "cache", "cache_hits", "cache_misses", "cache_coalesced", "usage",
+        "structured_calls", "structured_fallbacks", "parse_failures", "_structured",
+    )
 
-    def __init__(self, llm: BaseChatModel, name: str):
+    def __init__(self, llm: BaseChatModel, name: str, fallback_llm: BaseChatModel | None = None):
         self.llm = llm
         self.name = name
+        self.policy = CallPolicy(name, [llm] if fallback_llm is None else [llm, fallback_llm])
+        self.cache: LLMResponseCache | None = get_response_cache()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_coalesced = 0
+        self.usage = TokenUsage()
+        self.structured_calls = 0
+        self.structured_fallbacks = 0
+        self.parse_failures = 0
+        self._structured: dict[tuple[type, int], Runnable | None] = {}
 
     @abstractmethod
     def get_system_prompt(self) -> str:
@@ -36,32 +84,231 @@ class BaseAgent(ABC):
     async def process(self, state: InterviewState) -> dict[str, Any]:
         """Обработать состояние и вернуть обновления."""
 
-    async def invoke_llm(self, user_prompt: str, system_prompt: str | None = None) -> str:
-        """Асинхронный вызов LLM."""
-        messages = [
+    def _build_messages(self, user_prompt: str, system_prompt: str | None) -> list[BaseMessage]:
+        return [
             SystemMessage(content=system_prompt or self.get_system_prompt()),
             HumanMessage(content=user_prompt),
         ]
+
+    def _cache_key(self, messages: list[BaseMessage], schema: type | None = None) -> str:
+        provider, model, temperature = describe_llm(self.llm)
+        if schema is not None:
+            model = f"{model}#{schema.__name__}"
+        return make_cache_key(provider, model, temperature, messages[0].content, messages[1].content)
+
+    def _count_cache(self, outcome: CacheOutcome) -> None:
+        if outcome == "hit":
+            self.cache_hits += 1
+        elif outcome == "miss":
+            self.cache_misses += 1
+        else:
+            self.cache_coalesced += 1
+
+    def _record_usage(self, message: AIMessage) -> None:
+        metadata = message.usage_metadata or {}
+        input_tokens = metadata.get("input_tokens", 0)
+        output_tokens = metadata.get("output_tokens", 0)
+        cached_tokens = (metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+        cached_price = settings.llm_price_cached_input_per_1m
+        if cached_price is None:
+            cached_price = settings.llm_price_input_per_1m
+        self.usage += TokenUsage(
+            input_tokens=input_tokens,
+            cached_tokens=cached_tokens,
+            output_tokens=output_tokens,
+            total_tokens=metadata.get("total_tokens", input_tokens + output_tokens),
+            calls=1,
+            cost_usd=(
+                (input_tokens - cached_tokens) * settings.llm_price_input_per_1m
+                + cached_tokens * cached_price
+                + output_tokens * settings.llm_price_output_per_1m
+            ) / 1_000_000,
+        )
+
+    def structured_stats(self) -> dict[str, int]:
+        """Ответы по схеме, откаты на текстовый режим и неразобранные ответы."""
+        return {
+            "structured": self.structured_calls,
+            "fallbacks": self.structured_fallbacks,
+            "parse_failures": self.parse_failures,
+        }
+
+    def _structured_runnable(self, schema: type[M], llm: BaseChatModel | None = None) -> Runnable | None:
+        llm = llm or self.llm
+        key = (schema, id(llm))
+        if key not in self._structured:
+            try:
+                self._structured[key] = llm.with_structured_output(
+                    schema, method="function_calling", include_raw=True
+                )
+            except (NotImplementedError, ValueError, TypeError):
+                self._structured[key] = None
+        return self._structured[key]
+
+    def _bound_structured(self, schema: type[M], llm: BaseChatModel) -> Runnable:
+        runnable = self._structured_runnable(schema, llm)
+        if runnable is None:
+            raise LLMAPIError(f"{describe_llm(llm)[0]} не поддерживает ответ по схеме")
+        return runnable
+
+    def _unpack_structured(self, result: dict, schema: type[M]) -> str:
+        self._record_usage(result["raw"])
+        if result.get("parsing_error") is not None or result.get("parsed") is None:
+            raise ValueError(result.get("parsing_error") or "пустой ответ")
+        # Без полей по умолчанию: после model_validate_json видно, что модель не прислала.
+        return result["parsed"].model_dump_json(exclude_unset=True)
+
+    def _settle_structured(self, content: str | None, schema: type[M], outcome: CacheOutcome | None) -> M | None:
+        if content is None:
+            self.structured_fallbacks += 1
+            return None
+        if outcome is not None:
+            self._count_cache(outcome)
+        self.structured_calls += 1
+        return schema.model_validate_json(content)
+
+    async def invoke_structured(
+        self, user_prompt: str, schema: type[M], system_prompt: str | None = None
+    ) -> M | None:
+        """Вызов LLM с ответом по схеме; None — нужен текстовый режим."""
+        if self._structured_runnable(schema) is None:
+            return self._settle_structured(None, schema, None)
+        messages = self._build_messages(user_prompt, system_prompt)
+
+        async def compute() -> str:
+            try:
+                result = await self.policy.ainvoke(
+                    lambda llm: self._bound_structured(schema, llm).ainvoke(messages), _estimate_tokens(messages)
+                )
+            except LLMAPIError:
+                raise
+            except Exception as e:
+                self._reraise_api_error(e)
+            return self._unpack_structured(result, schema)
+
         try:
-            response = await self.llm.ainvoke(messages)
-            return response.content
-        except Exception as e:
-            self._reraise_api_error(e)
+            if self.cache is None:
+                return self._settle_structured(await compute(), schema, None)
+            content, outcome = await self.cache.get_or_compute(self._cache_key(messages, schema), compute)
+        except ValueError:
+            return self._settle_structured(None, schema, None)
+        return self._settle_structured(content, schema, outcome)
+
+    def invoke_structured_sync(
+        self, user_prompt: str, schema: type[M], system_prompt: str | None = None
+    ) -> M | None:
+        """Синхронная версия invoke_structured."""
+        if self._structured_runnable(schema) is None:
+            return self._settle_structured(None, schema, None)
+        messages = self._build_messages(user_prompt, system_prompt)
+
+        def compute() -> str:
+            try:
+                result = self.policy.invoke(
+                    lambda llm: self._bound_structured(schema, llm).invoke(messages), _estimate_tokens(messages)
+                )
+            except LLMAPIError:
+                raise
+            except Exception as e:
+                self._reraise_api_error(e)
+            return self._unpack_structured(result, schema)
+
+        try:
+            if self.cache is None:
+                return self._settle_structured(compute(), schema, None)
+            content, outcome = self.cache.get_or_compute_sync(self._cache_key(messages, schema), compute)
+        except ValueError:
+            return self._settle_structured(None, schema, None)
+        return self._settle_structured(content, schema, outcome)
+
+    def cache_stats(self) -> dict[str, int]:
+        """Попадания, промахи и ожидания запроса в полёте для этого агента."""
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "coalesced": self.cache_coalesced}
+
+    async def invoke_llm(self, user_prompt: str, system_prompt: str | None = None) -> str:
+        """Асинхронный вызов LLM."""
+        messages = self._build_messages(user_prompt, system_prompt)
+        if self.cache is None:
+            return await self._ainvoke(messages)
+        content, outcome = await self.cache.get_or_compute(
+            self._cache_key(messages), lambda: self._ainvoke(messages)
+        )
+        self._count_cache(outcome)
+        return content
 
     def invoke_llm_sync(self, user_prompt: str, system_prompt: str | None = None) -> str:
         """Синхронный вызов LLM."""
-        messages = [
-            SystemMessage(content=system_prompt or self.get_system_prompt()),
-            HumanMessage(content=user_prompt),
-        ]
+        messages = self._build_messages(user_prompt, system_prompt)
+        if self.cache is None:
+            return self._invoke(messages)
+        content, outcome = self.cache.get_or_compute_sync(
+            self._cache_key(messages), lambda: self._invoke(messages)
+        )
+        self._count_cache(outcome)
+        return content
+
+    async def stream_llm(
+        self, user_prompt: str, system_prompt: str | None = None
+    ) -> AsyncIterator[str]:
+        """Потоковый вызов LLM: отдаёт куски текста по мере генерации.
+
+        При попадании в кеш ответ отдаётся одним куском. Оборванный
+        вызывающим поток в кеш не попадает.
+        """
+        messages = self._build_messages(user_prompt, system_prompt)
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(messages)
+            if (cached := self.cache.get(key)) is not None:
+                self._count_cache("hit")
+                yield cached
+                return
+
+        chunks = []
+        message = None
+        stream = self.policy.astream(lambda llm: llm.astream(messages), _estimate_tokens(messages))
+        try:
+            async for chunk in stream:
+                message = chunk if message is None else message + chunk
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+        except GeneratorExit:
+            # Вызывающий бросил поток раньше конца: закрываем запрос к провайдеру,
+            # вызов учитываем с тем расходом, что успел прийти.
+            await stream.aclose()
+            if message is not None:
+                self._record_usage(message)
+            raise
+        except Exception as e:
+            self._reraise_api_error(e)
+        if message is not None:
+            self._record_usage(message)
+
+        if key is not None:
+            self._count_cache("miss")
+            self.cache.put(key, "".join(chunks))
+
+    async def _ainvoke(self, messages: list[BaseMessage]) -> str:
+        try:
+            response = await self.policy.ainvoke(lambda llm: llm.ainvoke(messages), _estimate_tokens(messages))
+        except Exception as e:
+            self._reraise_api_error(e)
+        self._record_usage(response)
+        return response.content
+
+    def _invoke(self, messages: list[BaseMessage]) -> str:
         try:
-            response = self.llm.invoke(messages)
-            return response.content
+            response = self.policy.invoke(lambda llm: llm.invoke(messages), _estimate_tokens(messages))
         except Exception as e:
             self._reraise_api_error(e)
+        self._record_usage(response)
+        return response.content
 
     def _reraise_api_error(self, e: Exception) -> None:
         """Преобразовать ошибку API в LLMAPIError с понятным сообщением."""
+        if isinstance(e, CircuitOpenError):
+            raise LLMAPIError(str(e)) from e
         status_code = None
         if hasattr(e, "response") and e.response is not None:
             status_code = getattr(e.response, "status_code", None)
@@ -9,9 +9,11 @@ from typing import Any
 from langchain_core.language_models import BaseChatModel
 
 from src.agents.base import BaseAgent
+from src.config import settings
 from src.models.feedback import (
     BehaviorAnalysis,
     Decision,
+    EvaluationDraft,
     FinalFeedback,
     HardSkillsAnalysis,
     KnowledgeGap,
@@ -19,17 +21,27 @@ from src.models.feedback import (
     SoftSkillsAnalysis,
 )
 from src.models.state import InterviewState
-from src.prompts.evaluator import EVALUATOR_SYSTEM_PROMPT, get_evaluator_prompt
+from src.models.transcript import full_transcript, render_evaluator_turn
+from src.prompts.evaluator import (
+    EVALUATOR_SYSTEM_PROMPT,
+    format_evaluation_draft,
+    get_evaluator_draft_prefix,
+    get_evaluator_draft_prompt,
+    get_evaluator_prefix,
+    get_evaluator_prompt,
+)
 
 
 class EvaluatorAgent(BaseAgent):
     """Генерирует финальный фидбэк: грейд, рекомендация, анализ навыков, roadmap.
 
-    Анализирует ВСЕ ходы интервью для комплексной оценки.
+    Анализирует ВСЕ ходы интервью для комплексной оценки. Если в состоянии
+    есть черновик (evaluation_draft), финальный промпт содержит его и только
+    ходы, которые в черновик ещё не вошли.
     """
 
-    def __init__(self, llm: BaseChatModel):
-        super().__init__(llm, "Evaluator")
+    def __init__(self, llm: BaseChatModel, fallback_llm: BaseChatModel | None = None):
+        super().__init__(llm, "Evaluator", fallback_llm)
 
     def get_system_prompt(self) -> str:
         return EVALUATOR_SYSTEM_PROMPT
@@ -44,14 +56,72 @@ class EvaluatorAgent(BaseAgent):
 
     async def _generate_async(self, state: InterviewState) -> FinalFeedback:
         prompt = self._build_prompt(state)
-        response = await self.invoke_llm(prompt)
+        prefix = self._build_prefix(state)
+        if settings.llm_structured_output:
+            feedback = await self.invoke_structured(prompt, FinalFeedback, prefix)
+            if feedback is not None:
+                return self._merge_state(feedback, state)
+        response = await self.invoke_llm(prompt, prefix)
         return self._parse_feedback(response, state)
 
     def _generate(self, state: InterviewState) -> FinalFeedback:
         prompt = self._build_prompt(state)
-        response = self.invoke_llm_sync(prompt)
+        prefix = self._build_prefix(state)
+        if settings.llm_structured_output:
+            feedback = self.invoke_structured_sync(prompt, FinalFeedback, prefix)
+            if feedback is not None:
+                return self._merge_state(feedback, state)
+        response = self.invoke_llm_sync(prompt, prefix)
         return self._parse_feedback(response, state)
 
+    async def update_draft(self, state: InterviewState, draft: EvaluationDraft) -> EvaluationDraft:
+        """Вернуть черновик, дополненный ходами после draft.turns_folded.
+
+        Если ответ не распарсился, поднимает ValueError: сессия сбрасывает
+        черновик, и финальная оценка идёт по всей истории.
+        """
+        turns = state.get("turns", [])
+        new_turns = turns[draft.turns_folded:]
+        if not new_turns:
+            return draft
+
+        prompt = get_evaluator_draft_prompt(
+            draft=format_evaluation_draft(draft),
+            new_turns="\n".join(render_evaluator_turn(t) for t in new_turns),
+        )
+        prefix = get_evaluator_draft_prefix(state.get("position", ""), state.get("grade", ""))
+        response = await self.invoke_llm(prompt, prefix)
+        try:
+            match = re.search(r"\{[\s\S]*\}", response)
+            data = self._parse_json_robust(match.group() if match else response)
+            gaps = [
+                KnowledgeGap(
+                    topic=g.get("topic", "Unknown"),
+                    question_asked=g.get("question_asked", ""),
+                    candidate_answer=g.get("candidate_answer", ""),
+                    correct_answer=g.get("correct_answer", ""),
+                    severity=g.get("severity", "medium"),
+                )
+                for g in data.get("knowledge_gaps", [])
+            ]
+            evidence = {skill: list(items) for skill, items in draft.skill_evidence.items()}
+            for item in data.get("skill_evidence", []):
+                if item.get("skill"):
+                    evidence.setdefault(item["skill"], []).append(item.get("evidence", ""))
+            return EvaluationDraft(
+                turns_folded=len(turns),
+                knowledge_gaps=draft.knowledge_gaps + gaps,
+                skill_evidence=evidence,
+                summary=data.get("summary") or draft.summary,
+            )
+        except (TypeError, AttributeError) as e:
+            raise ValueError(f"Черновик оценки не разобран: {e}") from e
+
+    def _build_prefix(self, state: InterviewState) -> str:
+        return get_evaluator_prefix(
+            state.get("position", ""), state.get("grade", ""), state.get("experience", "")
+        )
+
     def _build_prompt(self, state: InterviewState) -> str:
         behavior_stats = {
             "evasion_count": state.get("evasion_count", 0),
@@ -72,15 +142,22 @@ class EvaluatorAgent(BaseAgent):
                 "red_flags": soft_tracker.red_flags if hasattr(soft_tracker, 'red_flags') else [],
             }
 
+        draft = state.get("evaluation_draft")
+        if draft is not None and draft.turns_folded:
+            rest = state.get("turns", [])[draft.turns_folded:]
+            history = "\n".join(render_evaluator_turn(t) for t in rest) or "Все ходы учтены в черновике."
+            draft_text = format_evaluation_draft(draft)
+        else:
+            history = self._build_history(state)
+            draft_text = None
+
         return get_evaluator_prompt(
-            position=state.get("position", ""),
-            target_grade=state.get("grade", ""),
-            experience=state.get("experience", ""),
-            conversation_history=self._build_history(state),
             skill_scores=state.get("skill_scores", {}),
             total_turns=len(state.get("turns", [])),
+            conversation_history=history,
             behavior_stats=behavior_stats,
             soft_skills_data=soft_skills_data,
+            evaluation_draft=draft_text,
         )
 
     def _build_history(self, state: InterviewState) -> str:
@@ -88,15 +165,7 @@ class EvaluatorAgent(BaseAgent):
         if not turns:
             return "Интервью не содержит диалогов."
 
-        parts = []
-        for turn in turns:
-            parts.extend([
-                f"[Ход {turn.turn_id}]",
-                f"Интервьюер: {turn.agent_visible_message}",
-                f"Кандидат: {turn.user_message}",
-                "",
-            ])
-        return "\n".join(parts)
+        return full_transcript(state)
 
     def _parse_json_robust(self, raw: str) -> dict:
         """Парсинг JSON с попыткой исправить типичные ошибки LLM."""
@@ -115,6 +184,29 @@ class EvaluatorAgent(BaseAgent):
 
         raise json.JSONDecodeError("Не удалось распарсить JSON после исправлений", raw, 0)
 
+    @staticmethod
+    def _merge_state(feedback: FinalFeedback, state: InterviewState) -> FinalFeedback:
+        """Дополнить ответ по схеме из состояния, как _parse_feedback дополняет текстовый.
+
+        Поля, которых модель не прислала (счётчики поведения, target_grade),
+        берутся из состояния, а не из значений по умолчанию схемы.
+        """
+        behavior = feedback.behavior
+        sent = behavior.model_fields_set if "behavior" in feedback.model_fields_set else set()
+        counters = {
+            name: state.get(name, 0)
+            for name in ("evasion_count", "hallucination_count", "confident_nonsense_count", "hints_used")
+            if name not in sent
+        }
+        decision = feedback.decision
+        if "target_grade" not in decision.model_fields_set:
+            decision = decision.model_copy(update={"target_grade": state.get("grade", "")})
+        return feedback.model_copy(update={
+            "decision": decision,
+            "behavior": behavior.model_copy(update=counters),
+            "total_turns": len(state.get("turns", [])),
+        })
+
     def _parse_feedback(self, response: str, state: InterviewState) -> FinalFeedback:
         """Распарсить JSON-фидбэк из ответа LLM."""
         try:
@@ -202,6 +294,7 @@ class EvaluatorAgent(BaseAgent):
 
     def _fallback_feedback(self, state: InterviewState, error: str) -> FinalFeedback:
         """Создать fallback-фидбэк при ошибке парсинга."""
+        self.parse_failures += 1
         return FinalFeedback(
             decision=Decision(
                 assessed_grade=state.get("grade", "Junior"),
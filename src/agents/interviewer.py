@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import Any
 
 from langchain_core.language_models import BaseChatModel
@@ -10,15 +11,147 @@ from src.agents.base import BaseAgent
 from src.config import settings
 from src.constants import QUALITY_GOOD
 from src.models.state import InterviewState
+from src.models.transcript import dialog_window
 from src.prompts.interviewer import (
     GREETING_TEMPLATE,
     INTERVIEWER_SYSTEM_PROMPT,
+    get_interviewer_prefix,
     get_interviewer_prompt,
 )
 from src.topics import get_topics_for_position
 
 _META_PREFIXES = ("##", "**", "[", "observer:", "interviewer:", "инструкция:", "задача:", "фаза:")
 _META_KEYWORDS = ("internal thought", "внутренние мысли", "правила:", "контекст:")
+_STREAM_HOLD_CHARS = 24
+
+
+def _has_meta_keyword(text: str) -> bool:
+    lower = text.lower()
+    return any(kw in lower for kw in _META_KEYWORDS)
+
+
+def _is_meta_line(line: str) -> bool:
+    lower = line.lower().strip()
+    return lower.startswith(_META_PREFIXES) or _has_meta_keyword(lower)
+
+
+# Сколько символов показанной строки придерживать, чтобы ключевое слово не ушло целиком.
+_KEYWORD_TAIL = max(map(len, _META_KEYWORDS)) - 1
+
+
+class _MetaLineFilter:
+    """Инкрементальный фильтр мета-строк для потокового ответа LLM.
+
+    Строка придерживается до перевода строки или пока в ней не наберётся
+    _STREAM_HOLD_CHARS символов без мета-префикса и ключевых слов; после этого
+    строка идёт сразу, кроме хвоста длиной с ключевое слово. Если ключевое
+    слово всё же появилось дальше в строке, остаток строки не выдаётся,
+    leaked = True, а text — итог без этой строки, как у _clean_message.
+    Пустые строки выдаются только перед следующей непустой, поэтому склейка
+    вывода совпадает с _clean_message, пока leaked = False.
+    """
+
+    __slots__ = (
+        "_line", "_committed", "_pending_blank", "_started",
+        "_shown", "_suppressed", "_rollback", "_text", "leaked",
+    )
+
+    def __init__(self):
+        self._line = ""
+        self._committed = False
+        self._pending_blank: list[str] = []
+        self._started = False
+        self._shown = ""
+        self._suppressed = False
+        self._rollback: tuple[int, list[str], bool] | None = None
+        self._text = ""
+        self.leaked = False
+
+    @property
+    def text(self) -> str:
+        """Очищенный текст всего ответа (уже выданное без строк, оказавшихся мета)."""
+        return self._text.strip()
+
+    def feed(self, chunk: str) -> str:
+        """Принять кусок текста, вернуть то, что уже можно показать."""
+        parts = []
+        self._line += chunk
+        while True:
+            if self._committed:
+                head, sep, rest = self._line.partition("\n")
+                if not self._suppressed:
+                    if _has_meta_keyword(self._shown + head):
+                        self._suppress()
+                    else:
+                        safe = head if sep else head[:max(0, len(head) - _KEYWORD_TAIL)]
+                        parts.append(self._emit(safe))
+                        self._shown += safe
+                        head = head[len(safe):]
+                if not sep:
+                    self._line = "" if self._suppressed else head
+                    break
+                self._line = rest
+                self._end_line()
+                continue
+            if "\n" in self._line:
+                line, self._line = self._line.split("\n", 1)
+                parts.append(self._emit(self._complete(line)))
+                continue
+            if len(self._line.strip()) >= _STREAM_HOLD_CHARS and not _is_meta_line(self._line):
+                self._rollback = (len(self._text), list(self._pending_blank), self._started)
+                shown = len(self._line) - _KEYWORD_TAIL
+                self._shown, self._line = self._line[:shown], self._line[shown:]
+                parts.append(self._emit(self._open(self._shown)))
+                self._committed = True
+            break
+        return "".join(parts)
+
+    def flush(self) -> str:
+        """Завершить поток и вернуть остаток."""
+        line, self._line = self._line, ""
+        if not self._committed:
+            return self._emit(self._complete(line))
+        if not self._suppressed and _has_meta_keyword(self._shown + line):
+            self._suppress()
+        text = "" if self._suppressed else self._emit(line)
+        self._end_line()
+        return text
+
+    def _emit(self, text: str) -> str:
+        self._text += text
+        return text
+
+    def _suppress(self) -> None:
+        """Показанная строка оказалась мета: убрать её из text и не выдавать остаток."""
+        self._suppressed = True
+        self.leaked = True
+        length, blanks, started = self._rollback
+        self._text = self._text[:length]
+        self._pending_blank = blanks
+        self._started = started
+
+    def _end_line(self) -> None:
+        self._committed = False
+        self._suppressed = False
+        self._shown = ""
+        self._rollback = None
+
+    def _complete(self, line: str) -> str:
+        if _is_meta_line(line):
+            return ""
+        if not line.strip():
+            if self._started:
+                self._pending_blank.append(line)
+            return ""
+        return self._open(line)
+
+    def _open(self, line: str) -> str:
+        if not self._started:
+            self._started = True
+            return line.lstrip()
+        text = "".join(f"\n{blank}" for blank in self._pending_blank) + "\n" + line
+        self._pending_blank.clear()
+        return text
 
 
 class InterviewerAgent(BaseAgent):
@@ -27,8 +160,11 @@ class InterviewerAgent(BaseAgent):
     НЕ проверяет факты (Observer) и НЕ принимает решение о найме (Evaluator).
     """
 
-    def __init__(self, llm: BaseChatModel):
-        super().__init__(llm, "Interviewer")
+    def __init__(self, llm: BaseChatModel, fallback_llm: BaseChatModel | None = None):
+        super().__init__(llm, "Interviewer", fallback_llm)
+        # Очищенный текст последнего stream_draft: может отличаться от склейки
+        # кусков, если фильтр вырезал мета-строку после начала показа.
+        self.streamed_message = ""
 
     def get_system_prompt(self) -> str:
         return INTERVIEWER_SYSTEM_PROMPT
@@ -42,18 +178,36 @@ class InterviewerAgent(BaseAgent):
     async def _generate_message_async(self, state: InterviewState) -> dict[str, Any]:
         if not state.get("turns"):
             return self._greeting_response(state)
-
-        prompt = self._build_prompt(state)
-        message = await self.invoke_llm(prompt)
-        return self._format_response(state, self._clean_message(message))
+        return self.finalize(state, await self.draft(state))
 
     def _generate_message(self, state: InterviewState) -> dict[str, Any]:
         if not state.get("turns"):
             return self._greeting_response(state)
-
-        prompt = self._build_prompt(state)
-        message = self.invoke_llm_sync(prompt)
-        return self._format_response(state, self._clean_message(message))
+        return self.finalize(state, self.draft_sync(state))
+
+    async def draft(self, state: InterviewState) -> str:
+        """Сгенерировать очищенный текст реплики без обновления состояния."""
+        message = await self.invoke_llm(self._build_prompt(state), self._build_prefix(state))
+        return self._clean_message(message)
+
+    def draft_sync(self, state: InterviewState) -> str:
+        """Синхронная версия draft."""
+        message = self.invoke_llm_sync(self._build_prompt(state), self._build_prefix(state))
+        return self._clean_message(message)
+
+    async def stream_draft(self, state: InterviewState) -> AsyncIterator[str]:
+        """Потоковая версия draft: отдаёт очищенный текст по мере генерации."""
+        meta_filter = _MetaLineFilter()
+        async for chunk in self.stream_llm(self._build_prompt(state), self._build_prefix(state)):
+            if text := meta_filter.feed(chunk):
+                yield text
+        if tail := meta_filter.flush():
+            yield tail
+        self.streamed_message = meta_filter.text
+
+    def finalize(self, state: InterviewState, message: str) -> dict[str, Any]:
+        """Оформить готовый текст реплики как обновление состояния."""
+        return self._format_response(state, message)
 
     def _greeting_response(self, state: InterviewState) -> dict[str, Any]:
         message = GREETING_TEMPLATE.format(position=state.get("position", "Developer"))
@@ -63,6 +217,11 @@ class InterviewerAgent(BaseAgent):
             "internal_thoughts_buffer": state.get("internal_thoughts_buffer", []) + [thoughts],
         }
 
+    def _build_prefix(self, state: InterviewState) -> str:
+        position = state.get("position", "")
+        topic_names = tuple(topic.name for topic in get_topics_for_position(position).values())
+        return get_interviewer_prefix(position, state.get("grade", ""), state.get("experience", ""), topic_names)
+
     def _build_prompt(self, state: InterviewState) -> str:
         observer_analysis = state.get("current_observer_analysis")
         instruction = (
@@ -105,7 +264,6 @@ class InterviewerAgent(BaseAgent):
         return get_interviewer_prompt(
             position=position,
             grade=state.get("grade", ""),
-            experience=state.get("experience", ""),
             covered_topics=covered,
             skipped_topics=skipped,
             candidate_mentioned=state.get("candidate_mentioned", []),
@@ -142,28 +300,20 @@ class InterviewerAgent(BaseAgent):
         if not turns:
             return "Начало интервью"
 
-        parts = []
-        for turn in turns[-settings.context_window_size:]:
-            parts.append(f"Интервьюер: {turn.agent_visible_message}")
-            parts.append(f"Кандидат: {turn.user_message}")
+        history = dialog_window(state, settings.context_window_size)
 
         current_msg = state.get("current_user_message", "")
-        if current_msg and (not turns or turns[-1].user_message != current_msg):
-            parts.append(f"Кандидат: {current_msg}")
+        if current_msg and turns[-1].user_message != current_msg:
+            history += f"\nКандидат: {current_msg}"
 
-        return "\n".join(parts)
+        return history
 
     def _clean_message(self, message: str) -> str:
         """Отфильтровать мета-текст из ответа LLM."""
-        lines = []
-        for line in message.strip().split("\n"):
-            lower = line.lower().strip()
-            if lower.startswith(_META_PREFIXES):
-                continue
-            if any(kw in lower for kw in _META_KEYWORDS):
-                continue
-            lines.append(line)
-        return "\n".join(lines).strip()
+        meta_filter = _MetaLineFilter()
+        meta_filter.feed(message)
+        meta_filter.flush()
+        return meta_filter.text
 
     def _generate_thoughts(self, state: InterviewState) -> str:
         analysis = state.get("current_observer_analysis")
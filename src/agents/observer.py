@@ -18,14 +18,24 @@ from src.constants import (
     QUALITY_POOR,
 )
 from src.models.state import InterviewState, ObserverAnalysis, SkillScore, SoftSkillsTracker
-from src.prompts.observer import OBSERVER_SYSTEM_PROMPT, get_observer_prompt
+from src.models.transcript import dialog_window
+from src.prompts.observer import OBSERVER_SYSTEM_PROMPT, get_observer_prefix, get_observer_prompt
+from src.skills import canonical_skills
+from src.utils.partial_json import PartialJSONParser
 
 
 class ObserverAgent(BaseAgent):
-    """Анализирует ответы кандидата и даёт инструкции Interviewer."""
+    """Анализирует ответы кандидата и даёт инструкции Interviewer.
 
-    def __init__(self, llm: BaseChatModel):
-        super().__init__(llm, "Observer")
+    При OBSERVER_EARLY_STOP ответ читается потоком и разбирается по мере
+    поступления: если поле из начала JSON уже означает конец интервью
+    (стоп, лимит спама или уклонений), остаток ответа не дожидается —
+    анализ собирается из полученных полей, счётчик early_stops растёт.
+    """
+
+    def __init__(self, llm: BaseChatModel, fallback_llm: BaseChatModel | None = None):
+        super().__init__(llm, "Observer", fallback_llm)
+        self.early_stops = 0
 
     def get_system_prompt(self) -> str:
         return OBSERVER_SYSTEM_PROMPT
@@ -42,22 +52,73 @@ class ObserverAgent(BaseAgent):
             return {}
 
         prompt = self._build_prompt(state)
-        response = await self.invoke_llm(prompt)
+        prefix = self._build_prefix(state)
+        if settings.llm_structured_output:
+            analysis = await self.invoke_structured(prompt, ObserverAnalysis, prefix)
+            if analysis is not None:
+                return self.apply_analysis(state, analysis)
+        if settings.observer_early_stop:
+            return await self._analyze_streaming(state, prompt, prefix)
+        response = await self.invoke_llm(prompt, prefix)
         return self._process_response(state, response)
 
+    async def _analyze_streaming(self, state: InterviewState, prompt: str, prefix: str) -> dict[str, Any]:
+        stop = False
+
+        def on_field(key: str, value: Any) -> None:
+            nonlocal stop
+            stop = stop or self._ends_interview(state, key, value)
+
+        parser = PartialJSONParser(on_field)
+        chunks = []
+        stream = self.stream_llm(prompt, prefix)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                parser.feed(chunk)
+                if stop:
+                    break
+        finally:
+            await stream.aclose()
+
+        if not stop or parser.done:
+            return self._process_response(state, "".join(chunks))
+        self.early_stops += 1
+        fields = dict(parser.fields)
+        fields.setdefault("thoughts", "Решение о завершении принято по началу ответа, остаток не ждали.")
+        return self.apply_analysis(state, self._parse_analysis(json.dumps(fields)))
+
+    def _ends_interview(self, state: InterviewState, key: str, value: Any) -> bool:
+        """Завершает ли интервью уже полученное поле ответа Observer."""
+        if value is not True:
+            return False
+        if key == "wants_to_end_interview":
+            return True
+        if key == "is_spam_or_troll":
+            return state.get("spam_count", 0) + 1 >= settings.max_spam_count
+        if key == "is_evasive":
+            return state.get("evasion_count", 0) + 1 >= settings.max_evasion_count
+        return False
+
     def _analyze(self, state: InterviewState) -> dict[str, Any]:
         user_answer = state.get("current_user_message", "")
         if not user_answer:
             return {}
 
         prompt = self._build_prompt(state)
-        response = self.invoke_llm_sync(prompt)
+        prefix = self._build_prefix(state)
+        if settings.llm_structured_output:
+            analysis = self.invoke_structured_sync(prompt, ObserverAnalysis, prefix)
+            if analysis is not None:
+                return self.apply_analysis(state, analysis)
+        response = self.invoke_llm_sync(prompt, prefix)
         return self._process_response(state, response)
 
+    def _build_prefix(self, state: InterviewState) -> str:
+        return get_observer_prefix(state.get("position", ""), state.get("grade", ""))
+
     def _build_prompt(self, state: InterviewState) -> str:
         return get_observer_prompt(
-            position=state.get("position", ""),
-            grade=state.get("grade", ""),
             current_question=state.get("current_agent_message", ""),
             user_answer=state.get("current_user_message", ""),
             conversation_history=self._build_history(state),
@@ -68,13 +129,22 @@ class ObserverAgent(BaseAgent):
         )
 
     def _process_response(self, state: InterviewState, response: str) -> dict[str, Any]:
-        analysis = self._parse_analysis(response)
+        return self.apply_analysis(state, self._parse_analysis(response))
 
+    def apply_analysis(self, state: InterviewState, analysis: ObserverAnalysis) -> dict[str, Any]:
+        """Обновления состояния по готовому анализу ответа."""
         user_message = state.get("current_user_message", "")
         if self._check_user_stop_intent(user_message):
             analysis.wants_to_end_interview = True
             analysis.instruction_to_interviewer = "Кандидат хочет завершить. Заверши интервью."
 
+        position = state.get("position", "")
+        known = [*state.get("skill_scores", {}), *state.get("covered_topics", []), *state.get("skipped_topics", [])]
+        analysis.detected_skills = canonical_skills(position, analysis.detected_skills, known)
+        if analysis.current_topic:
+            topic = canonical_skills(position, [analysis.current_topic], known)
+            analysis.current_topic = topic[0] if topic else analysis.current_topic
+
         skill_scores = self._update_skill_scores(state.get("skill_scores", {}), analysis)
         new_difficulty = self._calculate_difficulty(state.get("current_difficulty", 1), analysis)
 
@@ -172,11 +242,7 @@ class ObserverAgent(BaseAgent):
         if not turns:
             return "Начало интервью"
 
-        parts = []
-        for turn in turns[-settings.context_window_size:]:
-            parts.append(f"Интервьюер: {turn.agent_visible_message}")
-            parts.append(f"Кандидат: {turn.user_message}")
-        return "\n".join(parts)
+        return dialog_window(state, settings.context_window_size)
 
     def _parse_analysis(self, response: str) -> ObserverAnalysis:
         """Извлечь и распарсить JSON из ответа LLM."""
@@ -222,6 +288,7 @@ class ObserverAgent(BaseAgent):
                 mentioned_info=data.get("mentioned_info", []),
             )
         except (json.JSONDecodeError, KeyError, AttributeError, ValueError, TypeError) as e:
+            self.parse_failures += 1
             return ObserverAnalysis(
                 wants_to_end_interview=False,
                 wants_to_skip=False,
@@ -0,0 +1,162 @@
+"""Локальная предклассификация ответа кандидата без вызова LLM."""
+
+from __future__ import annotations
+
+import re
+from typing import Literal
+
+from src.constants import QUALITY_POOR
+from src.models.state import ObserverAnalysis
+
+PreClassifierMode = Literal["off", "on", "shadow"]
+Label = Literal["stop", "skip", "spam"]
+
+# Только однозначные формы: одиночные «дальше», «всё», «next», «feedback» могут
+# быть ответом по существу, их разбирает Observer.
+_STOP_PHRASES = frozenset({
+    "стоп", "stop", "хватит", "закончим", "давай закончим", "заканчиваем", "завершаем",
+    "на этом всё", "на этом все", "все, хватит",
+    "дай фидбэк", "давай фидбэк", "дай фидбек", "давай фидбек",
+    "give me feedback", "i'm done", "im done",
+})
+_SKIP_PHRASES = frozenset({
+    "не знаю", "я не знаю", "без понятия", "не помню", "пропустим", "пропусти",
+    "давай дальше", "следующий вопрос", "skip",
+    "i don't know", "i dont know", "idk",
+})
+_WORD = re.compile(r"\w+")
+_PUNCT = re.compile(r"[^\w\s']+")
+# Длина реплики из одних знаков, которая ещё считается вопросом кандидата.
+_SHORT_QUESTION = 3
+
+
+def _normalize(message: str) -> str:
+    text = _PUNCT.sub(" ", message.casefold().replace("ё", "е"))
+    return " ".join(text.split())
+
+
+_STOP = frozenset(_normalize(p) for p in _STOP_PHRASES)
+_SKIP = frozenset(_normalize(p) for p in _SKIP_PHRASES)
+
+
+def _is_spam(message: str) -> bool:
+    """Пустой ввод, ввод без букв и цифр или одна буква, повторённая много раз.
+
+    Короткий вопрос из знаков («?», «?!») и ответ из одних цифр («100000»)
+    спамом не считаются — их разбирает Observer.
+    """
+    stripped = message.strip()
+    if not _WORD.search(stripped):
+        return not ("?" in stripped and len(stripped) <= _SHORT_QUESTION)
+    letters = [c for c in stripped.casefold() if c.isalnum()]
+    if all(c.isdigit() for c in letters):
+        return False
+    return len(letters) >= 6 and len(set(letters)) <= 2
+
+
+def classify(message: str) -> Label | None:
+    """Метка хода, если она очевидна по правилам, иначе None.
+
+    Срабатывает только на точное совпадение всей реплики с фразой из словаря
+    (без учёта регистра, «ё» и знаков препинания) или на явный мусор.
+    """
+    if _is_spam(message):
+        return "spam"
+    text = _normalize(message)
+    if text in _STOP:
+        return "stop"
+    if text in _SKIP:
+        return "skip"
+    return None
+
+
+def build_analysis(label: Label, current_topic: str = "") -> ObserverAnalysis:
+    """ObserverAnalysis для хода, разобранного без LLM.
+
+    current_topic — тема текущего вопроса: при пропуске она попадает в skipped_topics.
+    """
+    if label == "stop":
+        return ObserverAnalysis(
+            wants_to_end_interview=True,
+            instruction_to_interviewer="Кандидат хочет завершить. Заверши интервью.",
+            thoughts="Явная просьба завершить, анализ без LLM.",
+        )
+    if label == "skip":
+        return ObserverAnalysis(
+            wants_to_skip=True,
+            current_topic=current_topic,
+            answer_quality=QUALITY_POOR,
+            showed_honesty=True,
+            instruction_to_interviewer="Кандидат не знает ответа. Не объясняй, перейди к другой теме.",
+            thoughts="Явная просьба пропустить вопрос, анализ без LLM.",
+        )
+    return ObserverAnalysis(
+        is_spam_or_troll=True,
+        is_valid_answer=False,
+        answer_quality=1,
+        clarity_score=1,
+        instruction_to_interviewer="Ответ пустой или бессмысленный. Вежливо попроси ответить по существу.",
+        thoughts="Пустой или бессмысленный ввод, анализ без LLM.",
+    )
+
+
+def analysis_label(analysis: ObserverAnalysis | None) -> Label | None:
+    """Та же метка по анализу LLM Observer — для сравнения в режиме shadow."""
+    if analysis is None:
+        return None
+    if analysis.wants_to_end_interview:
+        return "stop"
+    if analysis.is_spam_or_troll:
+        return "spam"
+    if analysis.wants_to_skip:
+        return "skip"
+    return None
+
+
+class PreClassifier:
+    """Правила перед вызовом Observer и их статистика.
+
+    В режиме on очевидный ход (стоп, пропуск, спам) разбирается локально и
+    LLM Observer не вызывается. В режиме shadow Observer вызывается всегда,
+    а метка правил только сравнивается с его анализом: agreed / disagreed —
+    совпадения и расхождения на сработавших правилах, missed — ходы, где
+    Observer вызывался и поставил метку, а правила промолчали.
+    """
+
+    __slots__ = ("mode", "turns", "hits", "agreed", "disagreed", "missed")
+
+    def __init__(self, mode: PreClassifierMode):
+        self.mode = mode
+        self.turns = 0
+        self.hits = 0
+        self.agreed = 0
+        self.disagreed = 0
+        self.missed = 0
+
+    def observe(self, message: str) -> Label | None:
+        """Классифицировать ход и учесть его в статистике."""
+        self.turns += 1
+        label = classify(message)
+        if label is not None:
+            self.hits += 1
+        return label
+
+    def compare(self, label: Label | None, analysis: ObserverAnalysis | None) -> None:
+        """Сверить метку правил с анализом LLM Observer."""
+        expected = analysis_label(analysis)
+        if label is None:
+            if expected is not None:
+                self.missed += 1
+        elif label == expected:
+            self.agreed += 1
+        else:
+            self.disagreed += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "turns": self.turns,
+            "hits": self.hits,
+            "agreed": self.agreed,
+            "disagreed": self.disagreed,
+            "missed": self.missed,
+        }
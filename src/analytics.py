@@ -0,0 +1,203 @@
+"""Сводная аналитика по интервью: векторные агрегаты на NumPy.
+
+Сессии читаются из каталога логов (src.utils.catalog) или потоком из файлов
+логов пачками и складываются в колоночные массивы. Группировки считаются
+через np.unique и np.bincount, без цикла по сессиям.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "Для аналитики нужен numpy: pip install 'interview-coach[analytics]'"
+    ) from e
+
+from src.utils.catalog import get_catalog, iter_log_entries
+
+TEXT_COLUMNS = ("position", "grade", "assessed_grade", "recommendation", "finish_reason")
+SOFT_SKILLS = ("clarity", "honesty", "engagement", "problem_solving")
+NUMERIC_COLUMNS = ("turns", "hallucination_count", "evasion_count", "duration_s", *SOFT_SKILLS)
+COLUMNS = TEXT_COLUMNS + NUMERIC_COLUMNS
+
+# Порядок строк и столбцов матрицы грейдов; остальные грейды идут после, по алфавиту.
+GRADE_ORDER = ("intern", "junior", "middle", "senior", "lead")
+
+_BATCH = 10_000
+
+Columns = dict[str, np.ndarray]
+
+
+def _to_columns(batches: Iterable[list[tuple]]) -> Columns:
+    """Колоночные массивы из пачек строк в порядке COLUMNS; NULL — «» или NaN."""
+    parts: dict[str, list[np.ndarray]] = {name: [] for name in COLUMNS}
+    for batch in batches:
+        for name, values in zip(COLUMNS, zip(*batch)):
+            if name in TEXT_COLUMNS:
+                parts[name].append(np.array([v or "" for v in values], dtype=str))
+            else:
+                parts[name].append(np.array(values, dtype=float))
+    return {
+        name: np.concatenate(chunks) if chunks else np.empty(0, dtype=str if name in TEXT_COLUMNS else float)
+        for name, chunks in parts.items()
+    }
+
+
+def load_catalog(log_dir: Path) -> Columns:
+    """Колонки всех сессий из каталога логов."""
+    return _to_columns(get_catalog(log_dir).rows(COLUMNS, batch=_BATCH))
+
+
+def load_logs(log_dir: Path) -> Columns:
+    """Колонки всех сессий, прочитанные прямо из файлов логов."""
+
+    def batches() -> Iterator[list[tuple]]:
+        entries = iter_log_entries(log_dir)
+        while batch := list(islice(entries, _BATCH)):
+            yield [tuple(getattr(entry, name) for name in COLUMNS) for entry in batch]
+
+    return _to_columns(batches())
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.full(num.shape, np.nan), where=den > 0)
+
+
+def _round(value: float, digits: int = 3) -> float | None:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def behavior_by_position(cols: Columns) -> list[dict[str, Any]]:
+    """Галлюцинации и уклонения по позициям: на ход и доля сессий, где они были."""
+    labels, index = np.unique(cols["position"], return_inverse=True)
+    n = len(labels)
+    sessions = np.bincount(index, minlength=n)
+    turns = np.bincount(index, weights=cols["turns"], minlength=n)
+    rows = {"position": labels.tolist(), "sessions": sessions.tolist()}
+    for name, column in (("hallucination", "hallucination_count"), ("evasion", "evasion_count")):
+        counts = cols[column]
+        rows[f"{name}s_per_turn"] = _ratio(np.bincount(index, weights=counts, minlength=n), turns)
+        rows[f"sessions_with_{name}"] = _ratio(np.bincount(index, weights=counts > 0, minlength=n), sessions)
+    return [
+        {key: (_round(values[i]) if isinstance(values, np.ndarray) else values[i]) for key, values in rows.items()}
+        for i in range(n)
+    ]
+
+
+def _grade_key(label: str) -> tuple[int, str]:
+    folded = label.casefold()
+    return (GRADE_ORDER.index(folded) if folded in GRADE_ORDER else len(GRADE_ORDER), folded)
+
+
+def _canonical_grade(label: str) -> str:
+    """«junior », «JUNIOR» → «Junior»; грейды вне GRADE_ORDER — без лишних пробелов."""
+    folded = label.casefold().strip()
+    return folded.capitalize() if folded in GRADE_ORDER else " ".join(label.split())
+
+
+def grade_confusion(cols: Columns) -> dict[str, Any]:
+    """Матрица «заявленный грейд × оценённый» по сессиям с оценкой.
+
+    Написания грейда сводятся к одному (_canonical_grade) до группировки.
+    """
+    assessed = cols["assessed_grade"]
+    mask = assessed != ""
+    target, assessed = cols["grade"][mask], assessed[mask]
+    raw, inverse = np.unique(np.concatenate([target, assessed]), return_inverse=True)
+    labels, remap = np.unique(np.array([_canonical_grade(str(r)) for r in raw], dtype=str), return_inverse=True)
+    inverse = remap[inverse]
+    order = sorted(range(len(labels)), key=lambda i: _grade_key(str(labels[i])))
+    rank = np.empty(len(labels), dtype=int)
+    rank[order] = np.arange(len(labels))
+    inverse = rank[inverse]
+    k, m = len(labels), len(target)
+    matrix = np.bincount(inverse[:m] * k + inverse[m:], minlength=k * k).reshape(k, k)
+    return {
+        "labels": labels[order].tolist(),
+        "matrix": matrix.tolist(),
+        "sessions": m,
+        "match_rate": _round(np.trace(matrix) / m) if m else None,
+    }
+
+
+def soft_skills_by_position(cols: Columns) -> list[dict[str, Any]]:
+    """Средние soft skills по позициям и по всем сессиям (без сессий без оценки)."""
+    labels, index = np.unique(cols["position"], return_inverse=True)
+    n = len(labels)
+    rows = [{"position": label, "sessions": 0} for label in labels.tolist()] + [{"position": "*", "sessions": 0}]
+    for skill in SOFT_SKILLS:
+        values = cols[skill]
+        scored = ~np.isnan(values)
+        counts = np.bincount(index[scored], minlength=n)
+        means = _ratio(np.bincount(index[scored], weights=values[scored], minlength=n), counts)
+        total = values[scored].mean() if scored.any() else np.nan
+        for row, mean, count in zip(rows, [*means, total], [*counts, scored.sum()]):
+            row[skill] = _round(mean, 2)
+            row["sessions"] = max(row["sessions"], int(count))
+    return rows
+
+
+def turns_to_finish(cols: Columns) -> dict[str, Any]:
+    """Распределение числа ходов до завершения интервью."""
+    turns = cols["turns"].astype(int)
+    if not len(turns):
+        return {"mean": None, "p50": None, "p90": None, "max": None, "histogram": {}}
+    histogram = np.bincount(turns)
+    p50, p90 = np.percentile(turns, [50, 90], method="inverted_cdf")
+    return {
+        "mean": _round(turns.mean(), 2),
+        "p50": int(p50),
+        "p90": int(p90),
+        "max": int(turns.max()),
+        "histogram": {str(t): int(c) for t, c in enumerate(histogram) if c},
+    }
+
+
+def build_report(cols: Columns) -> dict[str, Any]:
+    """Все агрегаты одним словарём (его же пишет --json)."""
+    return {
+        "sessions": len(cols["turns"]),
+        "behavior_by_position": behavior_by_position(cols),
+        "grade_confusion": grade_confusion(cols),
+        "soft_skills": soft_skills_by_position(cols),
+        "turns_to_finish": turns_to_finish(cols),
+    }
+
+
+def write_json(report: dict[str, Any], path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def write_csv(report: dict[str, Any], path: Path) -> Path:
+    """Отчёт в длинном формате: section, group, metric, value."""
+    rows: list[tuple[str, str, str, Any]] = []
+    for row in report["behavior_by_position"]:
+        rows.extend(("behavior", row["position"], key, value) for key, value in row.items() if key != "position")
+    confusion = report["grade_confusion"]
+    for target, counts in zip(confusion["labels"], confusion["matrix"]):
+        rows.extend(
+            ("grade_confusion", f"{target}->{assessed}", "sessions", count)
+            for assessed, count in zip(confusion["labels"], counts)
+        )
+    for row in report["soft_skills"]:
+        rows.extend(("soft_skills", row["position"], key, value) for key, value in row.items() if key != "position")
+    turns = report["turns_to_finish"]
+    rows.extend(("turns_to_finish", "", key, turns[key]) for key in ("mean", "p50", "p90", "max"))
+    rows.extend(("turns_to_finish", t, "sessions", count) for t, count in turns["histogram"].items())
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("section", "group", "metric", "value"))
+        writer.writerows(("" if v is None else v for v in row) for row in rows)
+    return path
@@ -0,0 +1,214 @@
+"""Бенчмарк задержек и пропускной способности сессий интервью.
+
+Гоняет InterviewSession по сценариям на офлайн-провайдере (scripted или
+replay) с заданной задержкой и пишет метрики в JSON для сравнения с базой.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+
+from src.agents.base import LLMAPIError
+from src.graph.interview_graph import InterviewSession
+from src.llm.limiter import queue_waits, reset_limiters
+from src.llm.offline import ReplayChatModel, ScriptedChatModel, get_cassette
+from src.scenarios import load_scenario
+from src.topics import normalize_position
+
+AGENT_TYPES = ("interviewer", "observer", "evaluator")
+
+# Метрики, где рост — это регрессия (для остальных регрессия — падение).
+_LOWER_IS_BETTER = (
+    "turn_latency_ms", "greeting_ms", "evaluator_ms", "queue_wait_ms", "peak_rss_mb", "wall_time_s",
+)
+
+
+@dataclass
+class _Samples:
+    turns: list[float] = field(default_factory=list)
+    greetings: list[float] = field(default_factory=list)
+    evaluator: list[float] = field(default_factory=list)
+    errors: int = 0
+    sessions: int = 0
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга, q в [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(-(-q * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _summary_ms(values: list[float]) -> dict[str, float]:
+    ms = [v * 1000 for v in values]
+    return {
+        "count": len(ms),
+        "mean": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50": round(percentile(ms, 50), 3),
+        "p95": round(percentile(ms, 95), 3),
+        "p99": round(percentile(ms, 99), 3),
+    }
+
+
+def peak_rss_mb() -> float | None:
+    """Пиковый RSS процесса в МБ (None, если платформа не даёт)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def build_llms(
+    provider: str,
+    latency_ms: float,
+    jitter_ms: float,
+    cassette: Path | None = None,
+    seed: int | None = 0,
+) -> dict[str, BaseChatModel]:
+    """Офлайн-клиенты LLM, общие для всех сессий бенчмарка."""
+    simulation = {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "seed": seed}
+    if provider == "scripted":
+        return {agent: ScriptedChatModel(**simulation) for agent in AGENT_TYPES}
+    if provider == "replay":
+        if cassette is None:
+            raise ValueError("Для replay нужен путь к кассете")
+        llm = ReplayChatModel(cassette=get_cassette(cassette), **simulation)
+        return {agent: llm for agent in AGENT_TYPES}
+    raise ValueError(f"Бенчмарк поддерживает только scripted и replay, не {provider}")
+
+
+async def _run_session(
+    metadata: dict,
+    messages: list[str],
+    llms: dict[str, BaseChatModel],
+    samples: _Samples,
+    incremental_evaluation: bool,
+) -> None:
+    session = InterviewSession(llms=llms, incremental_evaluation=incremental_evaluation)
+    position = normalize_position(metadata["position"]) or "Backend Developer"
+
+    start = time.perf_counter()
+    await session.ainitialize(metadata["name"], position, metadata["grade"], metadata["experience"])
+    samples.greetings.append(time.perf_counter() - start)
+
+    try:
+        finished = False
+        for message in messages:
+            start = time.perf_counter()
+            _, finished, _ = await session.aprocess_user_input(message)
+            if not finished:
+                samples.turns.append(time.perf_counter() - start)
+            else:
+                break
+        if not finished:
+            await session.afinish()
+    except LLMAPIError:
+        samples.errors += 1
+        return
+
+    samples.evaluator.extend(session.get_timings()["evaluator"])
+    samples.sessions += 1
+
+
+async def run_benchmark(
+    scenarios: list[tuple[dict, list[str]]],
+    llms: dict[str, BaseChatModel],
+    concurrency: int = 1,
+    repeat: int = 1,
+    incremental_evaluation: bool = False,
+) -> dict[str, Any]:
+    """Прогнать сценарии repeat раз с concurrency одновременных сессий."""
+    samples = _Samples()
+    semaphore = asyncio.Semaphore(concurrency)
+    reset_limiters()
+
+    async def bounded(metadata: dict, messages: list[str]) -> None:
+        async with semaphore:
+            await _run_session(metadata, messages, llms, samples, incremental_evaluation)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        bounded(metadata, messages)
+        for _ in range(repeat)
+        for metadata, messages in scenarios
+    ))
+    wall = time.perf_counter() - start
+
+    return {
+        "turn_latency_ms": _summary_ms(samples.turns),
+        "greeting_ms": _summary_ms(samples.greetings),
+        "evaluator_ms": _summary_ms(samples.evaluator),
+        "queue_wait_ms": _summary_ms(queue_waits()),
+        "sessions": samples.sessions,
+        "errors": samples.errors,
+        "wall_time_s": round(wall, 3),
+        "sessions_per_sec": round(samples.sessions / wall, 3) if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def load_scenarios(paths: list[Path]) -> list[tuple[dict, list[str]]]:
+    """Загрузить сценарии из файлов и каталогов (*.txt)."""
+    files: list[Path] = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.txt")) if path.is_dir() else [path])
+    scenarios = [load_scenario(f) for f in files]
+    return [(meta, msgs) for meta, msgs in scenarios if msgs]
+
+
+def _flatten(metrics: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in metrics.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, int | float) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_to_baseline(
+    metrics: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float = 0.1,
+) -> list[dict[str, Any]]:
+    """Сравнить метрики с базой; regression=True, если хуже больше чем на tolerance."""
+    current = _flatten(metrics)
+    base = _flatten(baseline)
+    rows = []
+    for name, value in current.items():
+        if name not in base or name.endswith(".count"):
+            continue
+        old = base[name]
+        delta = (value - old) / old if old else 0.0
+        worse = delta > tolerance if name.startswith(_LOWER_IS_BETTER) else delta < -tolerance
+        rows.append({
+            "metric": name,
+            "baseline": old,
+            "current": value,
+            "delta_pct": round(delta * 100, 1),
+            "regression": worse,
+        })
+    return rows
+
+
+def write_report(path: Path, config: dict[str, Any], metrics: dict[str, Any]) -> Path:
+    """Записать результат в JSON; metrics можно передать как baseline в следующий прогон."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({"config": config, "metrics": metrics}, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    return path
@@ -15,15 +15,44 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
-    llm_provider: Literal["mistral", "openai"] = "mistral"
+    llm_provider: Literal["mistral", "openai", "record", "replay", "scripted"] = "mistral"
     mistral_api_key: str | None = None
     openai_api_key: str | None = None
     llm_model: str = "mistral-large-latest"
 
+    llm_record_provider: Literal["mistral", "openai"] = "mistral"
+    llm_cassette_path: Path = Path("cassettes/llm_cassette.jsonl")
+    llm_replay_latency_ms: float = 0.0
+    llm_replay_jitter_ms: float = 0.0
+    llm_replay_error_rate: float = 0.0
+    llm_replay_seed: int | None = None
+
+    llm_max_attempts: int = 3
+    llm_retry_base_delay_s: float = 1.0
+    llm_retry_max_delay_s: float = 20.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_cooldown_s: float = 30.0
+    llm_fallback_provider: Literal["mistral", "openai"] | None = None
+    llm_fallback_model: str | None = None
+
+    llm_rate_limit_rpm: int = 0
+    llm_rate_limit_tpm: int = 0
+    llm_max_concurrency: int = 32
+    llm_rate_limits: dict[str, dict[str, int]] = {}
+
+    llm_http_max_connections: int = 100
+    llm_http_max_keepalive: int = 20
+    llm_http_keepalive_expiry_s: float = 30.0
+    llm_http_timeout_s: float = 120.0
+    llm_warmup: Literal["off", "connect", "preflight"] = "off"
+
     max_turns: int = 10
     default_difficulty: int = 1
     context_window_size: int = 5
     log_dir: Path = Path("logs")
+    log_fsync_interval_s: float = 1.0
+    log_flush_timeout_s: float = 10.0
+    log_catalog_enabled: bool = True
 
     max_spam_count: int = 3
     max_evasion_count: int = 5
@@ -36,5 +65,31 @@ class Settings(BaseSettings):
     temp_observer: float = 0.3
     temp_evaluator: float = 0.5
 
+    speculative_interviewer: bool = False
+    incremental_evaluation: bool = False
+
+    llm_prompt_cache: bool = True
+    llm_structured_output: bool = False
+    observer_early_stop: bool = False
+    observer_preclassifier: Literal["off", "on", "shadow"] = "off"
+
+    llm_price_input_per_1m: float = 0.0
+    llm_price_cached_input_per_1m: float | None = None
+    llm_price_output_per_1m: float = 0.0
+    session_token_budget: int = 0
+    session_cost_budget_usd: float = 0.0
+
+    llm_cache_enabled: bool = False
+    llm_cache_path: Path = Path(".cache/llm_cache.sqlite")
+    llm_cache_max_entries: int = 10_000
+    llm_cache_max_mb: float = 100.0
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+
+    server_host: str = "127.0.0.1"
+    server_port: int = 8080
+    session_idle_timeout: float = 1800.0
+    session_finished_ttl: float = 300.0
+    session_cleanup_interval: float = 60.0
+
 
 settings = Settings()
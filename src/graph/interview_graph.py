@@ -2,20 +2,42 @@
 
 from __future__ import annotations
 
-from typing import Literal
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable
+from typing import TYPE_CHECKING, Literal, TypeVar
 
-from langgraph.graph import END, StateGraph
+from langchain_core.language_models import BaseChatModel
+from pydantic import ValidationError
 
+from src.agents.base import LLMAPIError
 from src.agents.evaluator import EvaluatorAgent
 from src.agents.interviewer import InterviewerAgent
 from src.agents.observer import ObserverAgent
+from src.agents.preclassifier import Label, PreClassifier, PreClassifierMode, build_analysis
 from src.config import settings
-from src.llm.provider import get_llm_for_agent
-from src.models.state import InterviewState, SoftSkillsTracker, Turn
+from src.llm.provider import WarmupMode, get_fallback_llm_for_agent, get_llm_for_agent, warm_up
+from src.models.feedback import EvaluationDraft
+from src.models.state import (
+    InterviewState,
+    LLMAttempt,
+    ObserverAnalysis,
+    SoftSkillsTracker,
+    TokenUsage,
+    Turn,
+)
+from src.models.transcript import Transcript
+from src.skills import question_topic
+from src.utils.aio import run_sync
+
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
 
 
 def create_interview_graph() -> StateGraph:
     """Создать и скомпилировать граф workflow интервью."""
+    from langgraph.graph import END, StateGraph
+
     interviewer = InterviewerAgent(get_llm_for_agent("interviewer"))
     observer = ObserverAgent(get_llm_for_agent("observer"))
     evaluator = EvaluatorAgent(get_llm_for_agent("evaluator"))
@@ -40,6 +62,8 @@ def create_interview_graph() -> StateGraph:
             agent_visible_message=state.get("current_agent_message", ""),
             user_message=state.get("current_user_message", ""),
             internal_thoughts=thoughts,
+            analysis=state.get("current_observer_analysis"),
+            difficulty=state.get("current_difficulty"),
         )
 
         return {
@@ -76,34 +100,116 @@ def create_interview_graph() -> StateGraph:
     return graph.compile()
 
 
-class InterviewSession:
-    """Управляет потоком интервью с кешированными агентами."""
+T = TypeVar("T")
+
+FINISH_MESSAGE = "Спасибо за интервью! Вот ваш фидбэк:"
 
-    __slots__ = ("_state", "_interviewer", "_observer", "_evaluator", "_initialized")
 
-    def __init__(self):
+def instruction_class(analysis: ObserverAnalysis | None) -> str:
+    """Класс инструкции Observer: stop, skip, hallucination, question или continue."""
+    if analysis is None:
+        return "continue"
+    if analysis.wants_to_end_interview:
+        return "stop"
+    if analysis.wants_to_skip:
+        return "skip"
+    if analysis.is_hallucination:
+        return "hallucination"
+    if analysis.is_question_from_user:
+        return "question"
+    return "continue"
+
+
+class InterviewSession:
+    """Управляет потоком интервью с кешированными агентами.
+
+    Основной API асинхронный (ainitialize, aprocess_user_input, afinish);
+    синхронные методы выполняют его в общем фоновом event loop.
+    Через llms можно передать готовые клиенты LLM, общие для многих сессий.
+
+    В спекулятивном режиме Interviewer запускается параллельно с Observer
+    по анализу предыдущего хода. Черновик принимается, если новый анализ
+    не меняет класс инструкции, иначе отменяется и Interviewer вызывается заново.
+
+    Расход токенов ходу приписывается по приросту счётчиков агентов с прошлого
+    хода: вопрос Interviewer, который кандидат видел в этом ходе, плюс анализ
+    Observer. Финальный вызов Evaluator учитывается только в итоге сессии.
+    При превышении SESSION_TOKEN_BUDGET / SESSION_COST_BUDGET_USD интервью
+    сворачивается.
+
+    В инкрементальном режиме после каждого хода фоновая задача дополняет
+    черновик оценки (не больше одной задачи на сессию), а финальный вызов
+    Evaluator только уточняет черновик. Если ответ на обновление не разобрался,
+    черновик сбрасывается и финальная оценка идёт по всей истории.
+
+    Неудачные попытки вызовов LLM (повторы, переключения на резервный
+    провайдер) записываются в ход, как и расход токенов.
+
+    Предклассификатор (OBSERVER_PRECLASSIFIER) проверяет ответ правилами до
+    вызова Observer: в режиме on явный стоп, пропуск или спам разбираются
+    без LLM, в режиме shadow только сверяются с анализом Observer.
+
+    Прогрев (LLM_WARMUP): после приветствия фоновая задача создаёт остальных
+    агентов и открывает соединения с провайдером (connect) или отправляет
+    запрос на один токен (preflight), пока кандидат читает и печатает ответ.
+    """
+
+    __slots__ = (
+        "_llms", "_state", "_interviewer", "_observer", "_evaluator", "_initialized",
+        "_speculative", "_speculation_hits", "_speculation_misses", "_timings", "_usage_mark",
+        "_incremental", "_draft_task", "_draft_errors", "_preclassifier", "_warmup", "_warmup_task", "_warmup_stats",
+    )
+
+    def __init__(
+        self,
+        speculative: bool | None = None,
+        llms: dict[str, BaseChatModel] | None = None,
+        incremental_evaluation: bool | None = None,
+        preclassifier: PreClassifierMode | None = None,
+        warmup: WarmupMode | None = None,
+    ):
+        self._llms = llms or {}
         self._state: InterviewState | None = None
         self._interviewer: InterviewerAgent | None = None
         self._observer: ObserverAgent | None = None
         self._evaluator: EvaluatorAgent | None = None
         self._initialized = False
+        self._speculative = settings.speculative_interviewer if speculative is None else speculative
+        self._speculation_hits = 0
+        self._speculation_misses = 0
+        self._timings: dict[str, list[float]] = {"observer": [], "interviewer": [], "evaluator": []}
+        self._usage_mark: dict[str, TokenUsage] = {}
+        self._incremental = (
+            settings.incremental_evaluation if incremental_evaluation is None else incremental_evaluation
+        )
+        self._draft_task: asyncio.Task | None = None
+        self._draft_errors = 0
+        mode = settings.observer_preclassifier if preclassifier is None else preclassifier
+        self._preclassifier = PreClassifier(mode) if mode != "off" else None
+        self._warmup = settings.llm_warmup if warmup is None else warmup
+        self._warmup_task: asyncio.Task | None = None
+        self._warmup_stats: dict[str, int] | None = None
+
+    def _llm_for(self, agent_type: str) -> BaseChatModel:
+        """LLM агента: переданный в конструктор (общий для сессий) или новый."""
+        return self._llms.get(agent_type) or get_llm_for_agent(agent_type)
 
     @property
     def _cached_interviewer(self) -> InterviewerAgent:
         if self._interviewer is None:
-            self._interviewer = InterviewerAgent(get_llm_for_agent("interviewer"))
+            self._interviewer = InterviewerAgent(self._llm_for("interviewer"), get_fallback_llm_for_agent("interviewer"))
         return self._interviewer
 
     @property
     def _cached_observer(self) -> ObserverAgent:
         if self._observer is None:
-            self._observer = ObserverAgent(get_llm_for_agent("observer"))
+            self._observer = ObserverAgent(self._llm_for("observer"), get_fallback_llm_for_agent("observer"))
         return self._observer
 
     @property
     def _cached_evaluator(self) -> EvaluatorAgent:
         if self._evaluator is None:
-            self._evaluator = EvaluatorAgent(get_llm_for_agent("evaluator"))
+            self._evaluator = EvaluatorAgent(self._llm_for("evaluator"), get_fallback_llm_for_agent("evaluator"))
         return self._evaluator
 
     def initialize(
@@ -112,6 +218,24 @@ class InterviewSession:
         position: str,
         grade: str,
         experience: str,
+    ) -> str:
+        """Начать новую сессию интервью, вернуть приветствие."""
+        return run_sync(self.ainitialize(participant_name, position, grade, experience))
+
+    def process_user_input(self, user_message: str) -> tuple[str, bool, dict | None]:
+        """Обработать ввод пользователя, вернуть (ответ, завершено, фидбэк)."""
+        return run_sync(self.aprocess_user_input(user_message))
+
+    def finish(self) -> tuple[str, bool, dict | None]:
+        """Досрочно завершить интервью и сгенерировать фидбэк."""
+        return run_sync(self.afinish())
+
+    async def ainitialize(
+        self,
+        participant_name: str,
+        position: str,
+        grade: str,
+        experience: str,
     ) -> str:
         """Начать новую сессию интервью, вернуть приветствие."""
         initial_difficulty = self._get_initial_difficulty(grade)
@@ -122,6 +246,7 @@ class InterviewSession:
             grade=grade,
             experience=experience,
             turns=[],
+            transcript=Transcript(),
             current_turn_id=0,
             current_difficulty=initial_difficulty,
             covered_topics=[],
@@ -145,12 +270,14 @@ class InterviewSession:
             is_finished=False,
             finish_reason="",
             final_feedback=None,
+            evaluation_draft=None,
         )
 
-        result = self._cached_interviewer.process_sync(self._state)
-        self._state["current_agent_message"] = result.get("current_agent_message", "")
-        self._state["internal_thoughts_buffer"] = result.get("internal_thoughts_buffer", [])
+        result = await self._cached_interviewer.process(self._state)
+        self._apply_interviewer_result(result)
         self._initialized = True
+        if self._warmup != "off":
+            self._warmup_task = asyncio.create_task(self._warm_up())
 
         return self._state["current_agent_message"]
 
@@ -163,8 +290,78 @@ class InterviewSession:
             return 2
         return 1
 
-    def process_user_input(self, user_message: str) -> tuple[str, bool, dict | None]:
+    async def aprocess_user_input(self, user_message: str) -> tuple[str, bool, dict | None]:
         """Обработать ввод пользователя, вернуть (ответ, завершено, фидбэк)."""
+        self._begin_turn(user_message)
+
+        label, observer_result = self._preclassify(user_message)
+        speculation = None
+        if observer_result is None:
+            speculation = self._start_speculation(user_message) if self._speculative else None
+            try:
+                observer_result = await self._observe(label)
+            except BaseException:
+                if speculation is not None:
+                    self._discard_speculation(speculation)
+                raise
+        self._apply_observer_result(observer_result)
+        self._save_current_turn(user_message)
+
+        if self._should_finish():
+            if speculation is not None:
+                self._discard_speculation(speculation)
+            return await self.afinish()
+
+        self._schedule_draft_update()
+        result = await self._resolve_speculation(speculation) if speculation is not None else None
+        if result is None:
+            result = await self._timed("interviewer", self._cached_interviewer.process(self._state))
+        self._apply_interviewer_result(result)
+
+        return (self._state["current_agent_message"], False, None)
+
+    async def afinish(self) -> tuple[str, bool, dict | None]:
+        """Завершить интервью и сгенерировать фидбэк."""
+        if not self._initialized or self._state is None:
+            raise RuntimeError("Session not initialized. Call initialize() first.")
+
+        if self._draft_task is not None:
+            await asyncio.wait({self._draft_task})
+            self._draft_task = None
+        eval_result = await self._timed("evaluator", self._cached_evaluator.process(self._state))
+        self._apply_feedback(eval_result)
+        return (FINISH_MESSAGE, True, self._state["final_feedback"])
+
+    async def stream_user_input(self, user_message: str) -> AsyncIterator[str]:
+        """Обработать ввод пользователя, отдавая ответ интервьюера по кускам.
+
+        После исчерпания итератора результат хода доступен через
+        is_finished() и get_final_feedback(). Итоговая реплика — в
+        current_agent_message состояния: если фильтр мета-строк вырезал
+        строку, которую уже начали показывать, она короче склейки кусков.
+        """
+        self._begin_turn(user_message)
+
+        label, observer_result = self._preclassify(user_message)
+        if observer_result is None:
+            observer_result = await self._observe(label)
+        self._apply_observer_result(observer_result)
+        self._save_current_turn(user_message)
+
+        if self._should_finish():
+            message, _, _ = await self.afinish()
+            yield message
+            return
+
+        self._schedule_draft_update()
+        async for chunk in self._cached_interviewer.stream_draft(self._state):
+            yield chunk
+        # В состояние и лог идёт очищенный текст, а не склейка показанных кусков.
+        self._apply_interviewer_result(
+            self._cached_interviewer.finalize(self._state, self._cached_interviewer.streamed_message)
+        )
+
+    def _begin_turn(self, user_message: str) -> None:
         if not self._initialized or self._state is None:
             raise RuntimeError("Session not initialized. Call initialize() first.")
 
@@ -173,7 +370,29 @@ class InterviewSession:
         if self._state.get("interview_phase") == "intro":
             self._state["interview_phase"] = "technical"
 
-        observer_result = self._cached_observer.process_sync(self._state)
+    def _preclassify(self, user_message: str) -> tuple[Label | None, dict | None]:
+        """Метка правил и, если ход очевиден и режим on, готовый результат Observer."""
+        if self._preclassifier is None:
+            return None, None
+        label = self._preclassifier.observe(user_message)
+        if label is None or self._preclassifier.mode != "on":
+            return label, None
+        # Пропускается вопрос, который кандидат видит сейчас: тема — из его текста.
+        topic = question_topic(self._state.get("position", ""), self._state.get("current_agent_message", ""))
+        analysis = build_analysis(label, topic)
+        return label, self._cached_observer.apply_analysis(self._state, analysis)
+
+    async def _observe(self, label: Label | None) -> dict:
+        result = await self._timed("observer", self._cached_observer.process(self._state))
+        if self._preclassifier is not None:
+            self._preclassifier.compare(label, result.get("current_observer_analysis"))
+        return result
+
+    def _apply_interviewer_result(self, result: dict) -> None:
+        self._state["current_agent_message"] = result.get("current_agent_message", "")
+        self._state["internal_thoughts_buffer"] = result.get("internal_thoughts_buffer", [])
+
+    def _apply_observer_result(self, observer_result: dict) -> None:
         for key, value in observer_result.items():
             if key == "internal_thoughts_buffer":
                 self._state["internal_thoughts_buffer"] = (
@@ -184,17 +403,164 @@ class InterviewSession:
             else:
                 self._state[key] = value
 
-        self._save_current_turn(user_message)
-        turn_count = self._state.get("current_turn_id", 0)
-        self._state["technical_questions_count"] = turn_count
+    def _speculative_state(self, user_message: str) -> InterviewState:
+        """Снимок состояния для черновика Interviewer до ответа Observer.
 
-        if self._should_finish():
-            return self._finish_interview()
-        result = self._cached_interviewer.process_sync(self._state)
-        self._state["current_agent_message"] = result.get("current_agent_message", "")
-        self._state["internal_thoughts_buffer"] = result.get("internal_thoughts_buffer", [])
+        Ход кандидата добавляется заранее, чтобы история совпала с обычным путём.
+        Анализ предыдущего хода берётся, только если его инструкция — continue.
+        """
+        snapshot = InterviewState(**self._state)
+        turn_id = self._state.get("current_turn_id", 0) + 1
+        snapshot["turns"] = list(self._state.get("turns", [])) + [
+            Turn(
+                turn_id=turn_id,
+                agent_visible_message=self._state.get("current_agent_message", ""),
+                user_message=user_message,
+            )
+        ]
+        snapshot["current_turn_id"] = turn_id
+        previous = self._state.get("current_observer_analysis")
+        if instruction_class(previous) != "continue":
+            snapshot["current_observer_analysis"] = None
+        return snapshot
+
+    def _start_speculation(self, user_message: str) -> asyncio.Task:
+        snapshot = self._speculative_state(user_message)
+        return asyncio.create_task(self._cached_interviewer.draft(snapshot))
+
+    async def _resolve_speculation(self, speculation: asyncio.Task) -> dict | None:
+        """Принять черновик Interviewer или вернуть None, если нужен новый вызов."""
+        analysis = self._state.get("current_observer_analysis")
+        if instruction_class(analysis) != "continue":
+            self._speculation_misses += 1
+            self._discard_speculation(speculation)
+            return None
+        try:
+            message = await speculation
+        except LLMAPIError:
+            self._speculation_misses += 1
+            return None
+        self._speculation_hits += 1
+        return self._cached_interviewer.finalize(self._state, message)
+
+    @staticmethod
+    def _discard_speculation(speculation: asyncio.Task) -> None:
+        """Отменить черновик; промахом считает только _resolve_speculation."""
+        if speculation.done():
+            if not speculation.cancelled():
+                speculation.exception()
+        else:
+            speculation.cancel()
+
+    def _schedule_draft_update(self) -> None:
+        """Запустить обновление черновика оценки, если оно ещё не идёт."""
+        if not self._incremental or (self._draft_task is not None and not self._draft_task.done()):
+            return
+        self._draft_task = asyncio.create_task(self._update_draft(InterviewState(**self._state)))
+
+    async def _update_draft(self, snapshot: InterviewState) -> None:
+        draft = snapshot.get("evaluation_draft") or EvaluationDraft()
+        try:
+            self._state["evaluation_draft"] = await self._cached_evaluator.update_draft(snapshot, draft)
+        except LLMAPIError:
+            pass
+        except (ValueError, ValidationError):
+            self._draft_errors += 1
+            self._state["evaluation_draft"] = None
+
+    async def _warm_up(self) -> None:
+        """Создать Observer и Evaluator и прогреть их клиентов вне пути первого хода."""
+        start = time.perf_counter()
+        agents = (self._cached_interviewer, self._cached_observer, self._cached_evaluator)
+        stats = await warm_up(
+            (llm for agent in agents for llm in agent.policy.llms), preflight=self._warmup == "preflight"
+        )
+        self._warmup_stats = {**stats, "duration_ms": round((time.perf_counter() - start) * 1000)}
+
+    def cancel_background(self) -> None:
+        """Отменить фоновые задачи: обновление черновика оценки и прогрев."""
+        for task in (self._draft_task, self._warmup_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._draft_task = None
+        self._warmup_task = None
+
+    async def _timed(self, agent_type: str, awaitable: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._timings[agent_type].append(time.perf_counter() - start)
+
+    def get_timings(self) -> dict[str, list[float]]:
+        """Длительности вызовов агентов в секундах, по агентам."""
+        return {agent: list(values) for agent, values in self._timings.items()}
+
+    def get_cache_stats(self) -> dict[str, dict[str, int]]:
+        """Попадания, промахи и ожидания запроса в полёте кеша ответов LLM по агентам."""
+        agents = (self._interviewer, self._observer, self._evaluator)
+        return {agent.name: agent.cache_stats() for agent in agents if agent is not None}
+
+    def get_token_usage(self) -> dict[str, TokenUsage]:
+        """Расход токенов по агентам за всю сессию."""
+        agents = {"interviewer": self._interviewer, "observer": self._observer, "evaluator": self._evaluator}
+        return {name: agent.usage for name, agent in agents.items() if agent is not None}
+
+    def get_total_usage(self) -> TokenUsage:
+        """Суммарный расход токенов и стоимость сессии."""
+        return sum(self.get_token_usage().values(), TokenUsage())
+
+    def _take_turn_usage(self) -> dict[str, TokenUsage]:
+        """Прирост расхода по агентам с прошлого вызова."""
+        delta = {}
+        for name, usage in self.get_token_usage().items():
+            spent = usage - self._usage_mark.get(name, TokenUsage())
+            if spent.calls:
+                delta[name] = spent
+            self._usage_mark[name] = usage
+        return delta
+
+    def _agents(self) -> tuple:
+        agents = (self._interviewer, self._observer, self._evaluator)
+        return tuple(agent for agent in agents if agent is not None)
+
+    def _take_turn_attempts(self) -> list[LLMAttempt]:
+        return [attempt for agent in self._agents() for attempt in agent.policy.take_attempts()]
+
+    def get_retry_stats(self) -> dict[str, int]:
+        """Повторы вызовов LLM и переключения на резервный провайдер за сессию."""
+        agents = self._agents()
+        return {
+            "retries": sum(agent.policy.retries for agent in agents),
+            "failovers": sum(agent.policy.failovers for agent in agents),
+        }
 
-        return (self._state["current_agent_message"], False, None)
+    def _over_budget(self) -> bool:
+        total = self.get_total_usage()
+        if settings.session_token_budget and total.total_tokens >= settings.session_token_budget:
+            return True
+        return bool(settings.session_cost_budget_usd and total.cost_usd >= settings.session_cost_budget_usd)
+
+    def get_structured_stats(self) -> dict[str, dict[str, int]]:
+        """Ответы по схеме, откаты на текст и неразобранные ответы по агентам."""
+        agents = (self._observer, self._evaluator)
+        return {agent.name: agent.structured_stats() for agent in agents if agent is not None}
+
+    def get_preclassifier_stats(self) -> dict[str, int] | None:
+        """Срабатывания правил и согласие с Observer; None, если предклассификатор выключен."""
+        return self._preclassifier.stats() if self._preclassifier is not None else None
+
+    def get_warmup_stats(self) -> dict[str, int] | None:
+        """Итог прогрева; None, если он выключен или ещё не закончился."""
+        return self._warmup_stats
+
+    def get_draft_errors(self) -> int:
+        """Обновления черновика оценки, сброшенные из-за неразобранного ответа."""
+        return self._draft_errors
+
+    def get_speculation_stats(self) -> dict[str, int]:
+        """Счётчики спекулятивного режима: принятые и отброшенные черновики."""
+        return {"hits": self._speculation_hits, "misses": self._speculation_misses}
 
     def _save_current_turn(self, user_message: str) -> None:
         turn_id = self._state.get("current_turn_id", 0) + 1
@@ -205,12 +571,18 @@ class InterviewSession:
             agent_visible_message=self._state.get("current_agent_message", ""),
             user_message=user_message,
             internal_thoughts=thoughts,
+            token_usage=self._take_turn_usage(),
+            llm_attempts=self._take_turn_attempts(),
+            analysis=self._state.get("current_observer_analysis"),
+            difficulty=self._state.get("current_difficulty"),
         )
 
         turns = list(self._state.get("turns", []))
         turns.append(turn)
         self._state["turns"] = turns
+        self._state["transcript"].append(turn)
         self._state["current_turn_id"] = turn_id
+        self._state["technical_questions_count"] = turn_id
         self._state["internal_thoughts_buffer"] = []
 
     def _should_finish(self) -> bool:
@@ -223,16 +595,19 @@ class InterviewSession:
         evasion_count = self._state.get("evasion_count", 0)
         if spam_count >= settings.max_spam_count or evasion_count >= settings.max_evasion_count:
             return True
-        
+
+        if self._over_budget():
+            self._state["finish_reason"] = "budget_exceeded"
+            return True
+
         return self._state.get("current_turn_id", 0) >= settings.max_turns
 
-    def _finish_interview(self) -> tuple[str, bool, dict | None]:
-        eval_result = self._cached_evaluator.process_sync(self._state)
+    def _apply_feedback(self, eval_result: dict) -> None:
         self._state["final_feedback"] = eval_result.get("final_feedback")
         self._state["is_finished"] = True
-        self._state["finish_reason"] = eval_result.get("finish_reason", "user_stop")
-
-        return ("Спасибо за интервью! Вот ваш фидбэк:", True, self._state["final_feedback"])
+        self._state["finish_reason"] = (
+            self._state.get("finish_reason") or eval_result.get("finish_reason", "user_stop")
+        )
 
     def get_state(self) -> InterviewState | None:
         return self._state
@@ -243,5 +618,8 @@ class InterviewSession:
     def is_finished(self) -> bool:
         return self._state.get("is_finished", False) if self._state else False
 
+    def get_finish_reason(self) -> str:
+        return self._state.get("finish_reason", "") if self._state else ""
+
     def get_final_feedback(self) -> dict | None:
         return self._state.get("final_feedback") if self._state else None
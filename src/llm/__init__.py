@@ -1,5 +1,6 @@
 """Абстракция LLM-провайдера."""
 
-from src.llm.provider import get_llm
+from src.llm.offline import RecordingChatModel, ReplayChatModel, ScriptedChatModel
+from src.llm.provider import get_llm, get_shared_llm
 
-__all__ = ["get_llm"]
+__all__ = ["get_llm", "get_shared_llm", "RecordingChatModel", "ReplayChatModel", "ScriptedChatModel"]
@@ -0,0 +1,227 @@
+"""Персистентный кеш ответов LLM на SQLite."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Literal
+
+from langchain_core.language_models import BaseChatModel
+
+from src.config import settings
+
+# Исход обращения к кешу: hit — значение из базы, miss — вычислено этим вызовом,
+# coalesced — дождались вычисления другого вызова с тем же ключом.
+CacheOutcome = Literal["hit", "miss", "coalesced"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+"""
+
+
+class _AbandonedError(Exception):
+    """Вычисление в полёте отменено, не дав значения."""
+
+
+def describe_llm(llm: BaseChatModel) -> tuple[str, str, float | None]:
+    """Вернуть (провайдер, модель, температура) для ключа кеша."""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or ""
+    return llm._llm_type, str(model), getattr(llm, "temperature", None)
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    temperature: float | None,
+    system_prompt: str,
+    user_prompt: str,
+) -> str:
+    """Контентный ключ: sha256 от параметров модели и обоих промптов."""
+    payload = json.dumps(
+        [provider, model, temperature, system_prompt, user_prompt], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Кеш ответов LLM с TTL, лимитом размера и вытеснением LRU.
+
+    Одинаковые запросы, пришедшие одновременно, выполняются один раз
+    (single-flight): остальные ждут результат первого.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 10_000,
+        max_bytes: int = 100 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+
+    def get(self, key: str) -> str | None:
+        """Вернуть значение или None, если его нет или истёк TTL."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """Сохранить значение и вытеснить самые старые по доступу записи сверх лимитов."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        doomed = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def _claim(self, key: str) -> tuple[Future, bool]:
+        """Вернуть (future, лидер ли вызывающий) для запроса в полёте."""
+        with self._lock:
+            if key in self._inflight:
+                return self._inflight[key], False
+            future: Future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _settle(self, key: str, future: Future, value: str | None, error: BaseException | None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        if isinstance(error, asyncio.CancelledError):
+            # Отмена лидера — не ошибка запроса: ожидающие не отменяются, а считают сами.
+            error = _AbandonedError()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def get_or_compute_sync(self, key: str, compute: Callable[[], str]) -> tuple[str, CacheOutcome]:
+        """Вернуть (значение, исход), вычислив значение при промахе.
+
+        Одновременные вызовы с тем же ключом ждут первого. Если он отменён,
+        ключ освобождается и вычисляет один из ожидающих; ошибку запроса
+        получают все.
+        """
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, "hit"
+            future, leader = self._claim(key)
+            if leader:
+                break
+            try:
+                return future.result(), "coalesced"
+            except _AbandonedError:
+                continue
+        try:
+            value = compute()
+        except BaseException as e:
+            self._settle(key, future, None, e)
+            raise
+        self.put(key, value)
+        self._settle(key, future, value, None)
+        return value, "miss"
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[str]]
+    ) -> tuple[str, CacheOutcome]:
+        """Асинхронная версия get_or_compute_sync."""
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, "hit"
+            future, leader = self._claim(key)
+            if leader:
+                break
+            try:
+                return await asyncio.wrap_future(future), "coalesced"
+            except _AbandonedError:
+                continue
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._settle(key, future, None, e)
+            raise
+        self.put(key, value)
+        self._settle(key, future, value, None)
+        return value, "miss"
+
+
+_cache: LLMResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache | None:
+    """Общий кеш процесса или None, если LLM_CACHE_ENABLED выключен."""
+    global _cache
+    if not settings.llm_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(
+                settings.llm_cache_path,
+                max_entries=settings.llm_cache_max_entries,
+                max_bytes=int(settings.llm_cache_max_mb * 1024 * 1024),
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+            )
+        return _cache
@@ -0,0 +1,57 @@
+"""HTTP-клиент общих LLM: отдельный пул соединений на каждый event loop.
+
+Модуль импортирует httpx и грузится только из src.llm.provider при создании
+сетевого клиента.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Any
+
+import httpx
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    """AsyncClient, который отправляет запросы через пул текущего event loop.
+
+    Соединения httpx привязаны к loop, в котором открыты, а общие LLM живут
+    дольше одного loop: CLI и сервер работают в asyncio.run, синхронные обёртки —
+    в фоновом loop run_sync, pytest создаёт loop на каждый тест. Сам клиент
+    собирает запрос (base_url, заголовки, таймаут), а отправляет его клиент
+    с пулом текущего loop; пул забывается вместе с loop.
+    """
+
+    def __init__(self, *, limits: httpx.Limits, transport: httpx.AsyncBaseTransport | None = None, **kwargs: Any):
+        super().__init__(limits=limits, **kwargs)
+        self._loop_limits = limits
+        self._loop_transport = transport
+        self._loop_lock = threading.Lock()
+        self._loop_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def for_loop(self) -> httpx.AsyncClient:
+        """Клиент с пулом соединений текущего event loop."""
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            client = self._loop_clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(limits=self._loop_limits, transport=self._loop_transport)
+                self._loop_clients[loop] = client
+            return client
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        return await self.for_loop().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        """Закрыть пул текущего loop; пулы других loop закрываются вместе с ними."""
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            client = self._loop_clients.pop(loop, None)
+            self._loop_clients.clear()
+        if client is not None:
+            await client.aclose()
+        await super().aclose()
@@ -0,0 +1,277 @@
+"""Общий для процесса лимитер вызовов LLM: RPM/TPM и адаптивная конкурентность."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from src.config import settings
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: str | None) -> float | None:
+    """Длительность из заголовка x-ratelimit-reset-*: «1s», «6m0s», «20ms» или число секунд."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    return sum(float(n) * _UNITS[unit] for n, unit in parts) if parts else None
+
+
+class TokenBucket:
+    """Корзина на per_minute единиц в минуту; уровень может уйти в минус (долг)."""
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Сколько ждать, пока в корзине наберётся amount."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def cap(self, remaining: float, now: float) -> None:
+        """Не держать в корзине больше, чем провайдер сообщил в заголовках."""
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """Лимитер одной пары провайдер/модель, общий для всех сессий процесса.
+
+    Перед вызовом acquire ждёт свободный слот конкурентности, затем запрос в
+    корзине RPM и оценку токенов в корзине TPM; после вызова release сверяет
+    оценку с фактическим расходом. Число слотов подстраивается по AIMD:
+    +1/limit за успешный вызов, вдвое меньше на 429 (не чаще раза в секунду).
+    Retry-After и заголовки x-ratelimit-* ставят вызовы на паузу.
+    Время ожидания в очереди копится в waits (последние 1000 вызовов).
+    """
+
+    __slots__ = (
+        "key", "_lock", "_requests", "_tokens", "limit", "max_limit", "in_flight",
+        "_waiters", "_blocked_until", "_last_decrease", "waits", "calls", "throttled",
+    )
+
+    def __init__(self, key: str, rpm: int = 0, tpm: int = 0, max_concurrency: int = 32):
+        self.key = key
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(rpm) if rpm else None
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self.max_limit = max(1, max_concurrency)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._waiters: deque[Callable[[], None]] = deque()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self.waits: deque[float] = deque(maxlen=1000)
+        self.calls = 0
+        self.throttled = 0
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Дождаться слота и бюджета; вернуть время ожидания в секундах."""
+        start = time.monotonic()
+        with self._lock:
+            granted = self._try_slot()
+            if not granted:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+
+                def waiter() -> None:
+                    loop.call_soon_threadsafe(_resolve, future)
+
+                self._waiters.append(waiter)
+        if not granted:
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                        raise
+                self._free_slot()
+                raise
+        try:
+            while (delay := self._take_budget(tokens)) > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._free_slot()
+            raise
+        return self._record_wait(start)
+
+    def acquire_sync(self, tokens: int = 0) -> float:
+        """Синхронная версия acquire."""
+        start = time.monotonic()
+        event = threading.Event()
+        with self._lock:
+            if self._try_slot():
+                event.set()
+            else:
+                self._waiters.append(event.set)
+        event.wait()
+        while (delay := self._take_budget(tokens)) > 0:
+            time.sleep(delay)
+        return self._record_wait(start)
+
+    def release(
+        self,
+        tokens: int = 0,
+        used_tokens: int | None = None,
+        throttled: bool = False,
+        retry_after: float | None = None,
+        headers: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Освободить слот и учесть исход вызова."""
+        with self._lock:
+            now = time.monotonic()
+            self.in_flight -= 1
+            self.calls += 1
+            if self._tokens is not None and used_tokens is not None:
+                self._tokens.take(used_tokens - tokens)
+            if throttled:
+                self.throttled += 1
+                if now - self._last_decrease >= 1.0:
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = now
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            if headers:
+                self._observe_headers(headers, now)
+            self._wake()
+
+    def stats(self) -> dict[str, Any]:
+        waits = sorted(self.waits)
+        return {
+            "concurrency_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "queue_wait_ms_p50": round(waits[len(waits) // 2] * 1000, 3) if waits else 0.0,
+            "queue_wait_ms_max": round(waits[-1] * 1000, 3) if waits else 0.0,
+        }
+
+    def _try_slot(self) -> bool:
+        if self._waiters or self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def _free_slot(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self._waiters.popleft()()
+
+    def _take_budget(self, tokens: int) -> float:
+        """Списать запрос и токены или вернуть, сколько ещё ждать."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._blocked_until - now
+            if self._requests is not None:
+                delay = max(delay, self._requests.delay(1, now))
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.delay(tokens, now))
+            if delay > 0:
+                return delay
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+            return 0.0
+
+    def _record_wait(self, start: float) -> float:
+        wait = time.monotonic() - start
+        self.waits.append(wait)
+        return wait
+
+    def _observe_headers(self, headers: Mapping[str, Any], now: float) -> None:
+        headers = {str(k).lower(): v for k, v in headers.items()}
+        for kind, bucket in (("requests", self._requests), ("tokens", self._tokens)):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except (TypeError, ValueError):
+                continue
+            if remaining <= 0:
+                reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}")) or 1.0
+                self._blocked_until = max(self._blocked_until, now + reset)
+            elif bucket is not None:
+                bucket.cap(remaining, now)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_limiters: dict[str, RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(provider: str, model: str) -> RateLimiter:
+    """Лимитер пары провайдер/модель.
+
+    Лимиты берутся из LLM_RATE_LIMITS по ключу «провайдер:модель» или
+    «провайдер», иначе LLM_RATE_LIMIT_RPM / LLM_RATE_LIMIT_TPM / LLM_MAX_CONCURRENCY.
+    """
+    key = f"{provider}:{model}"
+    with _registry_lock:
+        if key not in _limiters:
+            limits = settings.llm_rate_limits.get(key) or settings.llm_rate_limits.get(provider) or {}
+            _limiters[key] = RateLimiter(
+                key,
+                rpm=limits.get("rpm", settings.llm_rate_limit_rpm),
+                tpm=limits.get("tpm", settings.llm_rate_limit_tpm),
+                max_concurrency=limits.get("concurrency", settings.llm_max_concurrency),
+            )
+        return _limiters[key]
+
+
+def limiter_stats() -> dict[str, dict[str, Any]]:
+    """Состояние всех лимитеров процесса: слоты, очередь, 429, ожидание."""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    return {limiter.key: limiter.stats() for limiter in limiters}
+
+
+def queue_waits() -> list[float]:
+    """Все записанные ожидания в очереди, в секундах."""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    return [wait for limiter in limiters for wait in limiter.waits]
+
+
+def reset_limiters() -> None:
+    """Сбросить лимитеры (для тестов и бенчмарка)."""
+    with _registry_lock:
+        _limiters.clear()
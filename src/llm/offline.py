@@ -0,0 +1,316 @@
+"""Офлайн-провайдеры LLM: запись, воспроизведение и заготовленные ответы.
+
+record   — оборачивает реальную модель и пишет пары промпт→ответ в кассету (JSONL).
+replay   — отдаёт ответы из кассеты с имитацией задержки, джиттера и ошибок.
+scripted — отдаёт заготовленный JSON для Observer/Evaluator и вопросы Interviewer,
+           чтобы гонять полные сессии без сети.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from abc import abstractmethod
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.messages.ai import UsageMetadata
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field, PrivateAttr
+
+from src.prompts.evaluator import EVALUATOR_DRAFT_SYSTEM_PROMPT, EVALUATOR_SYSTEM_PROMPT
+from src.prompts.observer import OBSERVER_SYSTEM_PROMPT
+
+
+class InjectedLLMError(Exception):
+    """Искусственная ошибка провайдера (для проверки устойчивости)."""
+
+    def __init__(self, status_code: int = 503):
+        super().__init__(f"{status_code} Service Unavailable (injected)")
+        self.status_code = status_code
+
+
+def prompt_key(messages: list[BaseMessage]) -> str:
+    """Ключ кассеты: sha256 от содержимого всех сообщений."""
+    payload = json.dumps([m.content for m in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Файл JSONL с записями {key, system, prompt, response}.
+
+    Один и тот же промпт может встречаться несколько раз — ответы отдаются
+    по порядку, последний повторяется.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[str]] = {}
+        self._cursor: dict[str, int] = {}
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry["response"])
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def record(self, messages: list[BaseMessage], response: str) -> None:
+        key = prompt_key(messages)
+        entry = {
+            "key": key,
+            "system": messages[0].content if len(messages) > 1 else "",
+            "prompt": messages[-1].content,
+            "response": response,
+        }
+        with self._lock:
+            self._entries.setdefault(key, []).append(response)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def lookup(self, messages: list[BaseMessage]) -> str:
+        key = prompt_key(messages)
+        with self._lock:
+            responses = self._entries.get(key)
+            if not responses:
+                raise KeyError(f"В кассете {self.path} нет ответа для промпта {key[:12]}")
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = min(i + 1, len(responses) - 1)
+            return responses[i]
+
+
+_cassettes: dict[Path, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: Path) -> Cassette:
+    """Общая кассета для пути: все агенты процесса пишут в один файл."""
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+class _SimulatedChatModel(BaseChatModel):
+    """Базовая офлайн-модель с имитацией задержки, джиттера и ошибок."""
+
+    model_name: str = "offline"
+    temperature: float | None = None
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int | None = None
+    _rng: random.Random = PrivateAttr(default_factory=random.Random)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @abstractmethod
+    def _respond(self, messages: list[BaseMessage]) -> str:
+        """Текст ответа на сообщения."""
+
+    def _delay(self) -> float:
+        jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise InjectedLLMError()
+
+    def _result(self, messages: list[BaseMessage]) -> ChatResult:
+        text = self._respond(messages)
+        message = AIMessage(content=text, usage_metadata=_estimate_usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages: list[BaseMessage]) -> Iterator[ChatGenerationChunk]:
+        text = self._respond(messages)
+        for piece in _split_words(text):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=_estimate_usage(messages, text))
+        )
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay())
+        self._maybe_fail()
+        return self._result(messages)
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return self._result(messages)
+
+    def _stream(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._delay())
+        self._maybe_fail()
+        yield from self._chunks(messages)
+
+    async def _astream(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        for chunk in self._chunks(messages):
+            yield chunk
+
+
+def _split_words(text: str) -> list[str]:
+    words = text.split(" ")
+    return [w + " " for w in words[:-1]] + [words[-1]]
+
+
+def _estimate_usage(messages: list[BaseMessage], text: str) -> UsageMetadata:
+    """Грубая оценка токенов по словам — чтобы учёт расхода работал и офлайн."""
+    input_tokens = sum(len(str(m.content).split()) for m in messages)
+    output_tokens = len(text.split())
+    return UsageMetadata(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+    )
+
+
+class RecordingChatModel(BaseChatModel):
+    """Проксирует реальную модель и записывает ответы в кассету."""
+
+    inner: BaseChatModel
+    cassette: Cassette
+    model_name: str = ""
+    temperature: float | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "record"
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        response = self.inner.invoke(messages, stop=stop, **kwargs)
+        self.cassette.record(messages, response.content)
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        response = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+        self.cassette.record(messages, response.content)
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+
+class ReplayChatModel(_SimulatedChatModel):
+    """Отдаёт ответы из кассеты; нет записи — ошибка."""
+
+    cassette: Cassette
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _respond(self, messages: list[BaseMessage]) -> str:
+        return self.cassette.lookup(messages)
+
+
+SCRIPTED_OBSERVER_RESPONSE = json.dumps({
+    "current_topic": "Python основы",
+    "wants_to_end_interview": False,
+    "wants_to_skip": False,
+    "topic_covered": True,
+    "is_evasive": False,
+    "is_confident_nonsense": False,
+    "grade_mismatch": "none",
+    "is_spam_or_troll": False,
+    "is_valid_answer": True,
+    "is_hallucination": False,
+    "is_off_topic": False,
+    "is_question_from_user": False,
+    "user_question": "",
+    "answer_quality": 6,
+    "clarity_score": 6,
+    "showed_honesty": True,
+    "showed_engagement": True,
+    "detected_skills": ["Python основы"],
+    "mentioned_info": [],
+    "instruction_to_interviewer": "Ответ принят. Задай следующий технический вопрос.",
+    "should_adjust_difficulty": "same",
+    "thoughts": "Заготовленный анализ (scripted).",
+}, ensure_ascii=False)
+
+SCRIPTED_EVALUATOR_RESPONSE = json.dumps({
+    "decision": {
+        "assessed_grade": "Junior",
+        "target_grade": "Junior",
+        "hiring_recommendation": "Hire",
+        "confidence_score": 70,
+        "grade_match": "match",
+        "summary": "Заготовленная оценка (scripted).",
+    },
+    "behavior": {"notes": []},
+    "hard_skills": {
+        "confirmed_skills": ["Python основы"],
+        "knowledge_gaps": [
+            {
+                "topic": "Базы данных",
+                "question_asked": "Как работает JOIN?",
+                "candidate_answer": "Не знаю",
+                "correct_answer": "JOIN объединяет строки таблиц по условию.",
+                "severity": "medium",
+            }
+        ],
+        "technical_depth": 5,
+        "notes": "",
+    },
+    "soft_skills": {
+        "clarity": 6, "honesty": 7, "engagement": 6, "problem_solving": 5,
+        "communication_style": "Спокойный", "red_flags": [],
+    },
+    "roadmap": [{"topic": "Базы данных", "priority": "high", "resources": []}],
+    "interview_summary": "Заготовленный итог (scripted).",
+}, ensure_ascii=False)
+
+SCRIPTED_DRAFT_RESPONSE = json.dumps({
+    "knowledge_gaps": [],
+    "skill_evidence": [{"skill": "Python основы", "evidence": "Ответил по теме"}],
+    "summary": "Заготовленный черновик (scripted).",
+}, ensure_ascii=False)
+
+SCRIPTED_QUESTIONS = (
+    "Хорошо. Чем отличается list от tuple в Python?",
+    "Понял. Что такое первичный ключ в базе данных?",
+    "Спасибо. Как работает JOIN? Приведи пример.",
+    "Хорошо. Что такое REST API?",
+    "Ясно. Зачем нужен git rebase?",
+)
+
+
+class ScriptedChatModel(_SimulatedChatModel):
+    """Заготовленные ответы по роли агента (определяется по началу системного сообщения)."""
+
+    observer_response: str = SCRIPTED_OBSERVER_RESPONSE
+    evaluator_response: str = SCRIPTED_EVALUATOR_RESPONSE
+    draft_response: str = SCRIPTED_DRAFT_RESPONSE
+    interviewer_responses: list[str] = Field(default_factory=lambda: list(SCRIPTED_QUESTIONS))
+    _turn: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _respond(self, messages: list[BaseMessage]) -> str:
+        system = messages[0].content if len(messages) > 1 else ""
+        if system.startswith(OBSERVER_SYSTEM_PROMPT):
+            return self.observer_response
+        if system.startswith(EVALUATOR_SYSTEM_PROMPT):
+            return self.evaluator_response
+        if system.startswith(EVALUATOR_DRAFT_SYSTEM_PROMPT):
+            return self.draft_response
+        response = self.interviewer_responses[self._turn % len(self.interviewer_responses)]
+        self._turn += 1
+        return response
@@ -0,0 +1,339 @@
+"""Политика вызовов LLM: повторы с backoff, circuit breaker, переключение провайдера."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+from langchain_core.language_models import BaseChatModel
+
+from src.config import settings
+from src.llm.cache import describe_llm
+from src.llm.limiter import RateLimiter, get_limiter
+from src.models.state import LLMAttempt
+
+T = TypeVar("T")
+
+_TRANSIENT_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Все провайдеры цепочки временно отключены circuit breaker."""
+
+
+def status_code(error: BaseException) -> int | None:
+    """HTTP-код ошибки провайдера, если его можно достать."""
+    code = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if code is None and response is not None:
+        code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_transient(error: BaseException) -> bool:
+    """Имеет ли смысл повторить вызов: 429, 5xx, таймауты и обрывы соединения."""
+    code = status_code(error)
+    if code is not None:
+        return code in _TRANSIENT_STATUS
+    if isinstance(error, TimeoutError | ConnectionError):
+        return True
+    name = type(error).__name__
+    if "Timeout" in name or "Connection" in name:
+        return True
+    msg = str(error)
+    return any(str(c) in msg for c in (429, 500, 502, 503, 504))
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Пауза из заголовков Retry-After / retry-after-ms ответа, в секундах."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if (ms := headers.get("retry-after-ms")) is not None:
+        try:
+            return max(0.0, float(ms) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _headers(error: BaseException) -> Any:
+    return getattr(getattr(error, "response", None), "headers", None)
+
+
+def used_tokens(result: Any) -> int | None:
+    """Фактический расход токенов по ответу (AIMessage или результат with_structured_output)."""
+    message = result.get("raw") if isinstance(result, dict) else result
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def _response_headers(result: Any) -> Any:
+    message = result.get("raw") if isinstance(result, dict) else result
+    return (getattr(message, "response_metadata", None) or {}).get("headers")
+
+
+def backoff_delay(attempt: int) -> float:
+    """Экспоненциальная пауза перед повтором с джиттером: от половины до полной."""
+    delay = min(settings.llm_retry_max_delay_s, settings.llm_retry_base_delay_s * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _release_failed(limiter: RateLimiter, tokens: int, error: Exception) -> None:
+    limiter.release(
+        tokens,
+        throttled=status_code(error) == 429,
+        retry_after=retry_after(error),
+        headers=_headers(error),
+    )
+
+
+class CircuitBreaker:
+    """Размыкается после LLM_CIRCUIT_FAILURE_THRESHOLD ошибок подряд.
+
+    Пока разомкнут, вызовы к провайдеру не идут. Через LLM_CIRCUIT_COOLDOWN_S
+    переходит в полуоткрытое состояние и пропускает один пробный вызов, остальные
+    ждут его исхода: успех замыкает, ошибка размыкает снова. Проба, которая не
+    закончилась ни успехом, ни временной ошибкой (отмена, ошибка запроса),
+    через ещё одну паузу уступает место следующей.
+    """
+
+    __slots__ = ("failures", "opened_at", "probe_at", "_lock")
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probe_at: float | None = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            cooldown = settings.llm_circuit_cooldown_s
+            if now - self.opened_at < cooldown:
+                return False
+            if self.probe_at is not None and now - self.probe_at < cooldown:
+                return False
+            self.probe_at = now
+            return True
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_at = None
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.probe_at is not None or self.failures >= settings.llm_circuit_failure_threshold:
+                self.opened_at = time.monotonic()
+                self.probe_at = None
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Circuit breaker провайдера, общий для всех сессий процесса."""
+    if provider not in _breakers:
+        _breakers[provider] = CircuitBreaker()
+    return _breakers[provider]
+
+
+def reset_breakers() -> None:
+    """Замкнуть все circuit breaker (для тестов и бенчмарка)."""
+    _breakers.clear()
+
+
+class CallPolicy:
+    """Вызов LLM по цепочке провайдеров: основной, затем резервный.
+
+    Временные ошибки повторяются до LLM_MAX_ATTEMPTS раз с паузой из Retry-After
+    или экспоненциальной с джиттером. Если попытки кончились, пауза длиннее
+    LLM_RETRY_MAX_DELAY_S или breaker провайдера разомкнут — тот же запрос идёт
+    следующему провайдеру. Неудачные попытки копятся в attempts до take_attempts.
+    Остальные ошибки пробрасываются сразу.
+
+    Каждая попытка проходит через общий лимитер провайдера/модели (src.llm.limiter);
+    tokens — оценка расхода вызова для корзины TPM.
+    """
+
+    __slots__ = ("agent", "_chain", "attempts", "retries", "failovers")
+
+    def __init__(self, agent: str, llms: list[BaseChatModel]):
+        self.agent = agent
+        self._chain = [(describe_llm(llm)[0], llm, get_limiter(*describe_llm(llm)[:2])) for llm in llms]
+        self.attempts: list[LLMAttempt] = []
+        self.retries = 0
+        self.failovers = 0
+
+    @property
+    def llms(self) -> list[BaseChatModel]:
+        """Модели цепочки: основная, затем резервная."""
+        return [llm for _, llm, _ in self._chain]
+
+    def take_attempts(self) -> list[LLMAttempt]:
+        """Неудачные попытки с прошлого вызова."""
+        attempts, self.attempts = self.attempts, []
+        return attempts
+
+    async def ainvoke(self, call: Callable[[BaseChatModel], Awaitable[T]], tokens: int = 0) -> T:
+        last: BaseException | None = None
+        for index, (provider, llm, limiter) in enumerate(self._chain):
+            if not self._available(index, provider):
+                continue
+            for attempt in range(1, settings.llm_max_attempts + 1):
+                await limiter.acquire(tokens)
+                try:
+                    result = await call(llm)
+                except Exception as e:
+                    _release_failed(limiter, tokens, e)
+                    last = self._check(e)
+                    delay = self._on_failure(index, provider, attempt, e)
+                    if delay is None:
+                        break
+                    await asyncio.sleep(delay)
+                except BaseException:
+                    limiter.release(tokens)
+                    raise
+                else:
+                    limiter.release(tokens, used_tokens(result), headers=_response_headers(result))
+                    get_breaker(provider).success()
+                    return result
+        raise last or CircuitOpenError("Провайдеры LLM временно недоступны (circuit breaker)")
+
+    def invoke(self, call: Callable[[BaseChatModel], T], tokens: int = 0) -> T:
+        last: BaseException | None = None
+        for index, (provider, llm, limiter) in enumerate(self._chain):
+            if not self._available(index, provider):
+                continue
+            for attempt in range(1, settings.llm_max_attempts + 1):
+                limiter.acquire_sync(tokens)
+                try:
+                    result = call(llm)
+                except Exception as e:
+                    _release_failed(limiter, tokens, e)
+                    last = self._check(e)
+                    delay = self._on_failure(index, provider, attempt, e)
+                    if delay is None:
+                        break
+                    time.sleep(delay)
+                except BaseException:
+                    limiter.release(tokens)
+                    raise
+                else:
+                    limiter.release(tokens, used_tokens(result), headers=_response_headers(result))
+                    get_breaker(provider).success()
+                    return result
+        raise last or CircuitOpenError("Провайдеры LLM временно недоступны (circuit breaker)")
+
+    async def astream(
+        self, stream: Callable[[BaseChatModel], AsyncIterator[T]], tokens: int = 0
+    ) -> AsyncIterator[T]:
+        """Поток с повторами: повторяется только вызов, не успевший отдать ни куска."""
+        last: BaseException | None = None
+        for index, (provider, llm, limiter) in enumerate(self._chain):
+            if not self._available(index, provider):
+                continue
+            for attempt in range(1, settings.llm_max_attempts + 1):
+                await limiter.acquire(tokens)
+                started = False
+                used = 0
+                try:
+                    async with aclosing(stream(llm)) as chunks:
+                        async for chunk in chunks:
+                            started = True
+                            used += used_tokens(chunk) or 0
+                            yield chunk
+                except Exception as e:
+                    _release_failed(limiter, tokens, e)
+                    if started:
+                        raise
+                    last = self._check(e)
+                    delay = self._on_failure(index, provider, attempt, e)
+                    if delay is None:
+                        break
+                    await asyncio.sleep(delay)
+                except BaseException:
+                    limiter.release(tokens, used or None)
+                    raise
+                else:
+                    limiter.release(tokens, used or None)
+                    get_breaker(provider).success()
+                    return
+        raise last or CircuitOpenError("Провайдеры LLM временно недоступны (circuit breaker)")
+
+    def _available(self, index: int, provider: str) -> bool:
+        if get_breaker(provider).allow():
+            return True
+        self._record(provider, 0, "circuit open", 0.0, index)
+        return False
+
+    @staticmethod
+    def _check(error: Exception) -> Exception:
+        if not is_transient(error):
+            raise error
+        return error
+
+    def _on_failure(self, index: int, provider: str, attempt: int, error: Exception) -> float | None:
+        """Записать попытку и вернуть паузу перед повтором или None — к следующему провайдеру."""
+        breaker = get_breaker(provider)
+        breaker.failure()
+        delay = retry_after(error)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        has_next = index + 1 < len(self._chain)
+        if (
+            attempt >= settings.llm_max_attempts
+            or not breaker.allow()
+            or (has_next and delay > settings.llm_retry_max_delay_s)
+        ):
+            self._record(provider, attempt, str(error)[:200], 0.0, index, status_code(error))
+            return None
+        delay = min(delay, settings.llm_retry_max_delay_s)
+        self.retries += 1
+        self._record(provider, attempt, str(error)[:200], delay, index, status_code(error), retry=True)
+        return delay
+
+    def _record(
+        self,
+        provider: str,
+        attempt: int,
+        error: str,
+        delay: float,
+        index: int,
+        code: int | None = None,
+        retry: bool = False,
+    ) -> None:
+        failover = not retry and index + 1 < len(self._chain)
+        if failover:
+            self.failovers += 1
+        self.attempts.append(LLMAttempt(
+            agent=self.agent,
+            provider=provider,
+            attempt=attempt,
+            status_code=code,
+            error=error,
+            delay_s=round(delay, 3),
+            failover_to=self._chain[index + 1][0] if failover else None,
+        ))
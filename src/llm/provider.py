@@ -1,47 +1,284 @@
-"""Абстракция LLM-провайдера."""
+"""Абстракция LLM-провайдера.
+
+SDK провайдеров (langchain_mistralai, langchain_openai) и httpx импортируются
+при первом запросе LLM соответствующего провайдера, а не при загрузке модуля.
+warm_up открывает соединения заранее, чтобы первый ход не платил за TLS.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Literal
 
 from langchain_core.language_models import BaseChatModel
-from langchain_mistralai import ChatMistralAI
-from langchain_openai import ChatOpenAI
 
 from src.config import settings
+from src.llm.cache import describe_llm
+from src.llm.limiter import get_limiter
+from src.llm.offline import RecordingChatModel, ReplayChatModel, ScriptedChatModel, get_cassette
+
+if TYPE_CHECKING:
+    import httpx
+
+    from src.llm.http import LoopLocalAsyncClient
+
+WarmupMode = Literal["off", "connect", "preflight"]
+
+_API_KEYS = {"mistral": "MISTRAL_API_KEY", "openai": "OPENAI_API_KEY"}
+_DEFAULT_MODELS = {"mistral": "mistral-large-latest", "openai": "gpt-4o-mini"}
+_MISTRAL_URL = "https://api.mistral.ai/v1"
+_OPENAI_URL = "https://api.openai.com/v1"
+
+_lock = threading.Lock()
+_http_clients: dict[tuple[str, bool], httpx.Client | LoopLocalAsyncClient] = {}
+_shared_llms: dict[tuple, BaseChatModel] = {}
+
+
+def _http_limits() -> httpx.Limits:
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.llm_http_max_connections,
+        max_keepalive_connections=settings.llm_http_max_keepalive,
+        keepalive_expiry=settings.llm_http_keepalive_expiry_s,
+    )
+
+
+def _http_client(provider: str, is_async: bool) -> httpx.Client | LoopLocalAsyncClient:
+    """Общий для процесса HTTP-клиент провайдера с пулом keep-alive соединений.
+
+    Асинхронный клиент держит отдельный пул на каждый event loop (LoopLocalAsyncClient).
+    """
+    import httpx
+
+    from src.llm.http import LoopLocalAsyncClient
+
+    key = (provider, is_async)
+    with _lock:
+        if key not in _http_clients:
+            options = {"limits": _http_limits(), "timeout": settings.llm_http_timeout_s}
+            if provider == "mistral":
+                options["base_url"] = os.environ.get("MISTRAL_BASE_URL") or _MISTRAL_URL
+                options["headers"] = {
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                    "Authorization": f"Bearer {settings.mistral_api_key}",
+                }
+            _http_clients[key] = LoopLocalAsyncClient(**options) if is_async else httpx.Client(**options)
+        return _http_clients[key]
+
+
+async def aclose_http_clients() -> None:
+    """Закрыть общие HTTP-клиенты и забыть выданные LLM (при остановке процесса)."""
+    with _lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+        _shared_llms.clear()
+    for client in clients:
+        if hasattr(client, "aclose"):
+            await client.aclose()
+        else:
+            client.close()
+
+
+def _registry_key(llm: BaseChatModel) -> tuple | None:
+    with _lock:
+        return next((key for key, shared in _shared_llms.items() if shared is llm), None)
+
+
+async def _open_connection(provider: str) -> None:
+    """Лёгкий GET /models: соединение остаётся в пуле keep-alive общего клиента."""
+    client = _http_client(provider, is_async=True)
+    if provider == "mistral":
+        await client.get("/models")
+    else:
+        base_url = os.environ.get("OPENAI_BASE_URL") or _OPENAI_URL
+        await client.get(f"{base_url}/models", headers={"Authorization": f"Bearer {settings.openai_api_key}"})
+
+
+async def _preflight(llm: BaseChatModel) -> None:
+    """Запрос на один токен через лимитер модели."""
+    limiter = get_limiter(*describe_llm(llm)[:2])
+    await limiter.acquire()
+    try:
+        await llm.bind(max_tokens=1).ainvoke("ping")
+    finally:
+        limiter.release()
+
+
+async def warm_up(llms: Iterable[BaseChatModel], preflight: bool = False) -> dict[str, int]:
+    """Прогреть сетевые клиенты LLM: открыть соединения с API провайдеров.
+
+    С preflight вместо этого каждой модели уходит запрос на один токен — он
+    заодно прогревает соединение и маршрутизацию на стороне провайдера. Его
+    расход не попадает в счётчики агентов. Прогреваются только клиенты из
+    реестра get_shared_llm: офлайн-модели и переданные извне пропускаются.
+    Ошибки не пробрасываются, а считаются в errors.
+    """
+    models: dict[tuple, BaseChatModel] = {}
+    for llm in llms:
+        key = _registry_key(llm)
+        if key is not None:
+            models.setdefault(key[:2], llm)
+    if preflight:
+        calls = [_preflight(llm) for llm in models.values()]
+    else:
+        calls = [_open_connection(provider) for provider in {provider for provider, _ in models}]
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    errors = sum(isinstance(result, Exception) for result in results)
+    return {
+        "connections": 0 if preflight else len(results) - errors,
+        "preflights": len(results) - errors if preflight else 0,
+        "errors": errors,
+    }
 
 
 def get_llm(
     provider: str | None = None,
     model: str | None = None,
     temperature: float = 0.7,
+    prompt_cache_key: str | None = None,
 ) -> BaseChatModel:
-    """Получить экземпляр LLM для настроенного провайдера."""
+    """Получить новый экземпляр LLM для настроенного провайдера.
+
+    prompt_cache_key — ключ кеша промптов провайдера (сейчас учитывает только OpenAI).
+    Клиенты mistral и openai ходят через общий для процесса пул HTTP-соединений.
+    """
     provider = provider or settings.llm_provider
     model = model or settings.llm_model
 
     if provider == "mistral":
         if not settings.mistral_api_key:
             raise ValueError("MISTRAL_API_KEY не задан")
+        from langchain_mistralai import ChatMistralAI
+
         return ChatMistralAI(
             model=model,
             api_key=settings.mistral_api_key,
             temperature=temperature,
+            client=_http_client("mistral", is_async=False),
+            async_client=_http_client("mistral", is_async=True),
         )
 
     if provider == "openai":
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY не задан")
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model=model,
             api_key=settings.openai_api_key,
             temperature=temperature,
+            stream_usage=True,
+            include_response_headers=True,
+            model_kwargs={"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {},
+            http_client=_http_client("openai", is_async=False),
+            http_async_client=_http_client("openai", is_async=True),
         )
 
-    raise ValueError(f"Неизвестный провайдер: {provider}. Поддерживаются: mistral, openai")
+    if provider == "record":
+        inner = get_llm(settings.llm_record_provider, model, temperature, prompt_cache_key)
+        return RecordingChatModel(
+            inner=inner,
+            cassette=get_cassette(settings.llm_cassette_path),
+            model_name=model,
+            temperature=temperature,
+        )
+
+    if provider in ("replay", "scripted"):
+        simulation = {
+            "model_name": model,
+            "temperature": temperature,
+            "latency_ms": settings.llm_replay_latency_ms,
+            "jitter_ms": settings.llm_replay_jitter_ms,
+            "error_rate": settings.llm_replay_error_rate,
+            "seed": settings.llm_replay_seed,
+        }
+        if provider == "replay":
+            return ReplayChatModel(cassette=get_cassette(settings.llm_cassette_path), **simulation)
+        return ScriptedChatModel(**simulation)
+
+    raise ValueError(
+        f"Неизвестный провайдер: {provider}. Поддерживаются: mistral, openai, record, replay, scripted"
+    )
 
 
-def get_llm_for_agent(agent_type: str, temperature: float | None = None) -> BaseChatModel:
-    """Получить LLM с настройками температуры для конкретного агента."""
+def missing_api_key(provider: str | None = None) -> str | None:
+    """Имя переменной с ключом, которого не хватает провайдеру, иначе None."""
+    provider = provider or settings.llm_provider
+    if provider == "record":
+        provider = settings.llm_record_provider
+    if provider == "mistral" and not settings.mistral_api_key:
+        return _API_KEYS["mistral"]
+    if provider == "openai" and not settings.openai_api_key:
+        return _API_KEYS["openai"]
+    return None
+
+
+def _agent_temperature(agent_type: str) -> float:
     temps = {
         "interviewer": settings.temp_interviewer,
         "observer": settings.temp_observer,
         "evaluator": settings.temp_evaluator,
     }
-    return get_llm(temperature=temperature or temps.get(agent_type, 0.7))
+    return temps.get(agent_type, 0.7)
+
+
+def _prompt_cache_key(agent_type: str) -> str | None:
+    return f"interview-coach:{agent_type}" if settings.llm_prompt_cache else None
+
+
+def get_shared_llm(
+    provider: str | None = None,
+    model: str | None = None,
+    temperature: float = 0.7,
+    prompt_cache_key: str | None = None,
+) -> BaseChatModel:
+    """LLM из реестра процесса: один экземпляр на (провайдер, модель, температура, ключ кеша промптов).
+
+    Модели LangChain не хранят состояние между вызовами, поэтому один экземпляр
+    безопасно делят сессии, потоки и корутины. Офлайн-провайдеры хранят
+    состояние (счётчик ходов, кассету записи) и создаются заново.
+    """
+    provider = provider or settings.llm_provider
+    model = model or settings.llm_model
+    if provider not in _API_KEYS:
+        return get_llm(provider, model, temperature, prompt_cache_key)
+    key = (provider, model, temperature, prompt_cache_key)
+    with _lock:
+        llm = _shared_llms.get(key)
+    if llm is None:
+        llm = get_llm(provider, model, temperature, prompt_cache_key)
+        with _lock:
+            llm = _shared_llms.setdefault(key, llm)
+    return llm
+
+
+def get_llm_for_agent(
+    agent_type: str,
+    temperature: float | None = None,
+    provider: str | None = None,
+    model: str | None = None,
+) -> BaseChatModel:
+    """Получить LLM с настройками температуры для конкретного агента (из общего реестра)."""
+    return get_shared_llm(
+        provider=provider,
+        model=model,
+        temperature=_agent_temperature(agent_type) if temperature is None else temperature,
+        prompt_cache_key=_prompt_cache_key(agent_type),
+    )
+
+
+def get_fallback_llm_for_agent(agent_type: str) -> BaseChatModel | None:
+    """Резервный LLM агента (LLM_FALLBACK_PROVIDER) или None, если он не задан."""
+    if settings.llm_fallback_provider is None:
+        return None
+    return get_shared_llm(
+        provider=settings.llm_fallback_provider,
+        model=settings.llm_fallback_model or _DEFAULT_MODELS[settings.llm_fallback_provider],
+        temperature=_agent_temperature(agent_type),
+        prompt_cache_key=_prompt_cache_key(agent_type),
+    )
@@ -2,20 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, get_args
 
 import typer
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.table import Table
 
-from src.agents.base import LLMAPIError
 from src.config import settings
-from src.graph.interview_graph import InterviewSession
 from src.topics import SUPPORTED_POSITIONS, normalize_position
-from src.utils.logger import InterviewLogger, export_for_submission, load_interview_log
+from src.utils.catalog import SortKey, get_catalog
+from src.utils.logger import (
+    InterviewLogger,
+    compact_journal,
+    export_for_submission,
+    load_interview_log,
+)
+
+if TYPE_CHECKING:
+    from src.graph.interview_graph import InterviewSession
 
 app = typer.Typer(name="interview-coach", add_completion=False)
 console = Console(width=100)
@@ -158,77 +169,138 @@ def interview(
 
     console.print("\n[dim]Инициализация...[/dim]")
 
+    # Граф, агенты и SDK провайдеров грузятся только для интервью:
+    # view-log, list-logs и config без них стартуют заметно быстрее.
+    from src.graph.interview_graph import InterviewSession
+
     session = InterviewSession()
     logger = InterviewLogger()
 
     try:
-        greeting = session.initialize(name, position, grade, experience)
-        log_file = logger.start_session(name, position, grade, experience)
-
-        console.print(f"[dim]Лог: {log_file}[/dim]\n")
-        console.print(Panel(greeting, title="Интервьюер", border_style="blue"))
-
-        turn_count = 0
-        while turn_count < settings.max_turns:
-            user_input = Prompt.ask("\n[green]Вы[/green]")
-            if not user_input.strip():
-                continue
-
-            console.print("[dim]Обработка...[/dim]")
-            try:
-                response, is_finished, feedback = session.process_user_input(user_input)
-            except LLMAPIError as e:
-                console.print(f"[red]Ошибка API: {e}[/red]")
-                console.print("[dim]Попробуйте позже или переключите LLM_PROVIDER на openai в .env[/dim]")
-                continue
-
-            if state := session.get_state():
-                if turns := state.get("turns"):
-                    logger.log_turn(turns[-1])
-
-            turn_count += 1
-
-            if is_finished:
-                console.print(Panel(response, title="Интервьюер", border_style="blue"))
-                if feedback:
-                    logger.log_feedback(feedback)
-                    print_feedback(feedback)
-                break
-
-            console.print(Panel(response, title="Интервьюер", border_style="blue"))
-
-        else:
-            console.print("\n[yellow]Лимит вопросов. Генерация фидбэка...[/yellow]")
-            try:
-                _, _, feedback = session.process_user_input("стоп")
-                if feedback:
-                    logger.log_feedback(feedback)
-                    print_feedback(feedback)
-            except LLMAPIError as e:
-                console.print(f"[red]Ошибка API при генерации фидбэка: {e}[/red]")
-
-        final_log = logger.end_session()
-        console.print(f"\n[green]Интервью завершено![/green]")
-        console.print(f"[dim]Лог: {final_log}[/dim]")
-
-        if participant and export:
-            target = Path(export)
-            if not target.is_absolute():
-                target = settings.log_dir / target
-            log_data = load_interview_log(final_log)
-            export_for_submission(
-                log_data, target,
-                participant_name=participant,
-            )
-            console.print(f"[bold green]Файл для сдачи (формат ТЗ): {target}[/bold green]")
-            console.print(f"[dim]participant_name: {participant}[/dim]")
-
+        asyncio.run(_run_interview(session, logger, name, position, grade, experience, participant, export))
     except KeyboardInterrupt:
         console.print("\n[yellow]Прервано.[/yellow]")
-        logger.end_session()
+        logger.end_session(finish_reason="interrupted")
         sys.exit(0)
 
 
+async def _stream_reply(session: InterviewSession, user_input: str) -> str:
+    """Показать ответ интервьюера по мере генерации, вернуть полный текст."""
+    text = ""
+    placeholder = Panel("[dim]Обработка...[/dim]", title="Интервьюер", border_style="blue")
+    with Live(placeholder, console=console, refresh_per_second=12) as live:
+        async for chunk in session.stream_user_input(user_input):
+            text += chunk
+            live.update(Panel(text, title="Интервьюер", border_style="blue"))
+        # Фильтр мог вырезать мета-строку, которую уже начали показывать.
+        if not session.is_finished() and (final := session.get_state()["current_agent_message"]) != text.strip():
+            text = final
+            live.update(Panel(text, title="Интервьюер", border_style="blue"))
+    return text
+
+
+async def _run_interview(
+    session: InterviewSession,
+    logger: InterviewLogger,
+    name: str,
+    position: str,
+    grade: str,
+    experience: str,
+    participant: str | None,
+    export: str | None,
+) -> None:
+    from src.agents.base import LLMAPIError
+
+    greeting = await session.ainitialize(name, position, grade, experience)
+    log_file = logger.start_session(name, position, grade, experience)
+
+    console.print(f"[dim]Лог: {log_file}[/dim]\n")
+    console.print(Panel(greeting, title="Интервьюер", border_style="blue"))
+
+    turn_count = 0
+    while turn_count < settings.max_turns:
+        user_input = await asyncio.to_thread(Prompt.ask, "\n[green]Вы[/green]")
+        if not user_input.strip():
+            continue
+
+        try:
+            await _stream_reply(session, user_input)
+        except LLMAPIError as e:
+            console.print(f"[red]Ошибка API: {e}[/red]")
+            console.print("[dim]Попробуйте позже или переключите LLM_PROVIDER на openai в .env[/dim]")
+            continue
+
+        if state := session.get_state():
+            if turns := state.get("turns"):
+                logger.log_turn(turns[-1])
+
+        turn_count += 1
+
+        if session.is_finished():
+            if feedback := session.get_final_feedback():
+                logger.log_feedback(feedback)
+                print_feedback(feedback)
+            break
+
+    else:
+        console.print("\n[yellow]Лимит вопросов. Генерация фидбэка...[/yellow]")
+        try:
+            _, _, feedback = await session.afinish()
+            if feedback:
+                logger.log_feedback(feedback)
+                print_feedback(feedback)
+        except LLMAPIError as e:
+            console.print(f"[red]Ошибка API при генерации фидбэка: {e}[/red]")
+
+    if settings.llm_structured_output:
+        console.print("[dim]Ответы по схеме: " + ", ".join(
+            f"{agent} {s['structured']} (откатов {s['fallbacks']}, не разобрано {s['parse_failures']})"
+            for agent, s in session.get_structured_stats().items()
+        ) + "[/dim]")
+
+    if (pre := session.get_preclassifier_stats()) is not None:
+        console.print(
+            f"[dim]Предклассификатор: сработал {pre['hits']}/{pre['turns']}, "
+            f"согласие с Observer {pre['agreed']}, расхождений {pre['disagreed']}, пропущено {pre['missed']}[/dim]"
+        )
+
+    retries = session.get_retry_stats()
+    if retries["retries"] or retries["failovers"]:
+        console.print(
+            f"[dim]Повторов вызовов LLM: {retries['retries']}, переключений провайдера: {retries['failovers']}[/dim]"
+        )
+
+    if draft_errors := session.get_draft_errors():
+        console.print(f"[dim]Черновик оценки сброшен из-за неразобранного ответа: {draft_errors}[/dim]")
+
+    if (warmup := session.get_warmup_stats()) is not None:
+        console.print(
+            f"[dim]Прогрев: соединений {warmup['connections']}, preflight {warmup['preflights']}, "
+            f"ошибок {warmup['errors']}, {warmup['duration_ms']} мс[/dim]"
+        )
+
+    total = session.get_total_usage()
+    console.print(
+        f"[dim]Токены: {total.input_tokens} вход (из кеша {total.cached_tokens}) / {total.output_tokens} выход, "
+        f"вызовов {total.calls}, ${total.cost_usd:.4f}[/dim]"
+    )
+    logger.log_token_usage(session.get_token_usage())
+    final_log = logger.end_session(finish_reason=session.get_finish_reason() or None)
+    console.print(f"\n[green]Интервью завершено![/green]")
+    console.print(f"[dim]Лог: {final_log}[/dim]")
+
+    if participant and export:
+        target = Path(export)
+        if not target.is_absolute():
+            target = settings.log_dir / target
+        export_for_submission(
+            logger.finished_log, target,
+            participant_name=participant,
+        )
+        console.print(f"[bold green]Файл для сдачи (формат ТЗ): {target}[/bold green]")
+        console.print(f"[dim]participant_name: {participant}[/dim]")
+
+
 @app.command()
 def view_log(log_file: Path = typer.Argument(..., help="Путь к файлу лога")):
     """Просмотреть лог интервью."""
@@ -254,23 +326,353 @@ def view_log(log_file: Path = typer.Argument(..., help="Путь к файлу 
 
 
 @app.command()
-def list_logs():
-    """Показать все логи."""
-    if not settings.log_dir.exists() or not (files := list(settings.log_dir.glob("interview_*.json"))):
+def list_logs(
+    position: str = typer.Option(None, "--position", help="Позиция (подстрока)"),
+    grade: str = typer.Option(None, "--grade", help="Заявленный грейд"),
+    recommendation: str = typer.Option(None, "--recommendation", help="Hire, No Hire, Strong Hire"),
+    finish_reason: str = typer.Option(None, "--finish-reason", help="Причина завершения"),
+    sort: str = typer.Option("date", "--sort", help=f"Сортировка: {', '.join(get_args(SortKey))}"),
+    ascending: bool = typer.Option(False, "--asc", help="По возрастанию"),
+    limit: int = typer.Option(20, "--limit", min=1, help="Записей на странице"),
+    page: int = typer.Option(1, "--page", min=1, help="Номер страницы"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Пересобрать каталог по файлам логов"),
+):
+    """Показать логи из каталога с фильтрами, сортировкой и страницами."""
+    if sort not in get_args(SortKey):
+        raise typer.BadParameter(f"ожидается одно из: {', '.join(get_args(SortKey))}", param_hint="--sort")
+    if not settings.log_dir.exists():
+        console.print("[yellow]Нет логов.[/yellow]")
+        return
+
+    catalog = get_catalog(settings.log_dir)
+    if rebuild:
+        console.print(f"[dim]В каталоге {catalog.rebuild()} логов[/dim]")
+    entries, total = catalog.query(
+        position=position,
+        grade=grade,
+        recommendation=recommendation,
+        finish_reason=finish_reason,
+        sort=sort,
+        descending=not ascending,
+        limit=limit,
+        offset=(page - 1) * limit,
+    )
+    if not total:
         console.print("[yellow]Нет логов.[/yellow]")
         return
 
     table = Table(title="Логи интервью")
     table.add_column("Файл", style="cyan")
     table.add_column("Дата", style="green")
+    table.add_column("Позиция")
+    table.add_column("Грейд")
+    table.add_column("Оценка")
+    table.add_column("Рекомендация")
+    table.add_column("Ходов", justify="right")
+    table.add_column("Галл.", justify="right")
+    table.add_column("Уклон.", justify="right")
+    table.add_column("Мин", justify="right")
+
+    for e in entries:
+        table.add_row(
+            e.file,
+            (e.started_at or "?")[:16].replace("T", " "),
+            e.position,
+            e.grade,
+            e.assessed_grade or "-",
+            e.recommendation or "-",
+            str(e.turns),
+            str(e.hallucination_count),
+            str(e.evasion_count),
+            f"{e.duration_s / 60:.1f}" if e.duration_s is not None else "-",
+        )
 
-    for f in sorted(files, reverse=True):
-        parts = f.stem.split("_")
-        date = f"{parts[-2]} {parts[-1]}" if len(parts) >= 3 else "?"
-        table.add_row(f.name, date)
+    console.print(table)
+    pages = (total + limit - 1) // limit
+    console.print(f"[dim]Страница {page} из {pages}, всего {total}[/dim]")
+
+
+@app.command()
+def analytics(
+    source: str = typer.Option("catalog", "--source", help="catalog (каталог логов) или logs (файлы логов)"),
+    json_path: Path = typer.Option(None, "--json", help="Записать отчёт в JSON"),
+    csv_path: Path = typer.Option(None, "--csv", help="Записать отчёт в CSV (section, group, metric, value)"),
+):
+    """Сводная аналитика по всем интервью: поведение, грейды, soft skills, длина интервью."""
+    try:
+        from src.analytics import build_report, load_catalog, load_logs, write_csv, write_json
+    except ImportError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    if source not in ("catalog", "logs"):
+        raise typer.BadParameter("ожидается catalog или logs", param_hint="--source")
+    if not settings.log_dir.exists():
+        console.print("[yellow]Нет логов.[/yellow]")
+        return
+
+    columns = load_catalog(settings.log_dir) if source == "catalog" else load_logs(settings.log_dir)
+    report = build_report(columns)
+    if not report["sessions"]:
+        console.print("[yellow]Нет логов.[/yellow]")
+        return
 
+    def fmt(value, spec: str = ".2f") -> str:
+        return "-" if value is None else format(value, spec)
+
+    table = Table(title=f"Поведение по позициям (сессий: {report['sessions']})")
+    table.add_column("Позиция", style="cyan")
+    table.add_column("Сессий", justify="right")
+    table.add_column("Галл. на ход", justify="right")
+    table.add_column("Сессий с галл.", justify="right")
+    table.add_column("Уклон. на ход", justify="right")
+    table.add_column("Сессий с уклон.", justify="right")
+    for row in report["behavior_by_position"]:
+        table.add_row(
+            row["position"] or "?", str(row["sessions"]),
+            fmt(row["hallucinations_per_turn"]), fmt(row["sessions_with_hallucination"], ".0%"),
+            fmt(row["evasions_per_turn"]), fmt(row["sessions_with_evasion"], ".0%"),
+        )
     console.print(table)
 
+    confusion = report["grade_confusion"]
+    if confusion["sessions"]:
+        table = Table(title=f"Заявленный грейд × оценённый (совпадение {fmt(confusion['match_rate'], '.0%')})")
+        table.add_column("Заявлен \\ оценён", style="cyan")
+        for label in confusion["labels"]:
+            table.add_column(label, justify="right")
+        for label, counts in zip(confusion["labels"], confusion["matrix"]):
+            table.add_row(label, *(str(c) if c else "." for c in counts))
+        console.print(table)
+
+    table = Table(title="Soft skills (среднее, 1-10)")
+    table.add_column("Позиция", style="cyan")
+    table.add_column("Сессий", justify="right")
+    for title in ("Ясность", "Честность", "Вовлечённость", "Решение задач"):
+        table.add_column(title, justify="right")
+    for row in report["soft_skills"]:
+        position = "Все" if row["position"] == "*" else row["position"] or "?"
+        table.add_row(
+            position, str(row["sessions"]),
+            *(fmt(row[skill]) for skill in ("clarity", "honesty", "engagement", "problem_solving")),
+        )
+    console.print(table)
+
+    turns = report["turns_to_finish"]
+    console.print(
+        f"Ходов до завершения: среднее {fmt(turns['mean'])}, p50 {turns['p50']}, p90 {turns['p90']}, "
+        f"максимум {turns['max']}"
+    )
+    console.print("[dim]" + "  ".join(f"{t}: {c}" for t, c in turns["histogram"].items()) + "[/dim]")
+
+    if json_path:
+        console.print(f"[dim]JSON: {write_json(report, json_path)}[/dim]")
+    if csv_path:
+        console.print(f"[dim]CSV: {write_csv(report, csv_path)}[/dim]")
+
+
+@app.command()
+def recover_logs():
+    """Собрать логи прерванных интервью из журналов (когда интервью не идут)."""
+    journals = sorted(settings.log_dir.glob("interview_*.journal.jsonl")) if settings.log_dir.exists() else []
+    if not journals:
+        console.print("[yellow]Незавершённых журналов нет.[/yellow]")
+        return
+    for journal in journals:
+        console.print(f"[green]Восстановлен: {compact_journal(journal)}[/green]")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option(None, "--host", help="Адрес (по умолчанию SERVER_HOST)"),
+    port: int = typer.Option(None, "--port", help="Порт (по умолчанию SERVER_PORT)"),
+):
+    """Запустить HTTP/WebSocket-сервер для многих интервью."""
+    try:
+        from src.server.app import run_server
+    except ImportError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    run_server(host or settings.server_host, port or settings.server_port)
+
+
+@app.command()
+def bench(
+    scenarios: list[Path] = typer.Argument(None, help="Файлы или каталоги сценариев (по умолчанию scenarios/)"),
+    provider: str = typer.Option("scripted", "--provider", help="scripted или replay"),
+    cassette: Path = typer.Option(None, "--cassette", help="Кассета для replay (по умолчанию LLM_CASSETTE_PATH)"),
+    latency_ms: float = typer.Option(200.0, "--latency-ms", help="Имитируемая задержка LLM"),
+    jitter_ms: float = typer.Option(50.0, "--jitter-ms", help="Разброс задержки"),
+    concurrency: int = typer.Option(1, "-c", "--concurrency", help="Одновременных сессий"),
+    repeat: int = typer.Option(1, "-r", "--repeat", help="Сколько раз прогнать каждый сценарий"),
+    output: Path = typer.Option(Path("bench_results.json"), "-o", "--output", help="Куда записать JSON"),
+    baseline: Path = typer.Option(None, "--baseline", help="JSON прошлого прогона для сравнения"),
+    tolerance: float = typer.Option(0.1, "--tolerance", help="Допустимое ухудшение (доля)"),
+    incremental: bool = typer.Option(False, "--incremental", help="Инкрементальная оценка (INCREMENTAL_EVALUATION)"),
+):
+    """Замерить задержки и пропускную способность сессий на офлайн-провайдере."""
+    from src.bench import (
+        build_llms,
+        compare_to_baseline,
+        load_scenarios,
+        run_benchmark,
+        write_report,
+    )
+
+    loaded = load_scenarios(scenarios or [Path("scenarios")])
+    if not loaded:
+        console.print("[red]Сценарии не найдены[/red]")
+        raise typer.Exit(1)
+
+    try:
+        llms = build_llms(provider, latency_ms, jitter_ms, cassette or settings.llm_cassette_path)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    if settings.llm_cache_enabled:
+        console.print("[yellow]LLM_CACHE_ENABLED включён — повторные прогоны пойдут из кеша[/yellow]")
+    console.print(
+        f"[dim]Сценариев: {len(loaded)} × {repeat}, concurrency {concurrency}, "
+        f"{provider} {latency_ms}±{jitter_ms} мс[/dim]"
+    )
+    metrics = asyncio.run(run_benchmark(
+        loaded, llms, concurrency=concurrency, repeat=repeat, incremental_evaluation=incremental,
+    ))
+    config = {
+        "provider": provider,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "concurrency": concurrency,
+        "repeat": repeat,
+        "incremental_evaluation": incremental,
+        "scenarios": len(loaded),
+    }
+    write_report(output, config, metrics)
+
+    table = Table(title="Бенчмарк")
+    table.add_column("Метрика", style="cyan")
+    for col in ("p50", "p95", "p99"):
+        table.add_column(col, justify="right")
+    rows = (
+        ("turn_latency_ms", "Ход, мс"), ("greeting_ms", "Приветствие, мс"),
+        ("evaluator_ms", "Evaluator, мс"), ("queue_wait_ms", "Очередь лимитера, мс"),
+    )
+    for key, title in rows:
+        table.add_row(title, *(f"{metrics[key][col]:.1f}" for col in ("p50", "p95", "p99")))
+    console.print(table)
+    console.print(
+        f"Сессий: {metrics['sessions']} (ошибок {metrics['errors']}) | "
+        f"{metrics['sessions_per_sec']} сессий/с | пиковый RSS: {metrics['peak_rss_mb']} МБ"
+    )
+    console.print(f"[dim]Результат: {output}[/dim]")
+
+    if baseline:
+        base = json.loads(baseline.read_text(encoding="utf-8"))
+        rows = compare_to_baseline(metrics, base.get("metrics", base), tolerance)
+        diff = Table(title=f"Сравнение с {baseline.name}")
+        diff.add_column("Метрика", style="cyan")
+        diff.add_column("База", justify="right")
+        diff.add_column("Сейчас", justify="right")
+        diff.add_column("Δ%", justify="right")
+        for row in rows:
+            style = "red" if row["regression"] else "green"
+            diff.add_row(row["metric"], f"{row['baseline']:g}", f"{row['current']:g}", f"[{style}]{row['delta_pct']:+}[/{style}]")
+        console.print(diff)
+        if any(row["regression"] for row in rows):
+            raise typer.Exit(1)
+
+
+@app.command()
+def replay(
+    logs: list[Path] = typer.Argument(None, help="Файлы логов или каталоги (по умолчанию LOG_DIR)"),
+    provider: str = typer.Option(None, "--provider", help="Провайдер прогона (по умолчанию LLM_PROVIDER)"),
+    model: str = typer.Option(None, "--model", help="Модель прогона (по умолчанию LLM_MODEL)"),
+    temperature: float = typer.Option(None, "--temperature", help="Температура всех агентов (по умолчанию TEMP_*)"),
+    concurrency: int = typer.Option(4, "-c", "--concurrency", help="Одновременных сессий"),
+    output: Path = typer.Option(Path("replay_results.json"), "-o", "--output", help="Куда записать JSON с диффами"),
+    show_turns: bool = typer.Option(False, "--turns", help="Показать разошедшиеся ходы"),
+):
+    """Заново прогнать реплики кандидатов из логов и сравнить решения с записанными."""
+    from src.prompts import PROMPT_VERSION
+    from src.replay import build_report, collect_logs, log_agreement, replay_llms, run_replay
+
+    files = collect_logs(logs or [settings.log_dir])
+    if not files:
+        console.print("[yellow]Нет логов.[/yellow]")
+        raise typer.Exit(1)
+    make_llms = replay_llms(provider, model, temperature)
+    try:
+        make_llms()
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    config = {
+        "provider": provider or settings.llm_provider,
+        "model": model or settings.llm_model,
+        "temperature": temperature,
+        "prompt_version": PROMPT_VERSION,
+        "concurrency": concurrency,
+    }
+    console.print(
+        f"[dim]Логов: {len(files)}, {config['provider']}/{config['model']}, "
+        f"промпты {PROMPT_VERSION}, concurrency {concurrency}[/dim]"
+    )
+    results = asyncio.run(run_replay(files, make_llms, concurrency=concurrency))
+    report = build_report(config, results)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def fmt(value, spec: str = ".0%") -> str:
+        return "-" if value is None else format(value, spec)
+
+    table = Table(title="Повторный прогон")
+    table.add_column("Лог", style="cyan")
+    table.add_column("Ходы", justify="right")
+    table.add_column("Флаги", justify="right")
+    table.add_column("Рекомендация")
+    table.add_column("Грейд")
+    for result in results:
+        if result.status != "ok":
+            table.add_row(Path(result.log).name, "-", "-", f"[red]{result.error}[/red]", "")
+            continue
+        changes = []
+        for old, new in (
+            (result.baseline_recommendation, result.replay_recommendation),
+            (result.baseline_grade, result.replay_grade),
+        ):
+            changes.append(old or "-" if old == new else f"[red]{old or '-'} → {new or '-'}[/red]")
+        table.add_row(
+            Path(result.log).name, f"{result.baseline_turns} → {result.replay_turns}",
+            fmt(log_agreement(result)), *changes,
+        )
+    console.print(table)
+
+    if show_turns:
+        for result in results:
+            for row in result.turns:
+                if row["changed"] or row["baseline"] is None or row["replay"] is None:
+                    detail = ", ".join(
+                        f"{key}: {row['baseline'][key]} → {row['replay'][key]}" for key in row["changed"]
+                    ) or ("нет в прогоне" if row["replay"] is None else "нет разбора в логе")
+                    console.print(f"[dim]{Path(result.log).name} ход {row['turn_id']}:[/dim] {detail}")
+
+    summary = report["summary"]
+    console.print(
+        f"Ходов сравнено: {summary['turns_compared']} | флаги {fmt(summary['flag_agreement'], '.1%')} | "
+        f"сложность {fmt(summary['difficulty_agreement'])} | "
+        f"answer_quality MAE {fmt(summary['answer_quality_mae'], '.2f')} "
+        f"(сдвиг {fmt(summary['answer_quality_bias'], '+.2f')})"
+    )
+    console.print(
+        f"Рекомендация {fmt(summary['recommendation_agreement'])} | грейд {fmt(summary['grade_agreement'])} | "
+        f"длина интервью {fmt(summary['turn_count_agreement'])} | ошибок {summary['errors']}"
+    )
+    for change, count in summary["recommendation_changes"].items():
+        console.print(f"[yellow]{change}: {count}[/yellow]")
+    console.print(f"[dim]Диффы: {output}[/dim]")
+
 
 @app.command()
 def config():
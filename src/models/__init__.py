@@ -2,19 +2,23 @@
 
 from src.models.feedback import (
     Decision,
+    EvaluationDraft,
     FinalFeedback,
     HardSkillsAnalysis,
     KnowledgeGap,
     SoftSkillsAnalysis,
 )
-from src.models.state import InterviewState, SkillScore, Turn
+from src.models.state import InterviewState, LLMAttempt, SkillScore, TokenUsage, Turn
 
 __all__ = [
     "InterviewState",
     "Turn",
     "SkillScore",
+    "TokenUsage",
+    "LLMAttempt",
     "FinalFeedback",
     "Decision",
+    "EvaluationDraft",
     "HardSkillsAnalysis",
     "KnowledgeGap",
     "SoftSkillsAnalysis",
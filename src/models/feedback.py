@@ -76,6 +76,15 @@ class FinalFeedback(BaseModel):
     total_turns: int = 0
 
 
+class EvaluationDraft(BaseModel):
+    """Черновик оценки, который накапливается по ходу интервью."""
+
+    turns_folded: int = 0
+    knowledge_gaps: list[KnowledgeGap] = Field(default_factory=list)
+    skill_evidence: dict[str, list[str]] = Field(default_factory=dict)
+    summary: str = ""
+
+
 def feedback_to_log_dict(feedback: FinalFeedback) -> dict:
     """Конвертировать FinalFeedback в словарь для JSON-лога."""
     return {
@@ -7,6 +7,9 @@ from typing import Annotated, Literal
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
+from src.models.feedback import EvaluationDraft
+from src.models.transcript import Transcript
+
 
 class SkillScore(BaseModel):
     """Оценка навыка."""
@@ -31,6 +34,55 @@ class SoftSkillsTracker(BaseModel):
         return sum(self.clarity_scores) / len(self.clarity_scores) if self.clarity_scores else 5.0
 
 
+class TokenUsage(BaseModel):
+    """Расход токенов и стоимость вызовов LLM.
+
+    cached_tokens — часть input_tokens, прочитанная из кеша промптов провайдера.
+    """
+
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    calls: int = 0
+    cost_usd: float = 0.0
+
+    def __add__(self, other: TokenUsage) -> TokenUsage:
+        return TokenUsage(
+            input_tokens=self.input_tokens + other.input_tokens,
+            cached_tokens=self.cached_tokens + other.cached_tokens,
+            output_tokens=self.output_tokens + other.output_tokens,
+            total_tokens=self.total_tokens + other.total_tokens,
+            calls=self.calls + other.calls,
+            cost_usd=self.cost_usd + other.cost_usd,
+        )
+
+    def __sub__(self, other: TokenUsage) -> TokenUsage:
+        return TokenUsage(
+            input_tokens=self.input_tokens - other.input_tokens,
+            cached_tokens=self.cached_tokens - other.cached_tokens,
+            output_tokens=self.output_tokens - other.output_tokens,
+            total_tokens=self.total_tokens - other.total_tokens,
+            calls=self.calls - other.calls,
+            cost_usd=self.cost_usd - other.cost_usd,
+        )
+
+
+class LLMAttempt(BaseModel):
+    """Неудачная попытка вызова LLM: повтор после паузы или переход к резервному провайдеру.
+
+    attempt = 0 — провайдер пропущен, потому что его circuit breaker разомкнут.
+    """
+
+    agent: str
+    provider: str
+    attempt: int
+    status_code: int | None = None
+    error: str = ""
+    delay_s: float = 0.0
+    failover_to: str | None = None
+
+
 class Turn(BaseModel):
     """Один ход диалога."""
 
@@ -38,6 +90,11 @@ class Turn(BaseModel):
     agent_visible_message: str
     user_message: str
     internal_thoughts: str = ""
+    token_usage: dict[str, TokenUsage] = Field(default_factory=dict)
+    llm_attempts: list[LLMAttempt] = Field(default_factory=list)
+    # Разбор ответа Observer и сложность следующего вопроса после хода (для replay).
+    analysis: ObserverAnalysis | None = None
+    difficulty: int | None = None
 
 
 class ObserverAnalysis(BaseModel):
@@ -79,6 +136,7 @@ class InterviewState(TypedDict, total=False):
     experience: str
 
     turns: Annotated[list[Turn], "append"]
+    transcript: Transcript | None
     current_turn_id: int
     current_difficulty: int
     covered_topics: list[str]
@@ -107,6 +165,7 @@ class InterviewState(TypedDict, total=False):
     is_finished: bool
     finish_reason: str
     final_feedback: dict | None
+    evaluation_draft: EvaluationDraft | None
 
 
 class InterviewInput(BaseModel):
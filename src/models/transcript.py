@@ -0,0 +1,73 @@
+"""Отрендеренная история диалога, общая для агентов сессии."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.models.state import Turn
+
+
+def render_dialog_turn(turn: Turn) -> str:
+    """Ход в формате контекста Interviewer/Observer."""
+    return f"Интервьюер: {turn.agent_visible_message}\nКандидат: {turn.user_message}"
+
+
+def render_evaluator_turn(turn: Turn) -> str:
+    """Ход в формате полной стенограммы для Evaluator."""
+    return f"[Ход {turn.turn_id}]\nИнтервьюер: {turn.agent_visible_message}\nКандидат: {turn.user_message}\n"
+
+
+class Transcript:
+    """Буфер истории: каждый ход форматируется один раз при добавлении.
+
+    window(n) отдаёт последние n ходов (результат кешируется до следующего
+    хода), full() — полную стенограмму, которая наращивается по ходу интервью.
+    """
+
+    __slots__ = ("_dialog", "_full", "_window_cache")
+
+    def __init__(self):
+        self._dialog: list[str] = []
+        self._full = ""
+        self._window_cache: tuple[int, str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._dialog)
+
+    def append(self, turn: Turn) -> None:
+        self._dialog.append(render_dialog_turn(turn))
+        block = render_evaluator_turn(turn)
+        self._full = f"{self._full}\n{block}" if self._full else block
+        self._window_cache = None
+
+    def window(self, size: int) -> str:
+        if self._window_cache is None or self._window_cache[0] != size:
+            self._window_cache = (size, "\n".join(self._dialog[-size:] if size > 0 else self._dialog))
+        return self._window_cache[1]
+
+    def full(self) -> str:
+        return self._full
+
+
+def _synced(state: Any) -> Transcript | None:
+    """Буфер из состояния, если он совпадает с state["turns"]."""
+    transcript = state.get("transcript")
+    if transcript is not None and len(transcript) == len(state.get("turns", [])):
+        return transcript
+    return None
+
+
+def dialog_window(state: Any, size: int) -> str:
+    """Последние size ходов: из буфера сессии или рендером turns, если буфера нет."""
+    if transcript := _synced(state):
+        return transcript.window(size)
+    turns = state.get("turns", [])
+    return "\n".join(render_dialog_turn(t) for t in (turns[-size:] if size > 0 else turns))
+
+
+def full_transcript(state: Any) -> str:
+    """Полная стенограмма для Evaluator."""
+    if transcript := _synced(state):
+        return transcript.full()
+    return "\n".join(render_evaluator_turn(t) for t in state.get("turns", []))
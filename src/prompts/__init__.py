@@ -1,14 +1,33 @@
 """Промпты агентов."""
 
-from src.prompts.evaluator import EVALUATOR_SYSTEM_PROMPT, get_evaluator_prompt
-from src.prompts.interviewer import INTERVIEWER_SYSTEM_PROMPT, get_interviewer_prompt
-from src.prompts.observer import OBSERVER_SYSTEM_PROMPT, get_observer_prompt
+import hashlib
+
+from src.prompts.evaluator import (
+    EVALUATOR_SYSTEM_PROMPT,
+    get_evaluator_prefix,
+    get_evaluator_prompt,
+)
+from src.prompts.interviewer import (
+    INTERVIEWER_SYSTEM_PROMPT,
+    get_interviewer_prefix,
+    get_interviewer_prompt,
+)
+from src.prompts.observer import OBSERVER_SYSTEM_PROMPT, get_observer_prefix, get_observer_prompt
+
+# Версия промптов: хеш системных промптов агентов, пишется в лог каждой сессии.
+PROMPT_VERSION = hashlib.sha256(
+    "\0".join((INTERVIEWER_SYSTEM_PROMPT, OBSERVER_SYSTEM_PROMPT, EVALUATOR_SYSTEM_PROMPT)).encode()
+).hexdigest()[:12]
 
 __all__ = [
+    "PROMPT_VERSION",
     "INTERVIEWER_SYSTEM_PROMPT",
     "OBSERVER_SYSTEM_PROMPT",
     "EVALUATOR_SYSTEM_PROMPT",
+    "get_interviewer_prefix",
     "get_interviewer_prompt",
+    "get_observer_prefix",
     "get_observer_prompt",
+    "get_evaluator_prefix",
     "get_evaluator_prompt",
 ]
@@ -1,4 +1,12 @@
-"""Промпты агента Evaluator."""
+"""Промпты агента Evaluator.
+
+Системное сообщение (роль, формат фидбэка, позиция, грейд, опыт) не меняется
+за сессию, данные и история — в сообщении с запросом.
+"""
+
+from functools import lru_cache
+
+from src.models.feedback import EvaluationDraft
 
 EVALUATOR_SYSTEM_PROMPT = """Ты — Evaluator в мультиагентной системе технического интервью.
 
@@ -22,64 +30,84 @@ EVALUATOR_SYSTEM_PROMPT = """Ты — Evaluator в мультиагентной
 - No Hire: не соответствует или red flags"""
 
 
-def get_evaluator_prompt(
-    position: str,
-    target_grade: str,
-    experience: str,
-    conversation_history: str,
-    skill_scores: dict,
-    total_turns: int,
-    behavior_stats: dict | None = None,
-    soft_skills_data: dict | None = None,
-) -> str:
-    """Сгенерировать промпт оценки с полным контекстом."""
-    skills_str = ""
-    if skill_scores:
-        for topic, score in skill_scores.items():
-            if hasattr(score, "score"):
-                skills_str += f"- {topic}: {score.score}/10 (верно: {score.correct_answers}, ошибок: {score.incorrect_answers})\n"
-            else:
-                skills_str += f"- {topic}: {score}\n"
-    else:
-        skills_str = "Нет оценок"
-    
-    behavior_str = ""
-    if behavior_stats:
-        behavior_str = f"""
-Поведение:
-- Уклонений: {behavior_stats.get('evasion_count', 0)}
-- Галлюцинаций: {behavior_stats.get('hallucination_count', 0)}
-- Уверенного бреда: {behavior_stats.get('confident_nonsense_count', 0)}
-- Overqualified сигналов: {behavior_stats.get('overqualified_signals', 0)}
-- Underqualified сигналов: {behavior_stats.get('underqualified_signals', 0)}
-- Подсказок: {behavior_stats.get('hints_used', 0)}
-"""
-    
-    soft_str = ""
-    if soft_skills_data:
-        clarity_scores = soft_skills_data.get('clarity_scores', [5])
-        avg_clarity = sum(clarity_scores) / max(1, len(clarity_scores))
-        soft_str = f"""
-Soft Skills:
-- Средняя ясность: {avg_clarity:.1f}/10
-- Честных признаний: {len(soft_skills_data.get('honesty_signals', []))}
-- Проявлений интереса: {len(soft_skills_data.get('engagement_signals', []))}
-- Red flags: {', '.join(soft_skills_data.get('red_flags', [])) or 'нет'}
-"""
+EVALUATOR_DRAFT_SYSTEM_PROMPT = """Ты — Evaluator в мультиагентной системе технического интервью.
 
-    return f"""Данные интервью:
-- Позиция: {position}
-- Заявленный грейд: {target_grade}
-- Опыт: {experience}
-- Вопросов: {total_turns}
+Интервью ещё идёт. Ты ведёшь черновик оценки: после каждого хода дополняешь его
+по новым репликам, не пересматривая уже учтённые ходы.
 
-Оценки по навыкам:
-{skills_str}
-{behavior_str}{soft_str}
-История диалога:
-{conversation_history}
+Фиксируй:
+- Пробелы в знаниях с правильными ответами
+- Подтверждения навыков (коротко, по фактам из ответа)
+- Краткое промежуточное резюме по кандидату"""
+
+
+def format_evaluation_draft(draft: EvaluationDraft) -> str:
+    """Черновик оценки в текст для промпта."""
+    parts = [f"Резюме: {draft.summary or 'нет'}"]
+    if draft.skill_evidence:
+        parts.append("Подтверждения навыков:")
+        for skill, evidence in draft.skill_evidence.items():
+            parts.append(f"- {skill}: {'; '.join(evidence)}")
+    if draft.knowledge_gaps:
+        parts.append("Пробелы:")
+        for gap in draft.knowledge_gaps:
+            parts.append(
+                f"- {gap.topic} ({gap.severity}): вопрос «{gap.question_asked}», "
+                f"ответ «{gap.candidate_answer}», верно: {gap.correct_answer}"
+            )
+    return "\n".join(parts)
 
-Сгенерируй фидбэк в JSON:
+
+EVALUATOR_DRAFT_OUTPUT_FORMAT = """Дополняй черновик только по новым ходам. Формат ответа — JSON:
+
+```json
+{
+    "knowledge_gaps": [
+        {
+            "topic": "тема",
+            "question_asked": "вопрос",
+            "candidate_answer": "что ответил",
+            "correct_answer": "правильный ответ",
+            "severity": "low/medium/high"
+        }
+    ],
+    "skill_evidence": [{"skill": "навык", "evidence": "что подтверждает"}],
+    "summary": "Обновлённое резюме по всем ходам (2-3 предложения)"
+}
+```
+
+Пустые списки, если по новым ходам добавить нечего. Без кавычек внутри строк и trailing comma.
+
+Верни только JSON."""
+
+
+@lru_cache(maxsize=64)
+def get_evaluator_draft_prefix(position: str, target_grade: str) -> str:
+    """Системное сообщение для обновлений черновика: одинаковое за сессию."""
+    return f"""{EVALUATOR_DRAFT_SYSTEM_PROMPT}
+
+{EVALUATOR_DRAFT_OUTPUT_FORMAT}
+
+Позиция: {position}, заявленный грейд: {target_grade}"""
+
+
+def get_evaluator_draft_prompt(draft: str, new_turns: str) -> str:
+    """Переменная часть промпта обновления черновика."""
+    return f"""Текущий черновик:
+{draft}
+
+Новые ходы:
+{new_turns}
+
+Верни только JSON по формату:"""
+
+
+@lru_cache(maxsize=64)
+def get_evaluator_prefix(position: str, target_grade: str, experience: str) -> str:
+    """Системное сообщение Evaluator: роль, формат фидбэка и данные кандидата."""
+    return f"""{EVALUATOR_SYSTEM_PROMPT}
+
+Формат фидбэка — JSON:
 
 ```json
 {{
@@ -147,4 +175,73 @@ Soft Skills:
 - Без trailing comma перед }} или ].
 - Краткие summary и correct_answer (до 2-3 предложений) — длинный текст чаще ломает JSON.
 
-Верни только JSON:"""
+Верни только JSON.
+
+Кандидат:
+- Позиция: {position}
+- Заявленный грейд: {target_grade}
+- Опыт: {experience}"""
+
+
+def get_evaluator_prompt(
+    skill_scores: dict,
+    total_turns: int,
+    conversation_history: str,
+    behavior_stats: dict | None = None,
+    soft_skills_data: dict | None = None,
+    evaluation_draft: str | None = None,
+) -> str:
+    """Сгенерировать переменную часть промпта оценки.
+
+    Если передан evaluation_draft, в conversation_history — только ходы после черновика.
+    """
+    skills_str = ""
+    if skill_scores:
+        for topic, score in skill_scores.items():
+            if hasattr(score, "score"):
+                skills_str += f"- {topic}: {score.score}/10 (верно: {score.correct_answers}, ошибок: {score.incorrect_answers})\n"
+            else:
+                skills_str += f"- {topic}: {score}\n"
+    else:
+        skills_str = "Нет оценок"
+    
+    behavior_str = ""
+    if behavior_stats:
+        behavior_str = f"""
+Поведение:
+- Уклонений: {behavior_stats.get('evasion_count', 0)}
+- Галлюцинаций: {behavior_stats.get('hallucination_count', 0)}
+- Уверенного бреда: {behavior_stats.get('confident_nonsense_count', 0)}
+- Overqualified сигналов: {behavior_stats.get('overqualified_signals', 0)}
+- Underqualified сигналов: {behavior_stats.get('underqualified_signals', 0)}
+- Подсказок: {behavior_stats.get('hints_used', 0)}
+"""
+    
+    soft_str = ""
+    if soft_skills_data:
+        clarity_scores = soft_skills_data.get('clarity_scores', [5])
+        avg_clarity = sum(clarity_scores) / max(1, len(clarity_scores))
+        soft_str = f"""
+Soft Skills:
+- Средняя ясность: {avg_clarity:.1f}/10
+- Честных признаний: {len(soft_skills_data.get('honesty_signals', []))}
+- Проявлений интереса: {len(soft_skills_data.get('engagement_signals', []))}
+- Red flags: {', '.join(soft_skills_data.get('red_flags', [])) or 'нет'}
+"""
+
+    draft_str = ""
+    if evaluation_draft:
+        draft_str = f"""
+Черновик оценки по уже разобранным ходам (уточни и дополни, не теряя пробелов):
+{evaluation_draft}
+"""
+
+    return f"""Вопросов: {total_turns}
+
+Оценки по навыкам:
+{skills_str}
+{behavior_str}{soft_str}{draft_str}
+История диалога:
+{conversation_history}
+
+Сгенерируй фидбэк. Верни только JSON по формату:"""
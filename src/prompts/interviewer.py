@@ -1,4 +1,10 @@
-"""Промпты агента Interviewer."""
+"""Промпты агента Interviewer.
+
+Системное сообщение (роль, позиция, грейд, опыт, банк тем) не меняется
+за сессию, история и задача хода — в сообщении хода.
+"""
+
+from functools import lru_cache
 
 INTERVIEWER_SYSTEM_PROMPT = """Ты — опытный технический интервьюер. Ведёшь собеседование профессионально и дружелюбно.
 
@@ -36,10 +42,20 @@ INTERVIEWER_SYSTEM_PROMPT = """Ты — опытный технический и
 Отвечай только текстом для кандидата."""
 
 
+@lru_cache(maxsize=64)
+def get_interviewer_prefix(position: str, grade: str, experience: str, topic_names: tuple[str, ...]) -> str:
+    """Системное сообщение Interviewer: одинаковое для всех ходов сессии."""
+    topics_str = ", ".join(topic_names) if topic_names else "нет"
+    return f"""{INTERVIEWER_SYSTEM_PROMPT}
+
+Контекст:
+Позиция: {position} | Грейд: {grade} | Опыт: {experience}
+Темы для позиции: {topics_str}"""
+
+
 def get_interviewer_prompt(
     position: str,
     grade: str,
-    experience: str,
     covered_topics: list[str],
     skipped_topics: list[str],
     candidate_mentioned: list[str] | None = None,
@@ -52,7 +68,7 @@ def get_interviewer_prompt(
     interview_phase: str = "technical",
     is_first_message: bool = False,
 ) -> str:
-    """Сгенерировать промпт интервьюера для текущего хода."""
+    """Сгенерировать переменную часть промпта интервьюера для текущего хода."""
     covered_str = ", ".join(covered_topics) if covered_topics else "нет"
     skipped_str = ", ".join(skipped_topics) if skipped_topics else "нет"
     suggested_str = ", ".join(suggested_topics[:3]) if suggested_topics else ""
@@ -109,10 +125,7 @@ def get_interviewer_prompt(
 
 Не переспрашивай то, что кандидат уже рассказал. Задай следующий технический вопрос или отреагируй на ответ."""
 
-    return f"""Контекст:
-Позиция: {position} | Грейд: {grade} | Опыт: {experience}
-
-История диалога:
+    return f"""История диалога:
 {conversation_history if conversation_history else "Начало интервью"}
 
 Задача:
@@ -1,4 +1,10 @@
-"""Промпты агента Observer."""
+"""Промпты агента Observer.
+
+Системное сообщение (роль, формат ответа, позиция и грейд) не меняется
+за сессию, всё переменное — в сообщении хода.
+"""
+
+from functools import lru_cache
 
 OBSERVER_SYSTEM_PROMPT = """Ты — Observer в мультиагентной системе технического интервью.
 
@@ -25,40 +31,10 @@ OBSERVER_SYSTEM_PROMPT = """Ты — Observer в мультиагентной с
 Не делаешь: общаться с кандидатом, принимать решение о найме."""
 
 
-def get_observer_prompt(
-    position: str,
-    grade: str,
-    current_question: str,
-    user_answer: str,
-    conversation_history: str,
-    covered_topics: list[str],
-    skipped_topics: list[str],
-    current_difficulty: int,
-    interview_phase: str = "technical",
-) -> str:
-    """Сгенерировать промпт Observer для анализа ответа кандидата."""
-    covered_str = ", ".join(covered_topics) if covered_topics else "нет"
-    skipped_str = ", ".join(skipped_topics) if skipped_topics else "нет"
-
-    return f"""Контекст интервью:
-- Позиция: {position} | Грейд: {grade} | Сложность: {current_difficulty}/5
-- Фаза: {interview_phase}
-- Раскрытые темы: {covered_str}
-- Пропущенные: {skipped_str}
-
-История:
-{conversation_history}
-
-Вопрос:
-{current_question}
-
-Ответ кандидата:
-{user_answer}
-
-Твоя задача — анализ. Верни JSON:
+OBSERVER_OUTPUT_FORMAT = """Формат ответа — JSON:
 
 ```json
-{{
+{
     "current_topic": "...",
     
     "wants_to_end_interview": true/false,
@@ -88,7 +64,7 @@ def get_observer_prompt(
     "instruction_to_interviewer": "...",
     "should_adjust_difficulty": "up/down/same",
     "thoughts": "..."
-}}
+}
 ```
 
 Важно: Краткий ответ с верной сутью = topic_covered=true, answer_quality 7+. Не давать подсказку (не объяснять самому) — кандидат уже прав. Можно попросить расширить или задать уточняющий вопрос («Можешь чуть подробнее?», «Приведи пример»), если хочется проверить глубину. Либо принять и двигаться дальше.
@@ -107,4 +83,45 @@ Grade mismatch:
 - Junior отвечает про архитектуру микросервисов как Senior -> overqualified
 - Senior не знает что такое JOIN -> underqualified
 
-Верни только JSON:"""
+Верни только JSON."""
+
+
+@lru_cache(maxsize=64)
+def get_observer_prefix(position: str, grade: str) -> str:
+    """Системное сообщение Observer: одинаковое для всех ходов сессии."""
+    return f"""{OBSERVER_SYSTEM_PROMPT}
+
+{OBSERVER_OUTPUT_FORMAT}
+
+Контекст интервью:
+- Позиция: {position} | Грейд: {grade}"""
+
+
+def get_observer_prompt(
+    current_question: str,
+    user_answer: str,
+    conversation_history: str,
+    covered_topics: list[str],
+    skipped_topics: list[str],
+    current_difficulty: int,
+    interview_phase: str = "technical",
+) -> str:
+    """Сгенерировать переменную часть промпта Observer для текущего хода."""
+    covered_str = ", ".join(covered_topics) if covered_topics else "нет"
+    skipped_str = ", ".join(skipped_topics) if skipped_topics else "нет"
+
+    return f"""Текущий ход:
+- Сложность: {current_difficulty}/5 | Фаза: {interview_phase}
+- Раскрытые темы: {covered_str}
+- Пропущенные: {skipped_str}
+
+История:
+{conversation_history}
+
+Вопрос:
+{current_question}
+
+Ответ кандидата:
+{user_answer}
+
+Проанализируй ответ и верни только JSON по формату:"""
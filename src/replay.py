@@ -0,0 +1,240 @@
+"""Повторный прогон логов интервью на другой модели или версии промптов.
+
+Реплики кандидата из лога заново подаются в InterviewSession, разбор каждого
+хода (флаги Observer, answer_quality, сложность) и итоговое решение
+сравниваются с записанными в логе. Сводка — доли совпадений по всем логам.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+
+from src.agents.base import LLMAPIError
+from src.graph.interview_graph import InterviewSession
+from src.llm.provider import get_llm_for_agent
+from src.models.state import Turn
+from src.utils.catalog import entry_from_log
+from src.utils.logger import load_interview_log
+
+AGENT_TYPES = ("interviewer", "observer", "evaluator")
+
+# Поля ObserverAnalysis, которые сравниваются по ходам.
+FLAGS = (
+    "wants_to_end_interview",
+    "wants_to_skip",
+    "topic_covered",
+    "is_evasive",
+    "is_confident_nonsense",
+    "grade_mismatch",
+    "is_spam_or_troll",
+    "is_valid_answer",
+    "is_hallucination",
+    "is_off_topic",
+    "is_question_from_user",
+)
+
+LLMFactory = Callable[[], dict[str, BaseChatModel]]
+
+
+@dataclass
+class ReplayResult:
+    """Итог повторного прогона одного лога."""
+
+    log: str
+    status: str = "ok"
+    error: str | None = None
+    baseline_turns: int = 0
+    replay_turns: int = 0
+    baseline_recommendation: str | None = None
+    replay_recommendation: str | None = None
+    baseline_grade: str | None = None
+    replay_grade: str | None = None
+    turns: list[dict[str, Any]] = field(default_factory=list)
+
+
+def replay_llms(
+    provider: str | None = None,
+    model: str | None = None,
+    temperature: float | None = None,
+) -> LLMFactory:
+    """Фабрика LLM агентов для одной сессии; None — как в настройках (температура — своя у агента).
+
+    Сетевые клиенты берутся из общего реестра, офлайн-провайдеры создаются на каждую сессию.
+    """
+    return lambda: {agent: get_llm_for_agent(agent, temperature, provider, model) for agent in AGENT_TYPES}
+
+
+def collect_logs(paths: list[Path]) -> list[Path]:
+    """Файлы логов: сами файлы и interview_*.json из каталогов."""
+    files: list[Path] = []
+    for path in paths:
+        files.extend(sorted(path.glob("interview_*.json")) if path.is_dir() else [path])
+    return files
+
+
+def snapshot(analysis: dict[str, Any] | None, difficulty: int | None) -> dict[str, Any] | None:
+    """Сравниваемая часть хода: флаги, answer_quality и сложность; None — разбора нет в логе."""
+    if analysis is None:
+        return None
+    return {
+        **{flag: analysis.get(flag) for flag in FLAGS},
+        "answer_quality": analysis.get("answer_quality"),
+        "difficulty": difficulty,
+    }
+
+
+def _turn_snapshot(turn: Turn) -> dict[str, Any] | None:
+    analysis = turn.analysis.model_dump() if turn.analysis is not None else None
+    return snapshot(analysis, turn.difficulty)
+
+
+def diff_turns(baseline: list[dict[str, Any]], replayed: list[Turn]) -> list[dict[str, Any]]:
+    """Ход за ходом: снимки лога и прогона и список разошедшихся полей.
+
+    Если прогон завершился раньше или позже, у лишних ходов второй снимок — None.
+    """
+    rows = []
+    for index in range(max(len(baseline), len(replayed))):
+        base = snapshot(baseline[index].get("analysis"), baseline[index].get("difficulty")) if index < len(baseline) else None
+        new = _turn_snapshot(replayed[index]) if index < len(replayed) else None
+        changed = [key for key in base if base[key] != new[key]] if base and new else []
+        rows.append({"turn_id": index + 1, "baseline": base, "replay": new, "changed": changed})
+    return rows
+
+
+async def replay_log(log_file: Path, make_llms: LLMFactory) -> ReplayResult:
+    """Прогнать реплики кандидата из лога через новую сессию и сравнить с логом."""
+    result = ReplayResult(log=str(log_file))
+    try:
+        log = load_interview_log(log_file)
+    except (OSError, ValueError) as e:
+        result.status, result.error = "error", f"Лог не читается: {e}"
+        return result
+
+    turns = log.get("turns", [])
+    baseline = entry_from_log(log_file, log)
+    result.baseline_turns = len(turns)
+    result.baseline_recommendation = baseline.recommendation
+    result.baseline_grade = baseline.assessed_grade
+
+    session = InterviewSession(llms=make_llms(), warmup="off")
+    try:
+        await session.ainitialize(
+            log.get("participant_name", ""), log.get("position", ""), log.get("grade", ""), log.get("experience", ""),
+        )
+        finished = False
+        for turn in turns:
+            _, finished, _ = await session.aprocess_user_input(turn["user_message"])
+            if finished:
+                break
+        # Итоговое решение нужно только для сравнения с логом, где оно есть.
+        if not finished and baseline.recommendation is not None:
+            await session.afinish()
+    except LLMAPIError as e:
+        result.status, result.error = "error", str(e)
+    finally:
+        session.cancel_background()
+
+    decision = (session.get_final_feedback() or {}).get("decision", {})
+    result.replay_recommendation = decision.get("hiring_recommendation")
+    result.replay_grade = decision.get("assessed_grade")
+    replayed = session.get_turns()
+    result.replay_turns = len(replayed)
+    result.turns = diff_turns(turns, replayed)
+    return result
+
+
+async def run_replay(
+    log_files: list[Path],
+    make_llms: LLMFactory,
+    concurrency: int = 4,
+    on_result: Callable[[ReplayResult], None] | None = None,
+) -> list[ReplayResult]:
+    """Прогнать логи, не больше concurrency одновременно; результаты в порядке log_files."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(log_file: Path) -> ReplayResult:
+        async with semaphore:
+            result = await replay_log(log_file, make_llms)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return list(await asyncio.gather(*(bounded(f) for f in log_files)))
+
+
+def _rate(matched: int, total: int) -> float | None:
+    return round(matched / total, 3) if total else None
+
+
+def summarize(results: list[ReplayResult]) -> dict[str, Any]:
+    """Доли совпадений по всем логам.
+
+    Ходы сравниваются, только если разбор есть и в логе, и в прогоне (старые
+    логи без analysis пропускаются); решения — если они есть с обеих сторон.
+    """
+    flags: Counter[str] = Counter()
+    compared = difficulty = quality_n = 0
+    quality_abs = quality_sum = 0.0
+    decisions = {"recommendation": [0, 0], "grade": [0, 0]}
+    transitions: Counter[str] = Counter()
+    same_length = 0
+    ok = [r for r in results if r.status == "ok"]
+
+    for result in ok:
+        same_length += result.baseline_turns == result.replay_turns
+        for row in result.turns:
+            base, new = row["baseline"], row["replay"]
+            if base is None or new is None:
+                continue
+            compared += 1
+            flags.update(flag for flag in FLAGS if base[flag] == new[flag])
+            difficulty += base["difficulty"] == new["difficulty"]
+            if base["answer_quality"] is not None and new["answer_quality"] is not None:
+                delta = new["answer_quality"] - base["answer_quality"]
+                quality_abs += abs(delta)
+                quality_sum += delta
+                quality_n += 1
+        for name, old, new in (
+            ("recommendation", result.baseline_recommendation, result.replay_recommendation),
+            ("grade", result.baseline_grade, result.replay_grade),
+        ):
+            if old is not None and new is not None:
+                decisions[name][0] += old.casefold() == new.casefold()
+                decisions[name][1] += 1
+        if result.baseline_recommendation and result.replay_recommendation:
+            if result.baseline_recommendation != result.replay_recommendation:
+                transitions[f"{result.baseline_recommendation} -> {result.replay_recommendation}"] += 1
+
+    return {
+        "logs": len(results),
+        "errors": len(results) - len(ok),
+        "turns_compared": compared,
+        "flag_agreement": _rate(sum(flags.values()), compared * len(FLAGS)),
+        "flag_agreement_by_flag": {flag: _rate(flags[flag], compared) for flag in FLAGS},
+        "answer_quality_mae": round(quality_abs / quality_n, 3) if quality_n else None,
+        "answer_quality_bias": round(quality_sum / quality_n, 3) if quality_n else None,
+        "difficulty_agreement": _rate(difficulty, compared),
+        "turn_count_agreement": _rate(same_length, len(ok)),
+        "recommendation_agreement": _rate(*decisions["recommendation"]),
+        "grade_agreement": _rate(*decisions["grade"]),
+        "recommendation_changes": dict(transitions.most_common()),
+    }
+
+
+def log_agreement(result: ReplayResult) -> float | None:
+    """Доля совпавших флагов по сравнимым ходам одного лога."""
+    rows = [row for row in result.turns if row["baseline"] is not None and row["replay"] is not None]
+    return _rate(sum(len(FLAGS) - len(set(row["changed"]) & set(FLAGS)) for row in rows), len(rows) * len(FLAGS))
+
+
+def build_report(config: dict[str, Any], results: list[ReplayResult]) -> dict[str, Any]:
+    """Отчёт для --output: настройки прогона, сводка и диффы по логам."""
+    return {"config": config, "summary": summarize(results), "logs": [asdict(r) for r in results]}
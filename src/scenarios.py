@@ -0,0 +1,84 @@
+"""Загрузка сценариев интервью из файлов."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+DEFAULT_METADATA = {
+    "name": "Тест",
+    "position": "Backend Developer",
+    "grade": "Junior",
+    "experience": "Python",
+}
+
+
+def load_scenario(file_path: Path) -> tuple[dict, list[str]]:
+    """Загрузить сценарий из файла."""
+    lines = file_path.read_text(encoding="utf-8").strip().split("\n")
+    
+    metadata = dict(DEFAULT_METADATA)
+    messages = []
+    in_messages = False
+    
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        
+        if line == "---":
+            in_messages = True
+            continue
+        
+        if in_messages:
+            messages.append(line)
+        else:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip().lower()
+                value = value.strip()
+                if key in metadata:
+                    metadata[key] = value
+    
+    return metadata, messages
+
+
+def load_scenario_batch(source: str) -> list[tuple[str, dict, list[str]]]:
+    """Сценарии для пакетного прогона: [(id, метаданные, реплики)].
+
+    source — каталог (*.txt), glob-шаблон (scenarios/*.txt) или JSONL, где
+    каждая строка — {"id", "name", "position", "grade", "experience", "messages"}.
+    id — имя файла без расширения или поле id (иначе «файл_номерстроки»).
+    Сценарии без реплик пропускаются.
+    """
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(path.glob("*.txt"))
+    elif path.suffix == ".jsonl" and path.is_file():
+        return _load_jsonl(path)
+    elif any(c in source for c in "*?["):
+        anchor = Path(path.anchor or ".")
+        files = sorted(anchor.glob(str(path.relative_to(anchor)) if path.anchor else source))
+    else:
+        files = [path]
+
+    batch = []
+    for file in files:
+        metadata, messages = load_scenario(file)
+        if messages:
+            batch.append((file.stem, metadata, messages))
+    return batch
+
+
+def _load_jsonl(path: Path) -> list[tuple[str, dict, list[str]]]:
+    batch = []
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        metadata = dict(DEFAULT_METADATA)
+        metadata.update({key: str(item[key]) for key in DEFAULT_METADATA if item.get(key)})
+        messages = [str(m) for m in item.get("messages", []) if str(m).strip()]
+        if messages:
+            batch.append((str(item.get("id") or f"{path.stem}_{lineno}"), metadata, messages))
+    return batch
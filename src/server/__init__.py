@@ -0,0 +1,9 @@
+"""Сервер для многих одновременных интервью.
+
+HTTP/WebSocket-приложение (src.server.app) требует aiohttp:
+pip install 'interview-coach[server]'.
+"""
+
+from src.server.sessions import ManagedSession, SessionManager
+
+__all__ = ["ManagedSession", "SessionManager"]
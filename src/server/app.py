@@ -0,0 +1,196 @@
+"""HTTP/WebSocket API для многих одновременных интервью."""
+
+from __future__ import annotations
+
+import json
+
+try:
+    from aiohttp import WSMsgType, web
+except ImportError as e:
+    raise ImportError(
+        "Для сервера нужен aiohttp: pip install 'interview-coach[server]'"
+    ) from e
+
+from src.agents.base import LLMAPIError
+from src.llm.limiter import limiter_stats
+from src.llm.provider import aclose_http_clients
+from src.server.sessions import SessionManager
+from src.topics import SUPPORTED_POSITIONS, normalize_position
+
+MANAGER_KEY = web.AppKey("manager", SessionManager)
+
+
+def _error(status: int, message: str) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+
+def _manager(request: web.Request) -> SessionManager:
+    return request.app[MANAGER_KEY]
+
+
+def _result(response: str, is_finished: bool, feedback: dict | None) -> dict:
+    return {"response": response, "is_finished": is_finished, "feedback": feedback}
+
+
+async def _read_json(request: web.Request) -> dict:
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        raise web.HTTPBadRequest(text="Ожидается JSON")
+    if not isinstance(data, dict):
+        raise web.HTTPBadRequest(text="Ожидается JSON-объект")
+    return data
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok", "sessions": len(_manager(request))})
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return web.json_response({"sessions": len(_manager(request)), "llm_limiters": limiter_stats()})
+
+
+async def create_session(request: web.Request) -> web.Response:
+    data = await _read_json(request)
+    position = normalize_position(data.get("position", "Backend Developer"))
+    if not position:
+        return _error(400, f"Позиция не поддерживается. Доступные: {', '.join(SUPPORTED_POSITIONS)}")
+
+    try:
+        session_id, greeting = await _manager(request).create(
+            name=data.get("name", "Кандидат"),
+            position=position,
+            grade=data.get("grade", "Junior"),
+            experience=data.get("experience", ""),
+        )
+    except LLMAPIError as e:
+        return _error(502, str(e))
+    return web.json_response({"session_id": session_id, "greeting": greeting}, status=201)
+
+
+async def get_session(request: web.Request) -> web.Response:
+    try:
+        managed = _manager(request).get(request.match_info["session_id"])
+    except KeyError:
+        return _error(404, "Сессия не найдена")
+
+    session = managed.session
+    return web.json_response({
+        "session_id": managed.session_id,
+        "turns": [turn.model_dump() for turn in session.get_turns()],
+        "is_finished": session.is_finished(),
+        "final_feedback": session.get_final_feedback(),
+        "token_usage": session.get_total_usage().model_dump(),
+    })
+
+
+async def post_message(request: web.Request) -> web.Response:
+    data = await _read_json(request)
+    message = str(data.get("message", "")).strip()
+    if not message:
+        return _error(400, "Пустое сообщение")
+
+    try:
+        result = await _manager(request).step(request.match_info["session_id"], message)
+    except KeyError:
+        return _error(404, "Сессия не найдена")
+    except RuntimeError as e:
+        return _error(409, str(e))
+    except LLMAPIError as e:
+        return _error(502, str(e))
+    return web.json_response(_result(*result))
+
+
+async def finish_session(request: web.Request) -> web.Response:
+    try:
+        result = await _manager(request).finish(request.match_info["session_id"])
+    except KeyError:
+        return _error(404, "Сессия не найдена")
+    except LLMAPIError as e:
+        return _error(502, str(e))
+    return web.json_response(_result(*result))
+
+
+async def delete_session(request: web.Request) -> web.Response:
+    await _manager(request).remove(request.match_info["session_id"])
+    return web.Response(status=204)
+
+
+async def session_ws(request: web.Request) -> web.WebSocketResponse:
+    """WebSocket: клиент шлёт {"message": ...}, сервер — chunk-и и итоговый done."""
+    manager = _manager(request)
+    session_id = request.match_info["session_id"]
+    try:
+        manager.get(session_id)
+    except KeyError:
+        raise web.HTTPNotFound(text="Сессия не найдена")
+
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+
+    async for msg in ws:
+        if msg.type != WSMsgType.TEXT:
+            continue
+        try:
+            message = str(json.loads(msg.data).get("message", "")).strip()
+        except (json.JSONDecodeError, AttributeError):
+            await ws.send_json({"type": "error", "error": "Ожидается {\"message\": ...}"})
+            continue
+        if not message:
+            await ws.send_json({"type": "error", "error": "Пустое сообщение"})
+            continue
+
+        try:
+            async for chunk in manager.stream(session_id, message):
+                await ws.send_json({"type": "chunk", "text": chunk})
+        except KeyError:
+            await ws.send_json({"type": "error", "error": "Сессия не найдена"})
+            break
+        except (LLMAPIError, RuntimeError) as e:
+            await ws.send_json({"type": "error", "error": str(e)})
+            continue
+
+        session = manager.get(session_id).session
+        await ws.send_json({
+            "type": "done",
+            # Итоговая реплика: заменяет склейку chunk, если фильтр вырезал мета-строку после показа.
+            "message": None if session.is_finished() else session.get_state()["current_agent_message"],
+            "is_finished": session.is_finished(),
+            "feedback": session.get_final_feedback(),
+        })
+        if session.is_finished():
+            break
+
+    await ws.close()
+    return ws
+
+
+def create_app(manager: SessionManager | None = None) -> web.Application:
+    """Собрать aiohttp-приложение с общим SessionManager."""
+    app = web.Application()
+    app[MANAGER_KEY] = manager if manager is not None else SessionManager()
+
+    async def on_startup(app: web.Application) -> None:
+        app[MANAGER_KEY].start_cleanup()
+
+    async def on_cleanup(app: web.Application) -> None:
+        await app[MANAGER_KEY].close()
+        await aclose_http_clients()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_post("/sessions", create_session)
+    app.router.add_get("/sessions/{session_id}", get_session)
+    app.router.add_delete("/sessions/{session_id}", delete_session)
+    app.router.add_post("/sessions/{session_id}/messages", post_message)
+    app.router.add_post("/sessions/{session_id}/finish", finish_session)
+    app.router.add_get("/sessions/{session_id}/ws", session_ws)
+    return app
+
+
+def run_server(host: str, port: int) -> None:
+    """Запустить сервер до остановки процесса."""
+    web.run_app(create_app(), host=host, port=port)
@@ -0,0 +1,181 @@
+"""Реестр активных сессий интервью для сервера."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from langchain_core.language_models import BaseChatModel
+
+from src.config import settings
+from src.graph.interview_graph import InterviewSession
+from src.llm.provider import get_llm_for_agent
+from src.utils.logger import InterviewLogger
+
+AGENT_TYPES = ("interviewer", "observer", "evaluator")
+
+
+@dataclass
+class ManagedSession:
+    """Сессия интервью с логгером и временем последней активности."""
+
+    session_id: str
+    session: InterviewSession
+    logger: InterviewLogger
+    created_at: float = field(default_factory=time.monotonic)
+    last_active: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def touch(self) -> None:
+        self.last_active = time.monotonic()
+
+
+class SessionManager:
+    """Создаёт, ведёт и очищает сессии по ID.
+
+    Клиенты LLM создаются один раз и общие для всех сессий. Ходы одной
+    сессии выполняются последовательно, разные сессии — конкурентно.
+    Простаивающие и завершённые сессии удаляются фоновой задачей.
+    """
+
+    def __init__(
+        self,
+        llms: dict[str, BaseChatModel] | None = None,
+        log_dir: Path | None = None,
+        idle_timeout: float | None = None,
+        finished_ttl: float | None = None,
+    ):
+        self._llms = llms
+        self._log_dir = log_dir
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings.session_idle_timeout
+        self.finished_ttl = finished_ttl if finished_ttl is not None else settings.session_finished_ttl
+        self._sessions: dict[str, ManagedSession] = {}
+        self._cleanup_task: asyncio.Task | None = None
+
+    @property
+    def llms(self) -> dict[str, BaseChatModel]:
+        if self._llms is None:
+            self._llms = {agent: get_llm_for_agent(agent) for agent in AGENT_TYPES}
+        return self._llms
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create(self, name: str, position: str, grade: str, experience: str) -> tuple[str, str]:
+        """Создать сессию, вернуть (session_id, приветствие)."""
+        session_id = uuid.uuid4().hex
+        session = InterviewSession(llms=self.llms)
+        logger = InterviewLogger(log_dir=self._log_dir)
+
+        greeting = await session.ainitialize(name, position, grade, experience)
+        await asyncio.to_thread(logger.start_session, name, position, grade, experience)
+        self._sessions[session_id] = ManagedSession(session_id, session, logger)
+        return session_id, greeting
+
+    def get(self, session_id: str) -> ManagedSession:
+        """Найти сессию по ID, KeyError если её нет."""
+        return self._sessions[session_id]
+
+    async def step(self, session_id: str, message: str) -> tuple[str, bool, dict | None]:
+        """Обработать реплику кандидата."""
+        managed = self.get(session_id)
+        async with managed.lock:
+            self._ensure_active(managed)
+            managed.touch()
+            result = await managed.session.aprocess_user_input(message)
+            await self._log_progress(managed)
+            managed.touch()
+            return result
+
+    async def stream(self, session_id: str, message: str) -> AsyncIterator[str]:
+        """Обработать реплику кандидата, отдавая ответ по кускам."""
+        managed = self.get(session_id)
+        async with managed.lock:
+            self._ensure_active(managed)
+            managed.touch()
+            async for chunk in managed.session.stream_user_input(message):
+                yield chunk
+            await self._log_progress(managed)
+            managed.touch()
+
+    async def finish(self, session_id: str) -> tuple[str, bool, dict | None]:
+        """Досрочно завершить интервью."""
+        managed = self.get(session_id)
+        async with managed.lock:
+            managed.touch()
+            if managed.session.is_finished():
+                return ("Интервью уже завершено.", True, managed.session.get_final_feedback())
+            result = await managed.session.afinish()
+            await self._log_progress(managed)
+            return result
+
+    async def remove(self, session_id: str) -> None:
+        """Удалить сессию и закрыть её лог (запись лога — в потоке, не в event loop)."""
+        managed = self._sessions.pop(session_id, None)
+        if managed is None:
+            return
+        managed.session.cancel_background()
+        if managed.logger.get_current_log():
+            await asyncio.to_thread(
+                managed.logger.end_session, finish_reason=managed.session.get_finish_reason() or "abandoned"
+            )
+
+    @staticmethod
+    def _ensure_active(managed: ManagedSession) -> None:
+        if managed.session.is_finished():
+            raise RuntimeError("Интервью уже завершено")
+
+    @staticmethod
+    async def _log_progress(managed: ManagedSession) -> None:
+        if not managed.logger.get_current_log():
+            return
+        logged = len(managed.logger.get_current_log().get("turns", []))
+        for turn in managed.session.get_turns()[logged:]:
+            managed.logger.log_turn(turn)
+        managed.logger.log_token_usage(managed.session.get_token_usage())
+        if feedback := managed.session.get_final_feedback():
+            managed.logger.log_feedback(feedback)
+            # fsync журнала, запись JSON и каталога блокируют — уводим их из event loop.
+            await asyncio.to_thread(
+                managed.logger.end_session, finish_reason=managed.session.get_finish_reason() or None
+            )
+
+    async def cleanup(self) -> int:
+        """Удалить простаивающие и завершённые сессии, вернуть их число."""
+        now = time.monotonic()
+        expired = [
+            sid
+            for sid, managed in self._sessions.items()
+            if not managed.lock.locked()
+            and (
+                now - managed.last_active > self.idle_timeout
+                or (managed.session.is_finished() and now - managed.last_active > self.finished_ttl)
+            )
+        ]
+        for sid in expired:
+            await self.remove(sid)
+        return len(expired)
+
+    async def _cleanup_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.cleanup()
+
+    def start_cleanup(self, interval: float | None = None) -> None:
+        """Запустить периодическую очистку в текущем event loop."""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(
+                self._cleanup_loop(interval or settings.session_cleanup_interval)
+            )
+
+    async def close(self) -> None:
+        """Остановить очистку и закрыть все сессии."""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        for sid in list(self._sessions):
+            await self.remove(sid)
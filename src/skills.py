@@ -0,0 +1,276 @@
+"""Канонические имена навыков: свободные строки LLM → темы банка позиции.
+
+Observer пишет в detected_skills что угодно: «SQL», «sql», «SQL запросы»,
+«Базы данных». Индекс позиции сводит их к Topic.name из src.topics по
+точному совпадению с именем, ключом или алиасом темы (без учёта регистра),
+по вхождению алиаса целыми словами и по нечёткому совпадению слов с общей основой.
+Навыки вне банка остаются как есть, повторы без учёта регистра схлопываются.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Final
+
+from src.topics import POSITION_TOPICS, Topic, get_topics_for_position
+
+# Алиасы по ключам тем всех банков; имя и ключ темы добавляются сами.
+SKILL_ALIASES: Final[dict[str, tuple[str, ...]]] = {
+    "python_basics": (
+        "python", "питон", "пайтон", "gil", "генераторы", "декораторы", "asyncio",
+        "типы данных python", "list tuple dict", "ооп в python",
+    ),
+    "databases": (
+        "бд", "база данных", "субд", "sql", "sql запросы", "nosql", "postgresql", "postgres",
+        "mysql", "mongodb", "redis", "индексы", "транзакции", "уровни изоляции", "шардинг",
+        "репликация", "orm", "sqlalchemy", "join",
+    ),
+    "api_design": (
+        "api", "rest", "rest api", "restful", "graphql", "grpc", "http", "http методы",
+        "коды ответа http", "версионирование api", "пагинация", "rate limiting",
+    ),
+    "testing": (
+        "тесты", "unit тесты", "юнит тесты", "pytest", "unittest", "mock", "моки", "fixture",
+        "интеграционные тесты", "coverage", "tdd",
+    ),
+    "docker_k8s": (
+        "docker", "докер", "kubernetes", "k8s", "кубернетес", "контейнеры", "docker compose",
+        "helm", "контейнеризация",
+    ),
+    "ml_basics": (
+        "машинное обучение", "machine learning", "ml", "переобучение", "overfitting",
+        "bias variance", "кросс валидация", "метрики классификации", "регрессия", "классификация",
+    ),
+    "deep_learning": (
+        "dl", "нейросети", "нейронные сети", "neural networks", "cnn", "rnn", "lstm",
+        "трансформеры", "transformers", "backpropagation", "attention",
+    ),
+    "feature_engineering": (
+        "фичи", "признаки", "feature selection", "отбор признаков", "кодирование признаков",
+        "one hot encoding", "нормализация признаков",
+    ),
+    "frameworks": (
+        "pytorch", "tensorflow", "keras", "scikit learn", "sklearn", "ml фреймворки",
+    ),
+    "javascript": (
+        "js", "джаваскрипт", "typescript", "ts", "замыкания", "event loop", "промисы",
+        "promise", "async await", "es6",
+    ),
+    "react": ("реакт", "hooks", "хуки", "jsx", "redux", "virtual dom", "компоненты react"),
+    "css": ("стили", "flexbox", "grid", "вёрстка", "верстка", "sass", "scss", "адаптивная вёрстка"),
+    "linux": ("линукс", "bash", "shell", "unix", "права доступа", "процессы linux", "systemd"),
+    "ci_cd": (
+        "ci", "cd", "пайплайн", "pipeline", "github actions", "gitlab ci", "jenkins",
+        "непрерывная интеграция", "деплой", "deployment",
+    ),
+    "monitoring": (
+        "prometheus", "grafana", "логирование", "алерты", "observability", "метрики сервиса",
+        "elk", "трейсинг",
+    ),
+    "sql": (
+        "sql запросы", "запросы", "join", "оконные функции", "window functions", "group by",
+        "подзапросы", "cte",
+    ),
+    "statistics": (
+        "статистика", "stats", "a b тесты", "ab тесты", "p value", "гипотезы",
+        "проверка гипотез", "доверительный интервал", "распределения",
+    ),
+    "visualization": (
+        "дашборды", "dashboards", "графики", "tableau", "power bi", "matplotlib", "seaborn",
+        "визуализация данных",
+    ),
+    "testing_basics": (
+        "тестирование", "тест кейсы", "тест дизайн", "виды тестирования", "баг репорт",
+        "чек лист", "регрессионное тестирование",
+    ),
+    "automation": (
+        "автотесты", "selenium", "playwright", "pytest", "cypress", "page object",
+        "автоматизация",
+    ),
+    "api_testing": ("postman", "тестирование api", "rest api тестирование", "swagger", "api"),
+    "metrics": (
+        "метрики", "kpi", "north star", "retention", "конверсия", "unit экономика",
+        "юнит экономика", "dau", "mau", "ltv",
+    ),
+    "prioritization": ("rice", "ice", "moscow", "бэклог", "backlog", "roadmap", "роадмап"),
+    "discovery": (
+        "customer development", "custdev", "кастдев", "интервью с пользователями",
+        "исследование пользователей", "jtbd", "гипотезы продукта",
+    ),
+    "system_design": (
+        "system design", "архитектура", "проектирование", "микросервисы", "монолит",
+        "паттерны проектирования",
+    ),
+    "scalability": (
+        "scalability", "high load", "хайлоад", "нагрузка", "балансировка нагрузки",
+        "кеширование", "горизонтальное масштабирование", "шардинг",
+    ),
+    "integration": (
+        "интеграция", "брокеры сообщений", "kafka", "rabbitmq", "очереди", "message queue",
+        "esb", "api gateway",
+    ),
+}
+
+# Минимальный коэффициент Дайса по словам навыка и формы темы, ниже — навык вне банка.
+SIMILARITY_THRESHOLD: Final[float] = 0.75
+# Слова считаются одним словом с опечаткой, только если у них общее начало
+# не короче MIN_SHARED_PREFIX и похожи триграммы: общий суффикс
+# («кеширование» / «тестирование») совпадением не считается.
+MIN_SHARED_PREFIX: Final[int] = 5
+WORD_SIMILARITY: Final[float] = 0.6
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def fold(text: str) -> str:
+    """Ключ сравнения: casefold, ё → е, пунктуация и пробелы схлопнуты в один пробел."""
+    return _NON_WORD.sub(" ", text.casefold().replace("ё", "е")).strip()
+
+
+def _trigrams(folded: str) -> frozenset[str]:
+    padded = f" {folded} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _dice(a: frozenset[str], b: frozenset[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+_Word = tuple[str, frozenset[str]]
+
+
+def _words(folded: str) -> tuple[_Word, ...]:
+    return tuple((word, _trigrams(word)) for word in folded.split())
+
+
+def _same_word(a: _Word, b: _Word) -> bool:
+    """Одно слово с опечаткой или другим окончанием: общая основа и похожие триграммы."""
+    if a[0] == b[0]:
+        return True
+    prefix = 0
+    for x, y in zip(a[0], b[0]):
+        if x != y:
+            break
+        prefix += 1
+    return prefix >= MIN_SHARED_PREFIX and _dice(a[1], b[1]) >= WORD_SIMILARITY
+
+
+def _shared_words(skill: tuple[_Word, ...], form: tuple[_Word, ...]) -> int:
+    """Сколько слов навыка нашли пару среди слов формы (каждое слово формы — один раз)."""
+    free = list(form)
+    shared = 0
+    for word in skill:
+        for i, other in enumerate(free):
+            if _same_word(word, other):
+                del free[i]
+                shared += 1
+                break
+    return shared
+
+
+class SkillIndex:
+    """Индекс одного банка тем: формы навыка → ключ темы.
+
+    resolve ищет по точному совпадению формы, затем по алиасу, целиком
+    входящему в навык по словам (самый длинный), затем по коэффициенту
+    Дайса над словами не ниже SIMILARITY_THRESHOLD, где слова совпадают,
+    если равны или отличаются опечаткой при общей основе (_same_word).
+    """
+
+    __slots__ = ("topics", "_exact", "_phrases", "_words")
+
+    def __init__(self, topics: dict[str, Topic]):
+        self.topics = topics
+        self._exact: dict[str, str] = {}
+        for key, topic in topics.items():
+            for form in (topic.name, key, *SKILL_ALIASES.get(key, ())):
+                self._exact.setdefault(fold(form), key)
+        self._phrases = sorted(
+            ((tuple(form.split()), key) for form, key in self._exact.items()),
+            key=lambda item: (-len(item[0]), -sum(map(len, item[0]))),
+        )
+        self._words = [(_words(form), key) for form, key in self._exact.items()]
+
+    def mention(self, text: str) -> str | None:
+        """Ключ темы, форма которой совпадает с текстом или входит в него целыми словами."""
+        folded = fold(text)
+        if folded in self._exact:
+            return self._exact[folded]
+        words = folded.split()
+        for phrase, key in self._phrases:
+            n = len(phrase)
+            if any(tuple(words[i:i + n]) == phrase for i in range(len(words) - n + 1)):
+                return key
+        return None
+
+    def resolve(self, skill: str) -> str | None:
+        """Ключ темы банка для навыка или None."""
+        folded = fold(skill)
+        if not folded:
+            return None
+        key = self.mention(folded)
+        if key is not None:
+            return key
+
+        skill_words = _words(folded)
+        best, best_score = None, SIMILARITY_THRESHOLD
+        for form_words, key in self._words:
+            score = 2 * _shared_words(skill_words, form_words) / (len(skill_words) + len(form_words))
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+
+# Банки — модульные словари src.topics, индексы строятся один раз при импорте.
+_INDEXES: dict[int, SkillIndex] = {}
+for _bank in POSITION_TOPICS.values():
+    if id(_bank) not in _INDEXES:
+        _INDEXES[id(_bank)] = SkillIndex(_bank)
+
+
+def skill_index(position: str) -> SkillIndex:
+    """Индекс банка тем позиции (тот же fallback на backend, что у get_topics_for_position)."""
+    bank = get_topics_for_position(position)
+    index = _INDEXES.get(id(bank))
+    if index is None:
+        index = _INDEXES[id(bank)] = SkillIndex(bank)
+    return index
+
+
+def question_topic(position: str, question: str) -> str:
+    """Topic.name темы, которую называет вопрос интервьюера, иначе пустая строка.
+
+    Без нечёткого сравнения: вопрос — целая фраза, тема берётся только по явному упоминанию.
+    """
+    index = skill_index(position)
+    key = index.mention(question)
+    return index.topics[key].name if key is not None else ""
+
+
+@lru_cache(maxsize=4096)
+def canonical_skill(position: str, skill: str) -> str:
+    """Topic.name темы, к которой относится навык, иначе сам навык без лишних пробелов."""
+    index = skill_index(position)
+    key = index.resolve(skill)
+    return index.topics[key].name if key is not None else " ".join(skill.split())
+
+
+def canonical_skills(position: str, skills: Iterable[str], known: Iterable[str] = ()) -> list[str]:
+    """Канонические имена навыков без повторов.
+
+    Навык, совпадающий с одним из known без учёта регистра, берётся в
+    написании из known — так ключи skill_scores и covered_topics не дробятся.
+    """
+    spelled = {fold(name): name for name in known}
+    result: list[str] = []
+    for skill in skills:
+        name = canonical_skill(position, skill)
+        key = fold(name)
+        if not key:
+            continue
+        name = spelled.setdefault(key, name)
+        if name not in result:
+            result.append(name)
+    return result
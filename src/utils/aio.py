@@ -0,0 +1,39 @@
+"""Запуск корутин из синхронного кода."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="interview-coach-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Выполнить корутину в общем фоновом event loop и дождаться результата.
+
+    Loop один на процесс: асинхронные HTTP-клиенты LLM привязаны к loop,
+    в котором открыли соединения, поэтому синхронные обёртки не создают новый.
+    """
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync нельзя вызывать из фонового event loop, используйте await")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
@@ -0,0 +1,236 @@
+"""Каталог логов интервью на SQLite: метаданные сессий для быстрых выборок."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+CATALOG_NAME = "catalog.sqlite"
+# При изменении схемы каталог пересоздаётся и пересобирается по файлам.
+SCHEMA_VERSION = 2
+
+SortKey = Literal["date", "duration", "turns", "hallucinations", "evasions", "position", "grade"]
+
+_SORT_COLUMNS = {
+    "date": "started_at",
+    "duration": "duration_s",
+    "turns": "turns",
+    "hallucinations": "hallucination_count",
+    "evasions": "evasion_count",
+    "position": "position",
+    "grade": "grade",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    file TEXT PRIMARY KEY,
+    participant_name TEXT NOT NULL,
+    position TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    assessed_grade TEXT,
+    recommendation TEXT,
+    finish_reason TEXT,
+    turns INTEGER NOT NULL,
+    hallucination_count INTEGER NOT NULL,
+    evasion_count INTEGER NOT NULL,
+    clarity REAL,
+    honesty REAL,
+    engagement REAL,
+    problem_solving REAL,
+    started_at TEXT,
+    finished_at TEXT,
+    duration_s REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started_at ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_grade ON sessions(grade COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_sessions_recommendation ON sessions(recommendation COLLATE NOCASE);
+"""
+
+
+class CatalogEntry(BaseModel):
+    """Метаданные одной сессии в каталоге."""
+
+    file: str
+    participant_name: str
+    position: str
+    grade: str
+    assessed_grade: str | None = None
+    recommendation: str | None = None
+    finish_reason: str | None = None
+    turns: int = 0
+    hallucination_count: int = 0
+    evasion_count: int = 0
+    clarity: float | None = None
+    honesty: float | None = None
+    engagement: float | None = None
+    problem_solving: float | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
+    duration_s: float | None = None
+
+
+_INSERT = (
+    f"INSERT OR REPLACE INTO sessions ({', '.join(CatalogEntry.model_fields)}) "
+    f"VALUES ({', '.join('?' * len(CatalogEntry.model_fields))})"
+)
+
+
+def entry_from_log(log_file: Path, log: dict[str, Any]) -> CatalogEntry:
+    """Метаданные из документа лога (фидбэк — в формате лога или FinalFeedback.model_dump())."""
+    feedback = log.get("final_feedback") if isinstance(log.get("final_feedback"), dict) else {}
+    decision = feedback.get("decision", {})
+    behavior = feedback.get("behavior", {})
+    soft = feedback.get("soft_skills", {})
+    started, finished = log.get("started_at"), log.get("finished_at")
+    duration = None
+    if started and finished:
+        try:
+            duration = (datetime.fromisoformat(finished) - datetime.fromisoformat(started)).total_seconds()
+        except ValueError:
+            pass
+    return CatalogEntry(
+        file=log_file.name,
+        participant_name=log.get("participant_name", ""),
+        position=log.get("position", ""),
+        grade=log.get("grade", ""),
+        assessed_grade=decision.get("assessed_grade") or decision.get("grade"),
+        recommendation=decision.get("hiring_recommendation"),
+        finish_reason=log.get("finish_reason"),
+        turns=len(log.get("turns", [])),
+        hallucination_count=int(behavior.get("hallucination_count", 0)),
+        evasion_count=int(behavior.get("evasion_count", 0)),
+        clarity=soft.get("clarity"),
+        honesty=soft.get("honesty"),
+        engagement=soft.get("engagement"),
+        problem_solving=soft.get("problem_solving"),
+        started_at=started,
+        finished_at=finished,
+        duration_s=duration,
+    )
+
+
+def iter_log_entries(log_dir: Path) -> Iterator[CatalogEntry]:
+    """Метаданные полных логов interview_*.json (файлы для сдачи и битые файлы пропускаются)."""
+    for log_file in log_dir.glob("interview_*.json"):
+        try:
+            log = json.loads(log_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if isinstance(log, dict) and "started_at" in log:
+            yield entry_from_log(log_file, log)
+
+
+class LogCatalog:
+    """Таблица sessions в log_dir/catalog.sqlite.
+
+    InterviewLogger.end_session добавляет в неё каждую завершённую сессию;
+    rebuild пересобирает каталог по файлам каталога логов. Фильтры по позиции
+    (подстрока), грейду, рекомендации и причине завершения без учёта регистра.
+    """
+
+    __slots__ = ("log_dir", "_conn", "_lock", "created")
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = log_dir
+        log_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(log_dir / CATALOG_NAME), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self.created = self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION
+        if self.created:
+            self._conn.execute("DROP TABLE IF EXISTS sessions")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._lock = threading.Lock()
+
+    def add(self, entry: CatalogEntry) -> None:
+        """Добавить или обновить запись о сессии."""
+        with self._lock:
+            self._conn.execute(_INSERT, tuple(entry.model_dump().values()))
+
+    def rebuild(self) -> int:
+        """Пересобрать каталог по файлам логов, вернуть число записей."""
+        entries = list(iter_log_entries(self.log_dir))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM sessions")
+            self._conn.executemany(_INSERT, [tuple(entry.model_dump().values()) for entry in entries])
+            self._conn.execute("COMMIT")
+        return len(entries)
+
+    def query(
+        self,
+        position: str | None = None,
+        grade: str | None = None,
+        recommendation: str | None = None,
+        finish_reason: str | None = None,
+        sort: SortKey = "date",
+        descending: bool = True,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[list[CatalogEntry], int]:
+        """Страница записей по фильтрам и общее число подходящих."""
+        where, params = self._where(position, grade, recommendation, finish_reason)
+        order = f"{_SORT_COLUMNS[sort]} {'DESC' if descending else 'ASC'}, file {'DESC' if descending else 'ASC'}"
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM sessions{where}", params).fetchone()[0]
+            cursor = self._conn.execute(
+                f"SELECT * FROM sessions{where} ORDER BY {order} LIMIT ? OFFSET ?", (*params, limit, offset)
+            )
+            columns = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        return [CatalogEntry(**dict(zip(columns, row))) for row in rows], total
+
+    def rows(self, columns: tuple[str, ...], batch: int = 10_000) -> Iterator[list[tuple]]:
+        """Значения колонок по всем сессиям пачками по batch строк."""
+        unknown = set(columns) - set(CatalogEntry.model_fields)
+        if unknown:
+            raise ValueError(f"Неизвестные колонки каталога: {', '.join(sorted(unknown))}")
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(columns)} FROM sessions")
+        while True:
+            with self._lock:
+                chunk = cursor.fetchmany(batch)
+            if not chunk:
+                return
+            yield chunk
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    @staticmethod
+    def _where(
+        position: str | None, grade: str | None, recommendation: str | None, finish_reason: str | None
+    ) -> tuple[str, tuple]:
+        clauses, params = [], []
+        if position:
+            clauses.append("position LIKE ?")
+            params.append(f"%{position}%")
+        for column, value in (("grade", grade), ("recommendation", recommendation), ("finish_reason", finish_reason)):
+            if value:
+                clauses.append(f"{column} = ? COLLATE NOCASE")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+
+_catalogs: dict[Path, LogCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(log_dir: Path) -> LogCatalog:
+    """Каталог логов log_dir, общий для процесса; новый каталог сразу пересобирается по файлам."""
+    key = log_dir.resolve()
+    with _catalogs_lock:
+        if key not in _catalogs:
+            catalog = LogCatalog(log_dir)
+            if catalog.created:
+                catalog.rebuild()
+            _catalogs[key] = catalog
+        return _catalogs[key]
@@ -1,11 +1,16 @@
-"""JSON-логгер для сессий интервью в формате спецификации."""
+"""JSON-логгер для сессий интервью в формате спецификации с журналом событий."""
 
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 from src.config import settings
 from src.models.feedback import (
@@ -13,37 +18,263 @@ from src.models.feedback import (
     feedback_to_log_dict,
     feedback_to_submission_string,
 )
-from src.models.state import Turn
+from src.models.state import TokenUsage, Turn
+from src.prompts import PROMPT_VERSION
+from src.utils.catalog import entry_from_log, get_catalog
+
+
+class _Waiter:
+    """Ожидание записи журнала: событие и ошибка фонового потока, если она была."""
+
+    __slots__ = ("event", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.error: BaseException | None = None
+
+
+class _JournalWriter:
+    """Фоновый поток, дописывающий строки журналов всех сессий процесса.
+
+    Каждая пачка строк сразу сбрасывается в ОС (переживает падение процесса),
+    fsync — не чаще раза в LOG_FSYNC_INTERVAL_S и при закрытии журнала.
+    Ошибки записи не роняют поток: они копятся по файлам и пробрасываются
+    из ближайшего close или flush. Ожидание ограничено LOG_FLUSH_TIMEOUT_S.
+    """
+
+    __slots__ = ("_queue", "_thread", "_lock", "_files", "_dirty", "_errors", "_last_sync")
+
+    def __init__(self):
+        self._queue: queue.Queue[tuple[Path | None, str | None, _Waiter | None]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._files: dict[Path, IO[str]] = {}
+        self._dirty: set[Path] = set()
+        self._errors: dict[Path, BaseException] = {}
+        self._last_sync = 0.0
+
+    def append(self, path: Path, line: str) -> None:
+        self._start()
+        self._queue.put((path, line, None))
+
+    def close(self, path: Path) -> None:
+        """Дописать всё, что стоит в очереди, сделать fsync и закрыть файл path."""
+        self._wait(path)
+
+    def flush(self) -> None:
+        """Дописать и сбросить на диск всё, что стоит в очереди (при выходе из процесса)."""
+        if self._thread is not None:
+            self._wait(None)
+
+    def _wait(self, path: Path | None) -> None:
+        self._start()
+        waiter = _Waiter()
+        self._queue.put((path, None, waiter))
+        if not waiter.event.wait(settings.log_flush_timeout_s):
+            raise TimeoutError(f"Журнал лога не записан за {settings.log_flush_timeout_s} с")
+        if waiter.error is not None:
+            raise waiter.error
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="interview-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=settings.log_fsync_interval_s if self._dirty else None)]
+            except queue.Empty:
+                self._sync()
+                continue
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = [(path, waiter) for path, line, waiter in batch if waiter is not None]
+            try:
+                self._process(batch, waiters)
+            except Exception as e:
+                for _, waiter in waiters:
+                    waiter.error = waiter.error or e
+            finally:
+                for _, waiter in waiters:
+                    waiter.event.set()
+
+    def _process(self, batch: list, waiters: list[tuple[Path | None, _Waiter]]) -> None:
+        for path, line, waiter in batch:
+            if waiter is None:
+                self._write(path, line)
+        for path, file in list(self._files.items()):
+            self._guard(path, file.flush)
+        if waiters or time.monotonic() - self._last_sync >= settings.log_fsync_interval_s:
+            self._sync()
+        for path, waiter in waiters:
+            if path is not None and (file := self._files.pop(path, None)) is not None:
+                self._guard(path, file.close)
+            waiter.error = self._errors.pop(path, None) if path is not None else self._take_any_error()
+
+    def _write(self, path: Path, line: str) -> None:
+        if path in self._errors:
+            return
+        if path not in self._files:
+            try:
+                self._files[path] = path.open("a", encoding="utf-8")
+            except Exception as e:
+                self._errors[path] = e
+                return
+        if self._guard(path, self._files[path].write, line):
+            self._dirty.add(path)
+
+    def _guard(self, path: Path, call, *args) -> bool:
+        """Выполнить операцию с файлом path; ошибку запомнить для close/flush."""
+        try:
+            call(*args)
+        except Exception as e:
+            self._errors.setdefault(path, e)
+            return False
+        return True
+
+    def _take_any_error(self) -> BaseException | None:
+        if not self._errors:
+            return None
+        return self._errors.pop(next(iter(self._errors)))
+
+    def _sync(self) -> None:
+        for path in self._dirty:
+            if (file := self._files.get(path)) is not None:
+                self._guard(path, os.fsync, file.fileno())
+        self._dirty.clear()
+        self._last_sync = time.monotonic()
+
+
+_writer = _JournalWriter()
+atexit.register(_writer.flush)
+
+
+def _reserve(log_dir: Path, stem: str) -> Path:
+    """Создать пустой файл лога с уникальным именем: stem.json, stem_2.json, …
+
+    Одновременные сессии с одним именем кандидата стартуют в одну секунду
+    (пакетный прогон сценариев) и иначе писали бы в один файл.
+    """
+    for n in range(1, 10_000):
+        path = log_dir / (f"{stem}.json" if n == 1 else f"{stem}_{n}.json")
+        try:
+            path.open("x").close()
+        except FileExistsError:
+            continue
+        return path
+    raise RuntimeError(f"Не удалось подобрать имя файла лога для {stem}")
+
+
+def journal_path(log_file: Path) -> Path:
+    """Журнал событий рядом с логом: interview_….journal.jsonl."""
+    return log_file.with_suffix(".journal.jsonl")
+
+
+def _apply_event(log: dict[str, Any], event: dict[str, Any]) -> None:
+    """Применить событие журнала к документу лога."""
+    kind = event["event"]
+    if kind == "start":
+        log.update(event["log"])
+    elif kind == "turn":
+        log["turns"].append(event["turn"])
+    elif kind == "token_usage":
+        log["token_usage"] = event["token_usage"]
+    elif kind == "feedback":
+        log["final_feedback"] = event["final_feedback"]
+        log["finished_at"] = event["finished_at"]
+    elif kind == "end":
+        log["finished_at"] = event["finished_at"]
+        if event.get("finish_reason"):
+            log["finish_reason"] = event["finish_reason"]
+
+
+def replay_journal(journal: Path) -> dict[str, Any]:
+    """Собрать документ лога из журнала; оборванная последняя строка пропускается."""
+    log: dict[str, Any] = {}
+    with journal.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            _apply_event(log, event)
+    return log
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    """Атомарно записать JSON через временный файл."""
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def compact_journal(journal: Path) -> Path:
+    """Переписать лог по журналу прерванной сессии и удалить журнал, вернуть путь к логу."""
+    log_file = journal.with_name(journal.name.removesuffix(".journal.jsonl") + ".json")
+    log = replay_journal(journal)
+    _write_json(log_file, log)
+    journal.unlink()
+    _catalog(log_file, log)
+    return log_file
+
+
+def _catalog(log_file: Path, log: dict[str, Any]) -> None:
+    if settings.log_catalog_enabled:
+        get_catalog(log_file.parent).add(entry_from_log(log_file, log))
 
 
 class InterviewLogger:
-    """Логирует сессии интервью в JSON-формате по спецификации."""
+    """Логирует сессии интервью в JSON-формате по спецификации.
+
+    Документ лога живёт в памяти. start_session пишет начальный JSON, дальше
+    каждое событие (ход, расход токенов, фидбэк, конец) одной строкой
+    дописывается в журнал рядом с логом фоновым потоком. end_session
+    переписывает лог целиком, удаляет журнал и добавляет сессию в каталог
+    логов (src.utils.catalog); готовый документ остаётся в finished_log. Лог упавшего процесса собирается из журнала:
+    load_interview_log читает его сам, compact_journal переписывает лог.
+    """
 
-    __slots__ = ("log_dir", "_log", "_file")
+    __slots__ = ("log_dir", "_log", "_file", "_journal", "finished_log")
 
     def __init__(self, log_dir: Path | None = None):
         self.log_dir = log_dir or settings.log_dir
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self._log: dict[str, Any] = {}
         self._file: Path | None = None
+        self._journal: Path | None = None
+        self.finished_log: dict[str, Any] | None = None
 
     def start_session(self, participant_name: str, position: str, grade: str, experience: str) -> Path:
         """Инициализировать новую сессию, вернуть путь к файлу лога."""
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_name = "".join(c if c.isalnum() else "_" for c in participant_name)
-        self._file = self.log_dir / f"interview_{safe_name}_{ts}.json"
-
-        self._log = {
-            "format_version": "1.0",
-            "participant_name": participant_name,
-            "position": position,
-            "grade": grade,
-            "experience": experience,
-            "started_at": datetime.now().isoformat(),
-            "turns": [],
-            "final_feedback": None,
-        }
-        self._save()
+        self._file = _reserve(self.log_dir, f"interview_{safe_name}_{ts}")
+        self._journal = journal_path(self._file)
+        self.finished_log = None
+
+        self._log = {}
+        self._record({
+            "event": "start",
+            "log": {
+                "format_version": "1.0",
+                "participant_name": participant_name,
+                "position": position,
+                "grade": grade,
+                "experience": experience,
+                "llm": {"provider": settings.llm_provider, "model": settings.llm_model},
+                "prompt_version": PROMPT_VERSION,
+                "started_at": datetime.now().isoformat(),
+                "turns": [],
+                "final_feedback": None,
+            },
+        })
+        _write_json(self._file, self._log)
         return self._file
 
     def log_turn(self, turn: Turn) -> None:
@@ -51,51 +282,78 @@ class InterviewLogger:
         if not self._log:
             raise RuntimeError("Нет активной сессии")
 
-        self._log["turns"].append({
-            "turn_id": turn.turn_id,
-            "agent_visible_message": turn.agent_visible_message,
-            "user_message": turn.user_message,
-            "internal_thoughts": turn.internal_thoughts,
+        self._record({
+            "event": "turn",
+            "turn": {
+                "turn_id": turn.turn_id,
+                "agent_visible_message": turn.agent_visible_message,
+                "user_message": turn.user_message,
+                "internal_thoughts": turn.internal_thoughts,
+                "token_usage": {agent: usage.model_dump() for agent, usage in turn.token_usage.items()},
+                "llm_attempts": [attempt.model_dump() for attempt in turn.llm_attempts],
+                "analysis": turn.analysis.model_dump(exclude={"thoughts"}) if turn.analysis else None,
+                "difficulty": turn.difficulty,
+            },
+        })
+
+    def log_token_usage(self, usage: dict[str, TokenUsage]) -> None:
+        """Записать расход токенов сессии по агентам и итог."""
+        if not self._log:
+            raise RuntimeError("Нет активной сессии")
+
+        total = sum(usage.values(), TokenUsage())
+        self._record({
+            "event": "token_usage",
+            "token_usage": {
+                "by_agent": {agent: u.model_dump() for agent, u in usage.items()},
+                "total": total.model_dump(),
+            },
         })
-        self._save()
 
     def log_feedback(self, feedback: FinalFeedback | dict) -> None:
         """Записать финальный фидбэк."""
         if not self._log:
             raise RuntimeError("Нет активной сессии")
 
-        self._log["final_feedback"] = (
-            feedback_to_log_dict(feedback) if isinstance(feedback, FinalFeedback) else feedback
-        )
-        self._log["finished_at"] = datetime.now().isoformat()
-        self._save()
+        self._record({
+            "event": "feedback",
+            "final_feedback": feedback_to_log_dict(feedback) if isinstance(feedback, FinalFeedback) else feedback,
+            "finished_at": datetime.now().isoformat(),
+        })
 
-    def end_session(self, feedback: FinalFeedback | dict | None = None) -> Path:
-        """Завершить сессию и вернуть путь к логу."""
+    def end_session(self, feedback: FinalFeedback | dict | None = None, finish_reason: str | None = None) -> Path:
+        """Завершить сессию: переписать лог из памяти, удалить журнал, вернуть путь к логу."""
         if not self._log:
             raise RuntimeError("Нет активной сессии")
 
         if feedback:
             self.log_feedback(feedback)
 
-        self._log["finished_at"] = datetime.now().isoformat()
-        self._save()
+        self._record({"event": "end", "finished_at": datetime.now().isoformat(), "finish_reason": finish_reason})
+        _writer.close(self._journal)
+        _write_json(self._file, self._log)
+        self._journal.unlink(missing_ok=True)
+        _catalog(self._file, self._log)
 
         result = self._file
+        self.finished_log = self._log
         self._log = {}
         self._file = None
+        self._journal = None
         return result
 
     def get_current_log(self) -> dict[str, Any]:
         return self._log.copy()
 
-    def _save(self) -> None:
-        if self._file and self._log:
-            self._file.write_text(json.dumps(self._log, ensure_ascii=False, indent=2), encoding="utf-8")
+    def _record(self, event: dict[str, Any]) -> None:
+        _apply_event(self._log, event)
+        _writer.append(self._journal, json.dumps(event, ensure_ascii=False) + "\n")
 
 
 def load_interview_log(path: Path) -> dict[str, Any]:
-    """Загрузить лог из JSON-файла."""
+    """Загрузить лог из JSON-файла; лог незавершённой сессии собирается из журнала."""
+    if (journal := journal_path(path)).exists():
+        return replay_journal(journal)
     return json.loads(path.read_text(encoding="utf-8"))
 
 
@@ -0,0 +1,102 @@
+"""Разбор JSON-объекта по мере поступления текста."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+
+class PartialJSONParser:
+    """Инкрементальный парсер JSON-объекта верхнего уровня.
+
+    Текст подаётся кусками через feed; как только значение поля верхнего уровня
+    дописано до конца, вызывается on_field(ключ, значение). Текст до первой «{»
+    (например, ```json) пропускается. Значения, которые не разбираются как JSON,
+    молча пропускаются — полный ответ всё равно разбирается обычным путём.
+    """
+
+    __slots__ = ("_on_field", "fields", "done", "_depth", "_in_string", "_escape", "_mode", "_key", "_token")
+
+    def __init__(self, on_field: Callable[[str, Any], None] | None = None):
+        self._on_field = on_field
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._mode = "key"
+        self._key: str | None = None
+        self._token: list[str] | None = None
+
+    def feed(self, chunk: str) -> None:
+        """Дописать очередной кусок текста."""
+        for c in chunk:
+            if self.done:
+                return
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._append(c)
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_token()
+            elif c == '"':
+                if self._depth == 1:
+                    self._token = []
+                self._append(c)
+                self._in_string = True
+            elif c in "{[":
+                if self._depth == 1:
+                    self._token = []
+                self._append(c)
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth >= 1:
+                    self._append(c)
+                if self._depth <= 1:
+                    self._close_token()
+                self.done = self._depth == 0
+            elif self._depth > 1:
+                self._append(c)
+            elif c == ",":
+                self._close_token()
+                self._mode = "key"
+            elif c == ":":
+                self._mode = "value"
+            elif not c.isspace():
+                if self._token is None:
+                    self._token = []
+                self._token.append(c)
+
+    def _append(self, c: str) -> None:
+        if self._token is not None:
+            self._token.append(c)
+
+    def _close_token(self) -> None:
+        if self._token is None:
+            return
+        text = "".join(self._token)
+        self._token = None
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        if self._mode == "key":
+            self._key = value if isinstance(value, str) else None
+            return
+        if self._key is None:
+            return
+        key, self._key = self._key, None
+        self.fields[key] = value
+        if self._on_field is not None:
+            self._on_field(key, value)
@@ -19,6 +19,7 @@ from src.models.feedback import (
     RoadmapItem,
     feedback_to_log_dict,
 )
+from src.models.transcript import Transcript, dialog_window, full_transcript
 from src.utils.logger import InterviewLogger
 
 
@@ -164,6 +165,24 @@ class TestModels:
         assert log_dict["decision"]["hiring_recommendation"] == "Hire"
         assert "Python" in log_dict["hard_skills"]["confirmed"]
 
+    def test_transcript_matches_rendering(self):
+        """Буфер истории совпадает с рендером turns и не пересчитывается зря."""
+        turns = [Turn(turn_id=i, agent_visible_message=f"Вопрос {i}", user_message=f"Ответ {i}") for i in range(1, 8)]
+        transcript = Transcript()
+        for turn in turns:
+            transcript.append(turn)
+
+        buffered = {"turns": turns, "transcript": transcript}
+        plain = {"turns": turns}
+
+        assert dialog_window(buffered, 5) == dialog_window(plain, 5)
+        assert dialog_window(buffered, 5).startswith("Интервьюер: Вопрос 3")
+        assert full_transcript(buffered) == full_transcript(plain)
+        assert transcript.window(5) is transcript.window(5)
+
+        stale = {"turns": turns + [Turn(turn_id=8, agent_visible_message="В", user_message="О")], "transcript": transcript}
+        assert dialog_window(stale, 5).endswith("Кандидат: О")
+
 
 class TestLogger:
     """Тесты InterviewLogger."""
@@ -230,6 +249,105 @@ class TestLogger:
 
         assert saved_log["final_feedback"]["decision"]["grade"] == "Junior"
 
+    def test_logger_journal_recovery(self, tmp_path):
+        """Журнал незавершённой сессии восстанавливает лог."""
+        from src.utils.logger import _writer, compact_journal, journal_path, load_interview_log
+
+        logger = InterviewLogger(log_dir=tmp_path)
+        log_file = logger.start_session("Тест", "Developer", "Junior", "Python")
+        for turn_id in (1, 2):
+            logger.log_turn(Turn(turn_id=turn_id, agent_visible_message="Вопрос", user_message="Ответ"))
+        logger.log_token_usage({})
+
+        journal = journal_path(log_file)
+        _writer.flush()
+        with journal.open("a", encoding="utf-8") as f:
+            f.write('{"event": "turn", "tu')
+
+        assert json.loads(log_file.read_text(encoding="utf-8"))["turns"] == []
+        assert len(load_interview_log(log_file)["turns"]) == 2
+        assert compact_journal(journal) == log_file
+        assert not journal.exists()
+        recovered = json.loads(log_file.read_text(encoding="utf-8"))
+        assert [t["turn_id"] for t in recovered["turns"]] == [1, 2]
+        assert recovered["token_usage"]["total"]["calls"] == 0
+
+    def test_logger_hands_over_final_log(self, tmp_path):
+        """end_session компактирует журнал и отдаёт документ в памяти."""
+        from src.utils.logger import journal_path
+
+        logger = InterviewLogger(log_dir=tmp_path)
+        log_file = logger.start_session("Тест", "Developer", "Junior", "Python")
+        logger.log_turn(Turn(turn_id=1, agent_visible_message="Вопрос", user_message="Ответ"))
+        logger.log_feedback({"decision": {"hiring_recommendation": "Hire"}})
+
+        assert logger.end_session() == log_file
+        assert not journal_path(log_file).exists()
+        assert json.loads(log_file.read_text(encoding="utf-8")) == logger.finished_log
+        assert logger.finished_log["final_feedback"]["decision"]["hiring_recommendation"] == "Hire"
+
+    def test_logger_write_error_reaches_caller(self, tmp_path, monkeypatch):
+        """Ошибка fsync выбрасывается из end_session, а поток записи остаётся жив."""
+        import os
+
+        def disk_full(fd):
+            raise OSError(28, "No space left on device")
+
+        logger = InterviewLogger(log_dir=tmp_path)
+        logger.start_session("Тест", "Developer", "Junior", "Python")
+        monkeypatch.setattr(os, "fsync", disk_full)
+        with pytest.raises(OSError, match="No space"):
+            logger.end_session()
+        monkeypatch.undo()
+
+        logger = InterviewLogger(log_dir=tmp_path)
+        logger.start_session("Тест2", "Developer", "Junior", "Python")
+        assert logger.end_session().exists()
+
+    def test_journal_wait_is_bounded(self, tmp_path, monkeypatch):
+        """Без живого потока записи close не висит, а падает по таймауту."""
+        import threading
+
+        from src.config import settings
+        from src.utils.logger import _JournalWriter
+
+        monkeypatch.setattr(settings, "log_flush_timeout_s", 0.05)
+        writer = _JournalWriter()
+        writer._thread = threading.Thread(target=lambda: None)
+        with pytest.raises(TimeoutError):
+            writer.close(tmp_path / "x.journal.jsonl")
+
+    def test_logger_updates_catalog(self, tmp_path):
+        """end_session добавляет сессию в каталог; rebuild собирает его по файлам."""
+        from src.utils.catalog import get_catalog
+
+        for name, position, recommendation in (
+            ("Анна", "Backend Developer", "Hire"),
+            ("Борис", "Frontend Developer", "No Hire"),
+            ("Вера", "Backend Developer", "No Hire"),
+        ):
+            logger = InterviewLogger(log_dir=tmp_path)
+            logger.start_session(name, position, "Junior", "Python")
+            logger.log_turn(Turn(turn_id=1, agent_visible_message="Вопрос", user_message="Ответ"))
+            logger.end_session(
+                {"decision": {"grade": "Junior", "hiring_recommendation": recommendation},
+                 "behavior": {"hallucination_count": 2}},
+                finish_reason="user_stop",
+            )
+
+        catalog = get_catalog(tmp_path)
+        entries, total = catalog.query(position="backend", recommendation="no hire")
+        assert total == 1
+        assert entries[0].participant_name == "Вера"
+        assert (entries[0].assessed_grade, entries[0].hallucination_count, entries[0].turns) == ("Junior", 2, 1)
+        assert entries[0].finish_reason == "user_stop"
+
+        page, total = catalog.query(sort="position", descending=False, limit=2, offset=2)
+        assert total == 3 and [e.position for e in page] == ["Frontend Developer"]
+
+        assert catalog.rebuild() == 3
+        assert len(catalog) == 3
+
 
 class TestScenario:
     """Тесты сценариев из спецификации задания."""
@@ -272,5 +390,205 @@ class TestScenario:
         assert any(marker in user_question for marker in question_markers)
 
 
+class TestPromptPrefix:
+    """Стабильный префикс промптов для кеша провайдера."""
+
+    def test_prefix_does_not_change_between_turns(self):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+        from src.agents.interviewer import InterviewerAgent
+        from src.agents.observer import ObserverAgent
+
+        state = create_initial_state(InterviewInput(
+            participant_name="Алекс", position="Backend Developer", grade="Junior", experience="Django",
+        ))
+        later = dict(state, current_difficulty=3, covered_topics=["Тема хода"], current_user_message="Ответ")
+
+        for agent in (ObserverAgent(FakeListChatModel(responses=["{}"])),
+                      InterviewerAgent(FakeListChatModel(responses=["?"]))):
+            assert agent._build_prefix(state) == agent._build_prefix(later)
+            assert "Backend Developer" in agent._build_prefix(state)
+            assert "Тема хода" not in agent._build_prefix(later)
+
+    def test_cached_tokens_are_counted(self):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from langchain_core.messages import AIMessage
+
+        from src.agents.observer import ObserverAgent
+
+        agent = ObserverAgent(FakeListChatModel(responses=["{}"]))
+        agent._record_usage(AIMessage(content="{}", usage_metadata={
+            "input_tokens": 1200, "output_tokens": 50, "total_tokens": 1250,
+            "input_token_details": {"cache_read": 1024},
+        }))
+
+        assert agent.usage.cached_tokens == 1024
+        assert agent.usage.input_tokens == 1200
+
+
+class TestStructuredOutput:
+    """Ответы по схеме через tool calling и откат на текст."""
+
+    def _state(self):
+        state = create_initial_state(InterviewInput(
+            participant_name="Алекс", position="Backend Developer", grade="Junior", experience="Django",
+        ))
+        return dict(state, current_agent_message="Что такое индекс?", current_user_message="Структура для поиска")
+
+    def test_schema_answer_skips_text_parsing(self, monkeypatch):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from langchain_core.messages import AIMessage
+        from langchain_core.runnables import RunnableLambda
+
+        from src.agents.observer import ObserverAgent
+        from src.config import settings
+
+        class ToolCallingModel(FakeListChatModel):
+            def with_structured_output(self, schema, **kwargs):
+                return RunnableLambda(lambda _: {
+                    "raw": AIMessage(content="", usage_metadata={
+                        "input_tokens": 10, "output_tokens": 5, "total_tokens": 15,
+                    }),
+                    "parsed": schema(answer_quality=9, detected_skills=["SQL"]),
+                    "parsing_error": None,
+                })
+
+        monkeypatch.setattr(settings, "llm_structured_output", True)
+        agent = ObserverAgent(ToolCallingModel(responses=["не JSON"]))
+        result = agent.process_sync(self._state())
+
+        assert result["current_observer_analysis"].answer_quality == 9
+        assert "Базы данных" in result["skill_scores"]
+        assert agent.structured_stats() == {"structured": 1, "fallbacks": 0, "parse_failures": 0}
+        assert agent.usage.calls == 1
+
+    def test_schema_feedback_keeps_state_counters(self, monkeypatch):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from langchain_core.messages import AIMessage
+        from langchain_core.runnables import RunnableLambda
+
+        from src.agents.evaluator import EvaluatorAgent
+        from src.config import settings
+
+        class ToolCallingModel(FakeListChatModel):
+            def with_structured_output(self, schema, **kwargs):
+                return RunnableLambda(lambda _: {
+                    "raw": AIMessage(content=""),
+                    "parsed": schema.model_validate({
+                        "decision": {
+                            "assessed_grade": "Junior", "hiring_recommendation": "Hire",
+                            "confidence_score": 70, "summary": "Ок",
+                        },
+                        "hard_skills": {"technical_depth": 6},
+                        "soft_skills": {"clarity": 7, "honesty": 8, "engagement": 7, "problem_solving": 6},
+                    }),
+                    "parsing_error": None,
+                })
+
+        monkeypatch.setattr(settings, "llm_structured_output", True)
+        state = dict(self._state(), evasion_count=2, hallucination_count=1, hints_used=3)
+        feedback = EvaluatorAgent(ToolCallingModel(responses=["не JSON"])).process_sync(state)["final_feedback"]
+
+        assert feedback["behavior"]["evasion_count"] == 2
+        assert feedback["behavior"]["hallucination_count"] == 1
+        assert feedback["behavior"]["hints_used"] == 3
+        assert feedback["decision"]["target_grade"] == "Junior"
+
+    async def test_falls_back_to_text_without_tool_calling(self, monkeypatch):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+        from src.agents.observer import ObserverAgent
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "llm_structured_output", True)
+        agent = ObserverAgent(FakeListChatModel(responses=['{"answer_quality": 7}', "не JSON"]))
+
+        first = await agent.process(self._state())
+        await agent.process(self._state())
+
+        assert first["current_observer_analysis"].answer_quality == 7
+        assert agent.structured_stats() == {"structured": 0, "fallbacks": 2, "parse_failures": 1}
+
+
+class TestObserverEarlyStop:
+    """Потоковый разбор ответа Observer и ранний выход."""
+
+    def test_partial_parser_reports_fields_as_they_complete(self):
+        from src.utils.partial_json import PartialJSONParser
+
+        seen = []
+        parser = PartialJSONParser(lambda key, value: seen.append((key, value)))
+        text = '```json\n{"topic": "a \\"b\\"", "stop": true, "skills": ["x", {"y": 1}], "q": 7}\n```'
+        for i in range(0, len(text), 3):
+            parser.feed(text[i:i + 3])
+        assert seen == [("topic", 'a "b"'), ("stop", True), ("skills", ["x", {"y": 1}]), ("q", 7)]
+        assert parser.done
+
+    async def test_stop_skips_rest_of_response(self, monkeypatch):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+        from src.agents.observer import ObserverAgent
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "observer_early_stop", True)
+        response = json.dumps({"wants_to_end_interview": True, "answer_quality": 6, "thoughts": "x" * 500})
+        agent = ObserverAgent(FakeListChatModel(responses=[response]))
+        state = create_initial_state(InterviewInput(
+            participant_name="Алекс", position="Backend Developer", grade="Junior", experience="Django",
+        ))
+
+        result = await agent.process(dict(state, current_user_message="Думаю, на сегодня всё, спасибо"))
+
+        analysis = result["current_observer_analysis"]
+        assert analysis.wants_to_end_interview
+        assert "x" * 10 not in analysis.thoughts
+        assert agent.early_stops == 1
+
+
+class TestSkillIndex:
+    """Сведение навыков из detected_skills к темам банка позиции."""
+
+    def test_variants_resolve_to_topic(self):
+        from src.skills import canonical_skill, canonical_skills
+
+        variants = ["SQL", "sql", "SQL запросы", "Базы данных", "Postgre"]
+        assert {canonical_skill("Backend Developer", v) for v in variants} == {"Базы данных"}
+        assert canonical_skill("Data Analyst", "SQL запросы") == "SQL"
+        assert canonical_skill("Backend Developer", "  Kotlin  корутины ") == "Kotlin корутины"
+        assert canonical_skills("Backend Developer", ["redis", "kotlin", "Kotlin"], known=["KOTLIN"]) == [
+            "Базы данных", "KOTLIN",
+        ]
+        assert canonical_skill("Backend Developer", "Тестирвоание") == "Тестирование"
+
+    def test_shared_suffix_is_not_a_match(self):
+        from src.skills import canonical_skill
+
+        for skill in ("Кеширование", "Логирование", "Проектирование", "Хеширование"):
+            assert canonical_skill("Backend Developer", skill) == skill
+        assert canonical_skill("QA Engineer", "Кеширование") == "Кеширование"
+        assert canonical_skill("DevOps Engineer", "Кеширование") == "Кеширование"
+        assert canonical_skill("Backend Developer", "Кеширование данных") == "Кеширование данных"
+
+    def test_observer_merges_skills_and_covers_topics(self):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+        from src.agents.interviewer import InterviewerAgent
+        from src.agents.observer import ObserverAgent
+
+        state = create_initial_state(InterviewInput(
+            participant_name="Алекс", position="Backend Developer", grade="Junior", experience="Django",
+        ))
+        agent = ObserverAgent(FakeListChatModel(responses=["{}"]))
+        for skills in (["SQL"], ["sql", "SQL запросы"], ["Базы данных", "Docker"]):
+            state.update(agent.apply_analysis(state, ObserverAnalysis(answer_quality=8, detected_skills=skills)))
+
+        assert state["covered_topics"] == ["Базы данных", "Docker и Kubernetes"]
+        assert state["skill_scores"]["Базы данных"].correct_answers == 3
+        suggested = InterviewerAgent(FakeListChatModel(responses=["x"]))._get_suggested_topics(
+            state["position"], state["covered_topics"], [],
+        )
+        assert "Базы данных" not in suggested and "Python основы" in suggested
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,84 @@
+"""Тесты сводной аналитики по каталогу логов."""
+
+import csv
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.analytics import build_report, grade_confusion, load_catalog, load_logs, write_csv  # noqa: E402
+from src.utils.catalog import CatalogEntry, get_catalog  # noqa: E402
+
+
+def _entry(i: int, position: str, grade: str, assessed: str | None, turns: int, hallucinations: int, clarity: float | None):
+    return CatalogEntry(
+        file=f"interview_{i}.json",
+        participant_name=f"Кандидат {i}",
+        position=position,
+        grade=grade,
+        assessed_grade=assessed,
+        turns=turns,
+        hallucination_count=hallucinations,
+        clarity=clarity,
+    )
+
+
+@pytest.fixture
+def catalog_dir(tmp_path):
+    catalog = get_catalog(tmp_path)
+    for entry in (
+        _entry(1, "Backend", "Junior", "Junior", 4, 2, 6),
+        _entry(2, "Backend", "Middle", "Junior", 6, 0, 8),
+        _entry(3, "Frontend", "Senior", "Middle", 10, 1, None),
+        _entry(4, "Frontend", "Junior", None, 2, 0, None),
+    ):
+        catalog.add(entry)
+    return tmp_path
+
+
+class TestAnalytics:
+    """Агрегаты по позициям, матрица грейдов, soft skills и длина интервью."""
+
+    def test_report(self, catalog_dir):
+        report = build_report(load_catalog(catalog_dir))
+
+        assert report["sessions"] == 4
+        backend, frontend = report["behavior_by_position"]
+        assert backend == {
+            "position": "Backend", "sessions": 2,
+            "hallucinations_per_turn": 0.2, "sessions_with_hallucination": 0.5,
+            "evasions_per_turn": 0.0, "sessions_with_evasion": 0.0,
+        }
+        assert frontend["hallucinations_per_turn"] == round(1 / 12, 3)
+
+        confusion = report["grade_confusion"]
+        assert confusion["labels"] == ["Junior", "Middle", "Senior"]
+        assert confusion["matrix"] == [[1, 0, 0], [1, 0, 0], [0, 1, 0]]
+        assert confusion["sessions"] == 3
+        assert confusion["match_rate"] == round(1 / 3, 3)
+
+        soft = {row["position"]: row for row in report["soft_skills"]}
+        assert soft["Backend"]["clarity"] == 7.0
+        assert soft["Frontend"]["clarity"] is None
+        assert soft["*"]["clarity"] == 7.0
+
+        assert report["turns_to_finish"]["p50"] == 4
+        assert report["turns_to_finish"]["histogram"] == {"2": 1, "4": 1, "6": 1, "10": 1}
+
+    def test_grade_spellings_are_merged(self):
+        cols = {
+            "grade": np.array(["Junior", "junior ", "MIDDLE", "Middle"]),
+            "assessed_grade": np.array(["JUNIOR", "Junior", "middle", ""]),
+        }
+        confusion = grade_confusion(cols)
+
+        assert confusion["labels"] == ["Junior", "Middle"]
+        assert confusion["matrix"] == [[2, 0], [0, 1]]
+        assert confusion["match_rate"] == 1.0
+
+    def test_csv_and_empty_logs(self, catalog_dir, tmp_path):
+        path = write_csv(build_report(load_catalog(catalog_dir)), tmp_path / "out" / "report.csv")
+
+        rows = list(csv.DictReader(path.open(encoding="utf-8")))
+        assert {"section": "grade_confusion", "group": "Middle->Junior", "metric": "sessions", "value": "1"} in rows
+        assert build_report(load_logs(catalog_dir))["sessions"] == 0
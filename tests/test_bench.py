@@ -0,0 +1,36 @@
+"""Тесты бенчмарка."""
+
+from src.bench import build_llms, compare_to_baseline, percentile, run_benchmark
+
+
+class TestBench:
+    """Тесты метрик и прогона бенчмарка."""
+
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    async def test_run_benchmark_scripted(self):
+        scenario = ({"name": "Тест", "position": "Backend", "grade": "Junior", "experience": ""},
+                    ["Знаю Python.", "Стоп, давай фидбэк"])
+        llms = build_llms("scripted", latency_ms=1, jitter_ms=0)
+
+        metrics = await run_benchmark([scenario], llms, concurrency=2, repeat=3)
+
+        assert metrics["sessions"] == 3
+        assert metrics["errors"] == 0
+        assert metrics["turn_latency_ms"]["count"] == 3
+        assert metrics["evaluator_ms"]["count"] == 3
+
+    def test_compare_flags_regressions(self):
+        baseline = {"turn_latency_ms": {"p95": 100.0}, "sessions_per_sec": 10.0}
+        current = {"turn_latency_ms": {"p95": 130.0}, "sessions_per_sec": 10.5}
+
+        rows = {r["metric"]: r for r in compare_to_baseline(current, baseline, tolerance=0.1)}
+
+        assert rows["turn_latency_ms.p95"]["regression"] is True
+        assert rows["sessions_per_sec"]["regression"] is False
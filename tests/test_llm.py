@@ -0,0 +1,405 @@
+"""Тесты слоя LLM: кеш ответов, офлайн-провайдеры."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.agents.base import LLMAPIError
+from src.agents.interviewer import InterviewerAgent
+from src.config import settings
+from src.graph.interview_graph import InterviewSession
+from src.llm.cache import LLMResponseCache, make_cache_key
+from src.llm.limiter import RateLimiter, get_limiter, reset_limiters
+from src.llm.offline import (
+    Cassette,
+    InjectedLLMError,
+    RecordingChatModel,
+    ReplayChatModel,
+    ScriptedChatModel,
+)
+from src.llm.policy import CallPolicy, CircuitOpenError, get_breaker, reset_breakers
+from src.utils.logger import InterviewLogger
+
+
+class TestResponseCache:
+    """Тесты LLMResponseCache."""
+
+    def test_key_depends_on_all_parts(self):
+        base = make_cache_key("openai-chat", "gpt", 0.3, "sys", "user")
+
+        assert base == make_cache_key("openai-chat", "gpt", 0.3, "sys", "user")
+        assert base != make_cache_key("openai-chat", "gpt", 0.7, "sys", "user")
+        assert base != make_cache_key("openai-chat", "gpt", 0.3, "sys", "user2")
+
+    def test_persists_between_instances(self, tmp_path):
+        LLMResponseCache(tmp_path / "c.sqlite").put("k", "v")
+
+        assert LLMResponseCache(tmp_path / "c.sqlite").get("k") == "v"
+
+    def test_ttl_expiry(self, tmp_path):
+        cache = LLMResponseCache(tmp_path / "c.sqlite", ttl_seconds=0.01)
+        cache.put("k", "v")
+        time.sleep(0.02)
+
+        assert cache.get("k") is None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = LLMResponseCache(tmp_path / "c.sqlite", max_entries=2)
+        cache.put("a", "1")
+        time.sleep(0.001)
+        cache.put("b", "2")
+        time.sleep(0.001)
+        cache.get("a")
+        time.sleep(0.001)
+        cache.put("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    async def test_single_flight(self, tmp_path):
+        cache = LLMResponseCache(tmp_path / "c.sqlite")
+        calls = 0
+
+        async def compute() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "ответ"
+
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+        assert calls == 1
+        assert [value for value, _ in results] == ["ответ"] * 5
+        assert sorted(outcome for _, outcome in results) == ["coalesced"] * 4 + ["miss"]
+
+    async def test_cancelled_leader_hands_over(self, tmp_path):
+        cache = LLMResponseCache(tmp_path / "c.sqlite")
+        started = asyncio.Event()
+
+        async def stuck() -> str:
+            started.set()
+            await asyncio.sleep(10)
+            return "не дошло"
+
+        async def compute() -> str:
+            return "ответ"
+
+        leader = asyncio.create_task(cache.get_or_compute("k", stuck))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == ("ответ", "miss")
+        assert cache.get("k") == "ответ"
+
+    def test_agent_counts_hits(self, tmp_path):
+        agent = InterviewerAgent(FakeListChatModel(responses=["первый", "второй"]))
+        agent.cache = LLMResponseCache(tmp_path / "c.sqlite")
+
+        assert agent.invoke_llm_sync("вопрос") == "первый"
+        assert agent.invoke_llm_sync("вопрос") == "первый"
+        assert agent.cache_stats() == {"hits": 1, "misses": 1, "coalesced": 0}
+
+
+class TestOfflineProviders:
+    """Тесты провайдеров record / replay / scripted."""
+
+    def _scripted_llms(self) -> dict:
+        return {agent: ScriptedChatModel() for agent in ("interviewer", "observer", "evaluator")}
+
+    def test_scripted_full_session(self):
+        session = InterviewSession(llms=self._scripted_llms())
+        session.initialize("Тест", "Backend Developer", "Junior", "Python")
+
+        response, finished, _ = session.process_user_input("Знаю Python и SQL.")
+        assert finished is False
+        assert response.startswith("Хорошо.")
+
+        _, finished, feedback = session.process_user_input("Стоп, давай фидбэк")
+        assert finished is True
+        assert feedback["decision"]["hiring_recommendation"] == "Hire"
+        assert "Python основы" in session.get_state()["covered_topics"]
+
+    def test_record_then_replay(self, tmp_path):
+        cassette_path = tmp_path / "cassette.jsonl"
+        recorder = RecordingChatModel(inner=ScriptedChatModel(), cassette=Cassette(cassette_path))
+        session = InterviewSession(llms={a: recorder for a in ("interviewer", "observer", "evaluator")})
+        session.initialize("Тест", "Backend Developer", "Junior", "Python")
+        recorded = session.process_user_input("Знаю Python.")
+
+        replayer = ReplayChatModel(cassette=Cassette(cassette_path))
+        session = InterviewSession(llms={a: replayer for a in ("interviewer", "observer", "evaluator")})
+        session.initialize("Тест", "Backend Developer", "Junior", "Python")
+
+        assert session.process_user_input("Знаю Python.") == recorded
+        with pytest.raises(LLMAPIError):
+            session.process_user_input("Другой ответ")
+
+    def test_error_injection(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_max_attempts", 1)
+        agent = InterviewerAgent(ScriptedChatModel(error_rate=1.0))
+
+        with pytest.raises(LLMAPIError, match="5xx|503"):
+            agent.invoke_llm_sync("вопрос")
+        reset_breakers()
+
+
+class TestTokenUsage:
+    """Тесты учёта токенов и бюджета сессии."""
+
+    def _session(self) -> InterviewSession:
+        return InterviewSession(llms={a: ScriptedChatModel() for a in ("interviewer", "observer", "evaluator")})
+
+    def test_usage_per_turn_and_total(self, tmp_path):
+        session = self._session()
+        session.initialize("Тест", "Backend Developer", "Junior", "Python")
+        session.process_user_input("Знаю Python и SQL.")
+        session.process_user_input("list изменяемый, tuple нет.")
+
+        turn = session.get_turns()[-1]
+        assert set(turn.token_usage) == {"interviewer", "observer"}
+        assert turn.token_usage["interviewer"].calls == 1
+
+        session.finish()
+        usage = session.get_token_usage()
+        assert usage["evaluator"].calls == 1
+        assert session.get_total_usage().total_tokens == sum(u.total_tokens for u in usage.values())
+
+        logger = InterviewLogger(tmp_path)
+        logger.start_session("Тест", "Backend Developer", "Junior", "Python")
+        logger.log_turn(turn)
+        logger.log_token_usage(usage)
+        log = logger.get_current_log()
+        assert log["turns"][0]["token_usage"]["observer"]["calls"] == 1
+        assert log["token_usage"]["total"]["calls"] == 5
+
+    def test_budget_finishes_early(self, monkeypatch):
+        monkeypatch.setattr(settings, "session_token_budget", 1)
+        session = self._session()
+        session.initialize("Тест", "Backend Developer", "Junior", "Python")
+
+        _, finished, feedback = session.process_user_input("Знаю Python.")
+
+        assert finished is True
+        assert feedback is not None
+        assert session.get_state()["finish_reason"] == "budget_exceeded"
+
+
+class _FlakyModel(FakeListChatModel):
+    """Первые failures вызовов падают с заданной ошибкой."""
+
+    failures: int = 0
+    error: Exception = InjectedLLMError()
+    calls: int = 0
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return super()._call(*args, **kwargs)
+
+
+class _RateLimitedError(Exception):
+    status_code = 429
+    response = SimpleNamespace(status_code=429, headers={"retry-after": "7"})
+
+
+class TestCallPolicy:
+    """Повторы, Retry-After, circuit breaker и переход на резервный провайдер."""
+
+    @pytest.fixture(autouse=True)
+    def _fake_clock(self, monkeypatch):
+        self.sleeps = []
+        clock = [1000.0]
+
+        def sleep(delay):
+            self.sleeps.append(delay)
+            clock[0] += delay
+
+        monkeypatch.setattr(time, "sleep", sleep)
+        monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+        reset_breakers()
+        reset_limiters()
+        yield
+        reset_breakers()
+        reset_limiters()
+
+    def test_retry_honors_retry_after(self):
+        llm = _FlakyModel(responses=["ок"], failures=1, error=_RateLimitedError("429"))
+        agent = InterviewerAgent(llm)
+
+        assert agent.invoke_llm_sync("вопрос") == "ок"
+        assert self.sleeps == [7.0]
+        [attempt] = agent.policy.take_attempts()
+        assert attempt.status_code == 429 and attempt.delay_s == 7.0
+
+    def test_failover_to_secondary(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_max_attempts", 2)
+        primary = _FlakyModel(responses=["нет"], failures=10)
+        agent = InterviewerAgent(primary, ScriptedChatModel())
+
+        assert agent.invoke_llm_sync("вопрос")
+        attempts = agent.policy.take_attempts()
+        assert [a.failover_to for a in attempts] == [None, "scripted"]
+        assert agent.policy.retries == 1 and agent.policy.failovers == 1
+
+    def test_open_circuit_skips_provider(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_circuit_failure_threshold", 1)
+        primary = _FlakyModel(responses=["нет"], failures=10)
+        agent = InterviewerAgent(primary, ScriptedChatModel())
+
+        agent.invoke_llm_sync("вопрос")
+        agent.invoke_llm_sync("вопрос")
+
+        assert primary.calls == 1
+        assert agent.policy.take_attempts()[-1].attempt == 0
+
+    async def test_half_open_admits_single_probe(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_circuit_failure_threshold", 1)
+        llm = FakeListChatModel(responses=["ок"])
+        breaker = get_breaker("fake-list-chat-model")
+        breaker.failure()
+        time.sleep(settings.llm_circuit_cooldown_s)
+
+        calls = 0
+        release = asyncio.Event()
+
+        async def probe(_):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "ок"
+
+        policies = [CallPolicy("observer", [llm]) for _ in range(5)]
+        tasks = [asyncio.create_task(p.ainvoke(probe)) for p in policies]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert calls == 1
+        assert results[0] == "ок"
+        assert all(isinstance(r, CircuitOpenError) for r in results[1:])
+        assert breaker.allow() and breaker.opened_at is None
+
+        breaker.failure()
+        time.sleep(settings.llm_circuit_cooldown_s)
+        assert breaker.allow() and not breaker.allow()
+        breaker.failure()
+        assert not breaker.allow()
+
+    def test_non_transient_error_is_not_retried(self):
+        llm = _FlakyModel(responses=["ок"], failures=1, error=ValueError("bad request"))
+        agent = InterviewerAgent(llm)
+
+        with pytest.raises(LLMAPIError):
+            agent.invoke_llm_sync("вопрос")
+        assert llm.calls == 1
+
+
+class TestRateLimiter:
+    """Общий лимитер: RPM, AIMD и ожидание в очереди."""
+
+    async def test_concurrency_limit_queues_callers(self):
+        limiter = RateLimiter("test:model", max_concurrency=1)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.02)
+        assert not waiter.done()
+        assert limiter.stats()["queued"] == 1
+
+        limiter.release()
+        assert await waiter >= 0.02
+        limiter.release()
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_aimd_and_rate_limit_headers(self):
+        limiter = RateLimiter("test:model", rpm=60, max_concurrency=8)
+        limiter.acquire_sync()
+        limiter.release(throttled=True)
+        assert limiter.stats()["concurrency_limit"] == 4
+
+        limiter.acquire_sync()
+        limiter.release(headers={"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"})
+        assert limiter._take_budget(0) > 1.0
+
+    def test_per_model_limits_from_settings(self, monkeypatch):
+        reset_limiters()
+        monkeypatch.setattr(settings, "llm_rate_limits", {"mistral:small": {"rpm": 5, "concurrency": 2}})
+        try:
+            assert get_limiter("mistral", "small").max_limit == 2
+            assert get_limiter("mistral", "large").max_limit == settings.llm_max_concurrency
+        finally:
+            reset_limiters()
+
+
+class TestSharedClients:
+    """Общий реестр LLM и пул HTTP-соединений."""
+
+    async def test_registry_shares_clients_and_pool(self, monkeypatch):
+        from src.llm.provider import aclose_http_clients, get_llm_for_agent, get_shared_llm
+
+        monkeypatch.setattr(settings, "llm_provider", "mistral")
+        monkeypatch.setattr(settings, "mistral_api_key", "test-key")
+        await aclose_http_clients()
+        try:
+            first = get_shared_llm(temperature=0.3)
+            assert get_shared_llm(temperature=0.3) is first
+            other = get_shared_llm(temperature=0.5)
+            assert other is not first
+            assert other.async_client is first.async_client
+            assert get_llm_for_agent("observer") is get_llm_for_agent("observer")
+        finally:
+            await aclose_http_clients()
+
+    def test_async_client_pool_per_event_loop(self):
+        import httpx
+
+        from src.llm.http import LoopLocalAsyncClient
+        from src.utils.aio import run_sync
+
+        client = LoopLocalAsyncClient(
+            limits=httpx.Limits(max_connections=2),
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, text=request.url.path)),
+            base_url="https://llm.test/v1",
+        )
+
+        async def call() -> tuple[str, httpx.AsyncClient]:
+            response = await client.get("/models")
+            return response.text, client.for_loop()
+
+        first_text, first = asyncio.run(call())
+        second_text, second = asyncio.run(call())
+        background_text, background = run_sync(call())
+
+        assert first_text == second_text == background_text == "/v1/models"
+        assert len({id(first), id(second), id(background)}) == 3
+        assert run_sync(call())[1] is background
+
+    async def test_warm_up_skips_offline_and_opens_connections(self, monkeypatch):
+        from src.llm import provider
+
+        requests = []
+
+        class FakeClient:
+            async def get(self, url, headers=None):
+                requests.append(url)
+
+        monkeypatch.setattr(provider, "_http_client", lambda name, is_async: FakeClient())
+        shared = FakeListChatModel(responses=["ok", "ok"])
+        monkeypatch.setitem(provider._shared_llms, ("mistral", "small", 0.3, None), shared)
+        monkeypatch.setitem(provider._shared_llms, ("mistral", "small", 0.5, None), FakeListChatModel(responses=["ok"]))
+        offline = FakeListChatModel(responses=["ok", "ok"])
+
+        stats = await provider.warm_up([shared, provider._shared_llms[("mistral", "small", 0.5, None)], offline])
+        assert stats == {"connections": 1, "preflights": 0, "errors": 0}
+        assert requests == ["/models"]
+
+        stats = await provider.warm_up([shared, offline], preflight=True)
+        assert stats == {"connections": 0, "preflights": 1, "errors": 0}
+        assert (shared.i, offline.i) == (1, 0)
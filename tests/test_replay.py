@@ -0,0 +1,52 @@
+"""Тесты повторного прогона логов."""
+
+import json
+
+from run_scenario import run_batch
+from src.config import settings
+from src.llm.offline import SCRIPTED_OBSERVER_RESPONSE, ScriptedChatModel
+from src.replay import AGENT_TYPES, collect_logs, replay_llms, run_replay, summarize
+
+
+async def _make_logs(tmp_path, monkeypatch, count: int = 2):
+    monkeypatch.setattr(settings, "llm_provider", "scripted")
+    monkeypatch.setattr(settings, "log_dir", tmp_path / "logs")
+    scenarios = [
+        (f"s{i}", {"name": "Тест", "position": "Backend", "grade": "Junior", "experience": ""},
+         ["Знаю Python.", "Стоп, давай фидбэк"])
+        for i in range(count)
+    ]
+    await run_batch(scenarios, concurrency=2, quiet=True, output_dir=tmp_path / "out")
+    return collect_logs([tmp_path / "logs"])
+
+
+class TestReplay:
+    async def test_same_model_agrees(self, tmp_path, monkeypatch):
+        files = await _make_logs(tmp_path, monkeypatch)
+        log = json.loads(files[0].read_text(encoding="utf-8"))
+        assert log["prompt_version"] and log["turns"][0]["analysis"]["answer_quality"] == 6
+
+        results = await run_replay(files, replay_llms("scripted"), concurrency=2)
+        summary = summarize(results)
+
+        assert [r.status for r in results] == ["ok", "ok"]
+        assert summary["turns_compared"] > 0
+        assert summary["flag_agreement"] == summary["difficulty_agreement"] == 1.0
+        assert summary["recommendation_agreement"] == summary["grade_agreement"] == 1.0
+        assert summary["answer_quality_mae"] == 0.0
+
+    async def test_other_model_drift(self, tmp_path, monkeypatch):
+        files = await _make_logs(tmp_path, monkeypatch, count=1)
+        observer = json.loads(SCRIPTED_OBSERVER_RESPONSE)
+        observer.update(is_evasive=True, answer_quality=3)
+
+        def drifted():
+            return {agent: ScriptedChatModel(observer_response=json.dumps(observer)) for agent in AGENT_TYPES}
+
+        [result] = await run_replay(files, drifted)
+        summary = summarize([result])
+
+        assert result.turns[0]["changed"] == ["is_evasive", "answer_quality"]
+        assert result.turns[0]["baseline"]["is_evasive"] is False
+        assert summary["flag_agreement_by_flag"]["is_evasive"] == 0.0
+        assert summary["answer_quality_bias"] == -3.0
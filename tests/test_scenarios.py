@@ -0,0 +1,51 @@
+"""Тесты загрузки сценариев и пакетного прогона."""
+
+import json
+
+from run_scenario import run_batch
+from src.config import settings
+from src.scenarios import load_scenario_batch
+
+
+def _write_scenario(path, name: str, *messages: str) -> None:
+    path.write_text(f"name: {name}\nposition: Backend Developer\n---\n" + "\n".join(messages), encoding="utf-8")
+
+
+class TestScenarioBatch:
+    """Источники сценариев и одновременный прогон."""
+
+    def test_sources(self, tmp_path):
+        _write_scenario(tmp_path / "one.txt", "Анна", "Знаю Python.")
+        _write_scenario(tmp_path / "two.txt", "Борис", "Стоп")
+        _write_scenario(tmp_path / "empty.txt", "Вера")
+        jsonl = tmp_path / "batch.jsonl"
+        jsonl.write_text(
+            json.dumps({"id": "x", "name": "Гена", "messages": ["Привет"]}, ensure_ascii=False) + "\n\n"
+            + json.dumps({"grade": "Senior", "messages": ["Стоп"]}) + "\n",
+            encoding="utf-8",
+        )
+
+        assert [s[0] for s in load_scenario_batch(str(tmp_path))] == ["one", "two"]
+        assert [s[0] for s in load_scenario_batch(str(tmp_path / "t*.txt"))] == ["two"]
+        batch = load_scenario_batch(str(jsonl))
+        assert [(s[0], s[1]["name"], s[1]["grade"]) for s in batch] == [
+            ("x", "Гена", "Junior"), ("batch_3", "Тест", "Senior"),
+        ]
+
+    async def test_run_batch_writes_logs_and_exports(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "llm_provider", "scripted")
+        monkeypatch.setattr(settings, "log_dir", tmp_path / "logs")
+        scenarios = [
+            (f"s{i}", {"name": "Тест", "position": "Backend", "grade": "Junior", "experience": ""},
+             ["Знаю Python.", "Стоп, давай фидбэк"])
+            for i in range(3)
+        ]
+        scenarios.append(("bad", {"name": "Тест", "position": "Плотник", "grade": "Junior", "experience": ""}, ["x"]))
+
+        results = await run_batch(scenarios, concurrency=2, quiet=True, output_dir=tmp_path / "out")
+
+        assert [r.status for r in results] == ["ok", "ok", "ok", "error"]
+        assert len({r.log for r in results[:3]}) == 3
+        assert all(r.turns == 2 and r.recommendation for r in results[:3])
+        export = json.loads((tmp_path / "out" / "s0.json").read_text(encoding="utf-8"))
+        assert len(export["turns"]) == 2 and export["final_feedback"]
@@ -0,0 +1,87 @@
+"""Тесты HTTP/WebSocket-сервера сессий."""
+
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+try:
+    from aiohttp import test_utils
+
+    from src.server.app import create_app
+    from src.server.sessions import SessionManager
+except ImportError:
+    pytest.skip("Для сервера нужен aiohttp", allow_module_level=True)
+
+OBSERVER_JSON = json.dumps({"answer_quality": 6, "instruction_to_interviewer": "Дальше."})
+
+
+def _manager(tmp_path, **kwargs) -> SessionManager:
+    llms = {
+        "interviewer": FakeListChatModel(responses=["Что такое GIL?"]),
+        "observer": FakeListChatModel(responses=[OBSERVER_JSON]),
+        "evaluator": FakeListChatModel(responses=["{}"]),
+    }
+    return SessionManager(llms=llms, log_dir=tmp_path, **kwargs)
+
+
+@pytest.fixture
+async def client(tmp_path):
+    async with test_utils.TestClient(test_utils.TestServer(create_app(_manager(tmp_path)))) as client:
+        yield client
+
+
+class TestServerAPI:
+    """Тесты API сервера."""
+
+    async def test_http_flow(self, client):
+        resp = await client.post("/sessions", json={"name": "Тест", "position": "backend"})
+        assert resp.status == 201
+        session_id = (await resp.json())["session_id"]
+
+        resp = await client.post(f"/sessions/{session_id}/messages", json={"message": "Знаю Python."})
+        data = await resp.json()
+        assert data["response"] == "Что такое GIL?"
+        assert data["is_finished"] is False
+
+        resp = await client.post(f"/sessions/{session_id}/finish")
+        data = await resp.json()
+        assert data["is_finished"] is True
+        assert data["feedback"]["total_turns"] == 1
+
+        resp = await client.post(f"/sessions/{session_id}/messages", json={"message": "Ещё"})
+        assert resp.status == 409
+
+    async def test_unknown_position_and_session(self, client):
+        resp = await client.post("/sessions", json={"position": "Uborshik"})
+        assert resp.status == 400
+
+        resp = await client.post("/sessions/nope/messages", json={"message": "x"})
+        assert resp.status == 404
+
+    async def test_websocket_stream(self, client):
+        resp = await client.post("/sessions", json={"name": "Тест"})
+        session_id = (await resp.json())["session_id"]
+
+        ws = await client.ws_connect(f"/sessions/{session_id}/ws")
+        await ws.send_json({"message": "Знаю Python."})
+        events = []
+        while not events or events[-1]["type"] != "done":
+            events.append(await ws.receive_json())
+        await ws.close()
+
+        text = "".join(e["text"] for e in events if e["type"] == "chunk")
+        assert text == "Что такое GIL?"
+        assert events[-1]["is_finished"] is False
+
+
+class TestSessionCleanup:
+    """Тесты очистки сессий."""
+
+    async def test_idle_sessions_removed(self, tmp_path):
+        manager = _manager(tmp_path, idle_timeout=0.0)
+        await manager.create("Тест", "Backend Developer", "Junior", "Python")
+
+        assert await manager.cleanup() == 1
+        assert len(manager) == 0
+        assert list(tmp_path.glob("interview_*.json"))
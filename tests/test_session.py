@@ -0,0 +1,286 @@
+"""Тесты InterviewSession на фейковых LLM без сети."""
+
+import json
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.agents.evaluator import EvaluatorAgent
+from src.agents.interviewer import InterviewerAgent
+from src.agents.observer import ObserverAgent
+from src.graph.interview_graph import InterviewSession
+
+
+def _observer_json(**flags) -> str:
+    data = {
+        "current_topic": "Python основы",
+        "answer_quality": 6,
+        "detected_skills": ["Python"],
+        "instruction_to_interviewer": "Задай следующий вопрос.",
+        "thoughts": "Нормальный ответ.",
+    }
+    data.update(flags)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _make_session(
+    observer_responses: list[str], speculative: bool = False, preclassifier: str = "off"
+) -> InterviewSession:
+    session = InterviewSession(speculative=speculative, preclassifier=preclassifier)
+    session._interviewer = InterviewerAgent(FakeListChatModel(responses=["Что такое GIL?"]))
+    session._observer = ObserverAgent(FakeListChatModel(responses=observer_responses))
+    session._evaluator = EvaluatorAgent(FakeListChatModel(responses=["{}"]))
+    session.initialize("Тест", "Backend Developer", "Junior", "Python")
+    return session
+
+
+class TestSpeculativeInterviewer:
+    """Тесты спекулятивного запуска Interviewer."""
+
+    def test_hit_keeps_draft(self):
+        session = _make_session([_observer_json()], speculative=True)
+
+        response, finished, _ = session.process_user_input("Знаю Python и SQL.")
+
+        assert response == "Что такое GIL?"
+        assert finished is False
+        assert session.get_speculation_stats() == {"hits": 1, "misses": 0}
+        assert session.get_turns()[-1].user_message == "Знаю Python и SQL."
+
+    def test_miss_on_user_question(self):
+        session = _make_session(
+            [_observer_json(is_question_from_user=True, user_question="Какой стек?")],
+            speculative=True,
+        )
+
+        response, finished, _ = session.process_user_input("А какой у вас стек?")
+
+        assert response == "Что такое GIL?"
+        assert finished is False
+        assert session.get_speculation_stats() == {"hits": 0, "misses": 1}
+
+    def test_stop_finishes_without_draft(self):
+        session = _make_session([_observer_json()], speculative=True)
+
+        _, finished, feedback = session.process_user_input("Стоп, давай фидбэк")
+
+        assert finished is True
+        assert feedback is not None
+        assert session.get_speculation_stats() == {"hits": 0, "misses": 0}
+
+    def test_disabled_by_default(self):
+        session = _make_session([_observer_json()])
+
+        session.process_user_input("Знаю Python.")
+
+        assert session.get_speculation_stats() == {"hits": 0, "misses": 0}
+
+
+class TestStreaming:
+    """Тесты потоковой выдачи ответа интервьюера."""
+
+    async def test_stream_drops_meta_lines(self):
+        session = _make_session([_observer_json()])
+        session._interviewer = InterviewerAgent(
+            FakeListChatModel(responses=["[Observer]: служебное\nХорошо. Расскажи, как работает GIL?"])
+        )
+
+        chunks = [c async for c in session.stream_user_input("Знаю Python.")]
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == "Хорошо. Расскажи, как работает GIL?"
+        assert session.get_state()["current_agent_message"] == "".join(chunks)
+        assert session.is_finished() is False
+
+    async def test_stream_drops_meta_keyword_after_hold(self):
+        text = "Хорошо, давай двигаться дальше. Внутренние мысли: кандидат слаб\nЧто такое GIL?"
+        session = _make_session([_observer_json()])
+        session._interviewer = InterviewerAgent(FakeListChatModel(responses=[text]))
+
+        chunks = [c async for c in session.stream_user_input("Знаю Python.")]
+
+        streamed = "".join(chunks)
+        assert len(chunks) > 10
+        assert "Внутренние мысли" not in streamed and "кандидат слаб" not in streamed
+        assert session.get_state()["current_agent_message"] == "Что такое GIL?"
+        assert session._interviewer._clean_message(text) == "Что такое GIL?"
+
+    async def test_stream_finishes_with_feedback(self):
+        session = _make_session([_observer_json()])
+
+        chunks = [c async for c in session.stream_user_input("Стоп")]
+
+        assert chunks == ["Спасибо за интервью! Вот ваш фидбэк:"]
+        assert session.is_finished() is True
+        assert session.get_final_feedback() is not None
+
+
+class TestAsyncSession:
+    """Тесты асинхронного API сессии."""
+
+    async def test_concurrent_sessions(self):
+        import asyncio
+
+        async def run_one(name: str) -> tuple[str, bool, dict | None]:
+            session = InterviewSession()
+            session._interviewer = InterviewerAgent(FakeListChatModel(responses=["Что такое GIL?"]))
+            session._observer = ObserverAgent(FakeListChatModel(responses=[_observer_json()]))
+            session._evaluator = EvaluatorAgent(FakeListChatModel(responses=["{}"]))
+            await session.ainitialize(name, "Backend Developer", "Junior", "Python")
+            await session.aprocess_user_input("Знаю Python.")
+            return await session.afinish()
+
+        results = await asyncio.gather(*(run_one(f"Кандидат {i}") for i in range(5)))
+
+        assert all(finished for _, finished, _ in results)
+        assert all(feedback is not None for _, _, feedback in results)
+
+    def test_sync_finish_wrapper(self):
+        session = _make_session([_observer_json()])
+        session.process_user_input("Знаю Python.")
+
+        _, finished, feedback = session.finish()
+
+        assert finished is True
+        assert session.is_finished() is True
+        assert feedback["total_turns"] == 1
+
+
+class TestIncrementalEvaluation:
+    """Тесты фонового черновика оценки."""
+
+    def _session(self) -> InterviewSession:
+        from src.llm.offline import ScriptedChatModel
+
+        llms = {agent: ScriptedChatModel() for agent in ("interviewer", "observer", "evaluator")}
+        session = InterviewSession(llms=llms, incremental_evaluation=True)
+        session.initialize("Тест", "Backend Developer", "Junior", "Python")
+        return session
+
+    def test_final_prompt_uses_draft(self):
+        session = self._session()
+        session.process_user_input("Знаю Python.")
+        session.process_user_input("list изменяемый, tuple нет.")
+        session.finish()
+
+        draft = session.get_state()["evaluation_draft"]
+        assert draft is not None and draft.turns_folded >= 1
+        assert "Python основы" in draft.skill_evidence
+
+        prompt = session._evaluator._build_prompt(session.get_state())
+        assert "Черновик оценки" in prompt
+        assert "[Ход 1]" not in prompt
+
+    async def test_broken_draft_falls_back_to_full_history(self):
+        session = InterviewSession(incremental_evaluation=True)
+        session._interviewer = InterviewerAgent(FakeListChatModel(responses=["Что такое GIL?"]))
+        session._observer = ObserverAgent(FakeListChatModel(responses=[_observer_json()]))
+        session._evaluator = EvaluatorAgent(FakeListChatModel(responses=["Черновик: всё хорошо", "{}"]))
+        await session.ainitialize("Тест", "Backend Developer", "Junior", "Python")
+
+        await session.aprocess_user_input("Знаю Python.")
+        await session.afinish()
+
+        assert session.get_draft_errors() == 1
+        assert session.get_state()["evaluation_draft"] is None
+        assert "[Ход 1]" in session._evaluator._build_prompt(session.get_state())
+
+    async def test_one_update_in_flight_and_cancel(self):
+        session = InterviewSession(incremental_evaluation=True)
+        session._interviewer = InterviewerAgent(FakeListChatModel(responses=["Что такое GIL?"]))
+        session._observer = ObserverAgent(FakeListChatModel(responses=[_observer_json()]))
+        session._evaluator = EvaluatorAgent(FakeListChatModel(responses=["{}"], sleep=0.05))
+        await session.ainitialize("Тест", "Backend Developer", "Junior", "Python")
+
+        await session.aprocess_user_input("Знаю Python.")
+        task = session._draft_task
+        await session.aprocess_user_input("Ещё ответ.")
+
+        assert session._draft_task is task
+        session.cancel_background()
+        assert session._draft_task is None
+
+
+class TestPreClassifier:
+    """Предклассификация стопа, пропуска и спама без вызова Observer."""
+
+    def test_rules(self):
+        from src.agents.preclassifier import classify
+
+        assert classify("Стоп!") == "stop"
+        assert classify("  дай фидбэк ") == "stop"
+        assert classify("Не знаю.") == "skip"
+        assert classify("????") == "spam"
+        assert classify("ааааааааа") == "spam"
+        assert classify("Стоп-слова в поиске убирают до индексации") is None
+
+    def test_short_answers_are_not_spam(self):
+        from src.agents.preclassifier import classify
+
+        assert classify("100000") is None
+        assert classify("1000000") is None
+        assert classify("?") is None
+        assert classify(" ?! ") is None
+
+    def test_one_word_answers_are_not_commands(self):
+        from src.agents.preclassifier import classify
+
+        for answer in ("end", "feedback", "pass", "next", "дальше", "всё", "достаточно"):
+            assert classify(answer) is None
+
+    def test_on_mode_stop_skips_observer(self):
+        session = _make_session([_observer_json()], preclassifier="on")
+
+        _, finished, feedback = session.process_user_input("Хватит")
+
+        assert finished is True
+        assert feedback is not None
+        assert session._observer.usage.calls == 0
+        assert session.get_preclassifier_stats()["hits"] == 1
+
+    def test_on_mode_skip_records_question_topic(self):
+        session = _make_session([_observer_json(current_topic="Базы данных")], preclassifier="on")
+
+        session.process_user_input("Пишу на Python три года")
+        session.process_user_input("не знаю")
+
+        assert session._observer.usage.calls == 1
+        assert session._state["skipped_topics"] == ["Python основы"]
+
+    def test_shadow_mode_compares_with_observer(self):
+        session = _make_session(
+            [_observer_json(wants_to_skip=True), _observer_json(wants_to_skip=True), _observer_json()],
+            preclassifier="shadow",
+        )
+
+        session.process_user_input("не знаю")
+        session.process_user_input("Тут я путаюсь, давай другой вопрос")
+        session.process_user_input("давай дальше")
+
+        assert session._observer.usage.calls == 3
+        assert session.get_preclassifier_stats() == {
+            "turns": 3, "hits": 2, "agreed": 1, "disagreed": 1, "missed": 1,
+        }
+
+
+class TestWarmup:
+    """Прогрев агентов после приветствия."""
+
+    async def test_warmup_builds_agents_in_background(self):
+        session = InterviewSession(
+            warmup="connect",
+            llms={
+                "observer": FakeListChatModel(responses=[_observer_json()]),
+                "evaluator": FakeListChatModel(responses=["{}"]),
+            },
+        )
+        session._interviewer = InterviewerAgent(FakeListChatModel(responses=["Что такое GIL?"]))
+        await session.ainitialize("Тест", "Backend Developer", "Junior", "Python")
+        assert session._observer is None
+
+        await session._warmup_task
+
+        assert session._observer is not None and session._evaluator is not None
+        stats = session.get_warmup_stats()
+        assert stats["connections"] == stats["preflights"] == stats["errors"] == 0
+        response, finished, _ = await session.aprocess_user_input("Знаю Python.")
+        assert (response, finished) == ("Что такое GIL?", False)
@@ -0,0 +1,41 @@
+"""Время старта CLI: офлайн-команды не грузят SDK провайдеров и langgraph."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# С запасом для медленных CI; до ленивых импортов было около 2 с.
+IMPORT_BUDGET_S = 1.0
+
+HEAVY_MODULES = ("langgraph", "langchain_mistralai", "langchain_openai", "httpx")
+
+_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import src.main
+from typer.testing import CliRunner
+elapsed = time.perf_counter() - start
+for command in (["list-logs"], ["config"]):
+    result = CliRunner().invoke(src.main.app, command)
+    assert result.exit_code == 0, result.output
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def test_offline_commands_skip_heavy_imports(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        env={"PYTHONPATH": str(ROOT), "LOG_DIR": str(tmp_path), "PATH": ""},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["loaded"] == []
+    assert probe["elapsed"] < IMPORT_BUDGET_S